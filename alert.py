@@ -1,14 +1,18 @@
-import yfinance as yf
-import pandas as pd
-import requests
 import os
 import sys
 from version import APP_VERSION, APP_VERSION_FULL
+from snapshot import load_snapshot, save_snapshot, snapshot_age
+
+# 무거운 모듈(requests / pandas / yfinance)은 실제로 필요한 시점에만 import 한다.
+# --from-snapshot 경로는 표준 라이브러리만으로 판정·출력까지 끝난다 (cold start 단축).
 
 # 텔레그램 설정
 TOKEN = os.environ.get('TELEGRAM_TOKEN')
 CHAT_ID = os.environ.get('CHAT_ID')
 
+# --from-snapshot 경로에서 허용하는 스냅샷 최대 경과 시간(시간). 넘으면 실시간 수집으로 대체 (며칠 지난 지표로 경보 방지)
+DEFAULT_SNAPSHOT_MAX_AGE_HOURS = 26
+
 # V24.5: Level 2(이격도) 버블 방어 발동 레벨 게이트 (app.py와 동일, LV.7 = 자산 4억 이상)
 BUBBLE_LEVEL2_GATE = 7
 
@@ -34,10 +38,17 @@ def get_current_level():
         ath_assets = 0.0
     return determine_level(ath_assets), ath_assets
 
+def get_snapshot_max_age_hours():
+    try:
+        return float(os.environ.get('SNAPSHOT_MAX_AGE_HOURS', '') or DEFAULT_SNAPSHOT_MAX_AGE_HOURS)
+    except ValueError:
+        return DEFAULT_SNAPSHOT_MAX_AGE_HOURS
+
 def send_telegram(message):
     if not TOKEN or not CHAT_ID:
         print("❌ 텔레그램 토큰 또는 Chat ID가 설정되지 않았습니다.")
         return
+    import requests
     url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
     payload = {"chat_id": CHAT_ID, "text": message, "parse_mode": "Markdown"}
     try:
@@ -46,196 +57,202 @@ def send_telegram(message):
     except Exception as e:
         print(f"❌ 전송 실패: {e}")
 
-def calculate_rsi(series, window=14):
-    """RSI (Wilder / RMA 방식)"""
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = (-delta).clip(lower=0)
-    avg_gain = gain.ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
-    avg_loss = loss.ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def check_market_status():
+def format_status_row(row):
+    """상태 블록 종목 1행 (유니버스 행 dict → 텍스트)"""
+    ma120_str = f"${row['ma120']:.2f}" if row['ma120'] else "N/A"
+    price_str = f"${row['price']:.2f}" if row['price'] is not None else "N/A"
+    mdd_str = f"{(row['mdd'] or 0) * 100:.2f}%" + (" (수정종가)" if row['role'] == 'master' else "")
+    dev_str = f"{row['mo_dev']*100:.1f}% ({ma120_str})" if row['ma120'] else "N/A"
+    return (f"• {row['ticker']}: {price_str} │ 주봉RSI {row['rsi_wk'] or 0:.1f} / 월봉RSI {row['rsi_mo'] or 0:.1f} │ "
+            f"120월 이격도 {dev_str} │ MDD {mdd_str}\n")
+
+def format_race_lines(mkt, main_window=63):
+    """승자의 질주(TQQQ vs USD) 2행: 기간별 상대강도 + 기준 기간 상관/베타/무리밸런싱 비중. 레이스 값이 없으면 ''"""
+    windows = sorted(int(k.rsplit('_', 1)[1]) for k in mkt if k.startswith('race_rs_'))
+    if not windows:
+        return ""
+    rs = " │ ".join(f"{w}일 {mkt[f'race_rs_{w}']*100:+.1f}%" if mkt[f'race_rs_{w}'] is not None else f"{w}일 N/A" for w in windows)
+    line = f"• 🏁 TQQQ/USD 상대강도: {rs}\n"
+    if mkt.get(f'race_corr_{main_window}') is not None:
+        tq = mkt[f'race_tqqq_weight_{main_window}'] * 100
+        line += (f"• 🏁 {main_window}일: 상관 {mkt[f'race_corr_{main_window}']:.2f} │ β TQQQ/QQQ {mkt[f'race_tqqq_beta_{main_window}']:.2f}"
+                 f" · USD/SOXX {mkt[f'race_usd_beta_{main_window}']:.2f} │ 무리밸런싱 TQ {tq:.0f}:{100 - tq:.0f} USD\n")
+    return line
+
+def build_status_block(mkt, current_level, ath_assets_krw):
+    """텔레그램 상태 블록: Level + 유니버스 종목별 행 + 환율"""
+    usd_krw_str = f"₩{mkt['usd_krw']:,.2f}" if mkt['usd_krw'] else "N/A"
+    block = (
+        f"📊 *Status Check*\n"
+        f"• Level: LV.{current_level} (ATH ₩{ath_assets_krw:,.0f}) │ 이격도 버블 게이트: LV≥{BUBBLE_LEVEL2_GATE}\n"
+    )
+    for row in mkt['rows']:
+        block += format_status_row(row)
+    block += f"• USD/KRW: {usd_krw_str} │ 10년 평균 대비 {mkt['fx_deviation']*100:+.1f}%\n"
+    block += format_race_lines(mkt)
+    if mkt.get('dq_quarantined'):
+        block += f"• 🧪 데이터 품질: 의심 바 {mkt['dq_quarantined']}개 격리 (직전 정상값 대체, 대시보드에서 상세 확인)\n"
+    return block
+
+def load_market(from_snapshot=False):
+    """
+    from_snapshot=True: market_snapshot.json만 읽음 (pandas/yfinance 미사용, 없으면 None).
+                        SNAPSHOT_MAX_AGE_HOURS(기본 26시간)보다 오래됐으면 아래 실시간 수집으로 대체
+    False: 유니버스(universe.py) 전체 일괄 다운로드 + 패널 지표 계산 (app.py와 동일 경로) 후 스냅샷 갱신
+    """
+    if from_snapshot:
+        mkt = load_snapshot()
+        if mkt is None:
+            return None
+        age_hours, max_age_hours = snapshot_age(mkt) / 3600, get_snapshot_max_age_hours()
+        if age_hours <= max_age_hours:
+            print(f"📦 스냅샷 사용 (v{mkt['version']}, {age_hours:.1f}시간 전)")
+            return mkt
+        print(f"⚠️ 스냅샷이 {age_hours:.1f}시간 전 (한도 {max_age_hours:g}시간) → 실시간 수집으로 대체")
+    from market_data import get_market_snapshot
+    mkt = get_market_snapshot()
+    if mkt is not None:
+        try:
+            save_snapshot(mkt)
+        except OSError:
+            pass
+    return mkt
+
+def data_age_line(mkt):
+    """텔레그램 메시지용 데이터 기준 시점 (스냅샷이면 경과 시간, 실시간 수집이면 그 표시)"""
+    if 'created_at' in mkt:
+        return f"🕒 데이터: 스냅샷 v{mkt['version']} ({snapshot_age(mkt)/3600:.1f}시간 전 수집)\n"
+    return "🕒 데이터: 실시간 수집\n"
+
+def sniper_tier(qqq_mdd):
+    """스나이퍼 구간 (MDD 임계값 %, 예: -25). 발동 전(-15% 초과)이면 None"""
+    for tier in (-50, -45, -35, -25, -15):
+        if qqq_mdd <= tier / 100:
+            return tier
+    return None
+
+def evaluate_market(mkt, current_level):
+    """
+    판정 규칙 본체 (실시간 / 스냅샷 / 과거 재생(replay.py) 공통).
+    mkt: qqq_rsi_mo, qqq_mo_dev, qqq_mdd, tqqq_mdd, usd_krw, fx_10y_avg, fx_deviation 스칼라
+    반환: (브리핑 메시지(상태 블록 제외), 알림 발송 여부, 이벤트 코드 목록)
+    """
+    # 1. 지표 (원칙 0: 판정은 QQQ 월봉 단일 기준, MDD는 수정종가 기준)
+    qqq_rsi_mo = mkt['qqq_rsi_mo']
+    qqq_mo_dev = mkt['qqq_mo_dev']
+    qqq_mdd = mkt['qqq_mdd']
+    qqq_mdd_pct = qqq_mdd * 100
+    tqqq_mdd = mkt['tqqq_mdd']
+    tqqq_mdd_pct = tqqq_mdd * 100
+    usd_krw = mkt['usd_krw']
+    fx_10y_avg = mkt['fx_10y_avg']
+    fx_deviation = mkt['fx_deviation']
+
+    # 2. 알림 메시지 구성
+    alert_triggered = False
+    events = []
+    msg = f"🔥 **[Global Fire {APP_VERSION}] 긴급 브리핑** 🔥\n\n"
+
+    # [V24.5] Level 2(이격도) 버블 방어는 Level {BUBBLE_LEVEL2_GATE} 이상(자산 4억원 이상)에서만 발동.
+    is_seed_pumping_level = current_level < BUBBLE_LEVEL2_GATE
+
+    # [원칙 0] 마스터 인덱스: QQQ 월봉만으로 버블 판정. 주봉·SOXX는 표시 전용.
+    is_level2_bubble_raw = (qqq_mo_dev >= 1.0)
+    is_level2_bubble = is_level2_bubble_raw and (current_level >= BUBBLE_LEVEL2_GATE)
+    is_level1_bubble = (qqq_rsi_mo >= 80)
+    is_circuit_breaker = is_level1_bubble or is_level2_bubble
+
+    # (1) MDD 하이브리드 스나이퍼 감시 (1순위: 전시 상황) — 원칙 3: Last Bullet(15%) 영구 보존
+    if qqq_mdd <= -0.15:
+        events.append(f"sniper{sniper_tier(qqq_mdd)}")
+        msg += f"📉 **[스나이퍼 기회] QQQ MDD {qqq_mdd_pct:.1f}%**\n"
+
+        if qqq_mdd <= -0.50:
+            msg += "💣 **블랙 스완 (Last Bullet 발동)**\n👉 **ACTION:** 그동안 보존해온 '최후의 보루(보유 현금의 15%)' 전액 투입!\n"
+        elif qqq_mdd <= -0.45:
+            msg += "💥 **시스템 붕괴**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **40%** 영끌 투입! (15%는 Last Bullet로 계속 보존)\n"
+        elif qqq_mdd <= -0.35:
+            msg += "🏦 **대세 하락장 (2022년 수준)**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **30%** 투입.\n"
+        elif qqq_mdd <= -0.25:
+            msg += "🌪️ **중급 하락장 (코로나 초기 수준)**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **20%** 투입.\n"
+        else:
+            msg += "📉 **일반적인 조정장**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **10%** 투입.\n"
+
+        msg += "💡 *월급 적립금 500만원도 100% 주식 매수에 몰빵 (TQQQ 50 : USD 50)*\n"
+        msg += "🔄 *계좌 총수익률이 본전(0%) 이상 회복되면 목표 현금 비중으로 즉시 리로드(원상복구)*\n"
+        msg += "⚠️ *(우선순위 1순위 발동: 모든 버블 경보 무시)*\n\n"
+        alert_triggered = True
+
+    # (2) RSI 및 이격도 광기 감시 (2, 3순위 - 스나이퍼가 아닐 때만 발동)
+    elif is_circuit_breaker:
+        trigger_str = []
+        if is_level1_bubble: trigger_str.append(f"QQQ 월봉 RSI {qqq_rsi_mo:.1f}")
+        if is_level2_bubble: trigger_str.append(f"QQQ 120월 이격도 {qqq_mo_dev*100:.1f}% (LV{current_level}≥{BUBBLE_LEVEL2_GATE})")
+
+        trigger_msg = ", ".join(trigger_str)
+
+        if is_level2_bubble:
+            events.append("bubble_l2")
+            msg += f"🚨 **[역사적 버블 경보] {trigger_msg} 돌파!**\n"
+            msg += "👉 **ACTION:** 기존 목표 현금 비중에 **+20% 추가 확보**하여 비상 현금 비중 설정.\n"
+            msg += "👉 **ACTION:** TQQQ와 USD를 현재 보유 비중대로 비례 매도 (50:50 강제 금지, 세금 최소화).\n"
+            msg += "👉 **ACTION:** 신규 적립금 500만 원 전액 100% 현금(SGOV/BOXX) 매수.\n"
+            msg += "👉 **ACTION:** 확보된 비상금은 임의 주식 복구 금지 (스나이퍼용 대기).\n"
+        elif is_seed_pumping_level:
+            # [V24.5] Level {BUBBLE_LEVEL2_GATE} 미만 시드 펌핑 구간: 단기 과열(RSI 80)만으로 발동, 100% 현금 대신 리밸런싱만.
+            events.append("bubble_l1_seed")
+            msg += f"🔥 **[단기 과열 경보] {trigger_msg} 돌파! (시드 펌핑 구간 LV{current_level})**\n"
+            msg += "👉 **ACTION:** 현재 Level의 '기존 목표 현금 비중'에 미달하는 만큼만 단순 리밸런싱 매도.\n"
+            msg += "👉 **ACTION:** TQQQ와 USD를 현재 보유 비중대로 비례 매도 (50:50 강제 금지, 세금 최소화).\n"
+            msg += f"👉 **ACTION:** 신규 적립금 500만 원은 FOMO 방지를 위해 100% 현금 전환 없이 Level 목표 비중대로 기계적 매수 지속.\n"
+        else:
+            events.append("bubble_l1")
+            msg += f"🔥 **[단기 과열 경보] {trigger_msg} 돌파!**\n"
+            msg += "👉 **ACTION:** 현재 Level의 '기존 목표 현금 비중'에 미달하는 만큼만 단순 리밸런싱 매도.\n"
+            msg += "👉 **ACTION:** TQQQ와 USD를 현재 보유 비중대로 비례 매도 (50:50 강제 금지, 세금 최소화).\n"
+            msg += "👉 **ACTION:** 신규 적립금 500만 원 전액 100% 현금(SGOV/BOXX) 매수.\n"
+            msg += "👉 **ACTION:** 확보된 비상금은 임의 주식 복구 금지 (스나이퍼용 대기).\n"
+
+        msg += "⚠️ **Tax Shield:** 수익금의 22%는 세금 통장(C, 파킹통장/CMA)으로 격리.\n\n"
+        alert_triggered = True
+
+    # (2b) [V24.5] 이격도 버블이지만 시드 펌핑 구간(LV<{BUBBLE_LEVEL2_GATE})이라 의도적으로 무시된 경우 참고 안내
+    if is_level2_bubble_raw and not is_level2_bubble and not (qqq_mdd <= -0.15):
+        events.append("bubble_l2_ignored")
+        msg += f"🌱 **[참고] QQQ 120월 이격도 {qqq_mo_dev*100:.1f}% 초과 (역사적 버블권)**\n"
+        msg += f"👉 현재 Level {current_level}은 시드 펌핑 구간(LV<{BUBBLE_LEVEL2_GATE})이므로 역사적 버블 방어 룰을 의도적으로 무시하고 공격적으로 자산을 불립니다. (ATH_ASSETS_KRW 환경변수 기준)\n\n"
+
+    # (3) TQQQ 긴급 상황
+    if tqqq_mdd <= -0.3:
+        events.append("tqqq_crash")
+        msg += f"🚨 **[TQQQ 폭락] MDD {tqqq_mdd_pct:.1f}%**\n"
+        msg += "👉 3배 레버리지 급락. 방어선 유지 점검.\n\n"
+        alert_triggered = True
+
+    # (4) 환율 극단값 경보 (원칙 2-1)
+    if fx_deviation >= 0.20:
+        events.append("fx_extreme")
+        msg += f"💱 **[환율 경보] 10년 평균 대비 +{fx_deviation*100:.1f}% 폭등** (현재 ₩{usd_krw:,.0f} / 평균 ₩{fx_10y_avg:,.0f})\n"
+        msg += "👉 **ACTION:** 이번 달 환전은 4주 분할 환전으로 진행 (환율 예측 매매 아님, 심리 방어용).\n\n"
+        alert_triggered = True
+
+    return msg, alert_triggered, events
+
+def check_market_status(from_snapshot=False):
     print(f"🔍 시장 데이터 분석 중... ({APP_VERSION_FULL})")
     
     try:
-        # 데이터 수집 (QQQ 일봉 2년, 월봉 전체기간, SOXX 일봉 2년, 월봉 전체기간, TQQQ)
-        qqq = yf.download("QQQ", interval="1d", period="2y", progress=False, auto_adjust=False)
-        qqq_mo_data = yf.download("QQQ", interval="1mo", period="max", progress=False, auto_adjust=False)
-        tqqq = yf.download("TQQQ", interval="1d", period="2y", progress=False, auto_adjust=False)
-        soxx = yf.download("SOXX", interval="1d", period="2y", progress=False, auto_adjust=False)
-        soxx_mo_data = yf.download("SOXX", interval="1mo", period="max", progress=False, auto_adjust=False)
-        fx = yf.download("KRW=X", interval="1d", period="5d", progress=False, auto_adjust=False)
-        fx_10y = yf.download("KRW=X", interval="1d", period="10y", progress=False, auto_adjust=False)
-        
-        if qqq.empty or soxx.empty or qqq_mo_data.empty or soxx_mo_data.empty or tqqq.empty:
-            print("❌ 데이터 수집 실패")
+        mkt = load_market(from_snapshot)
+        if mkt is None:
+            print("❌ 데이터 수집 실패" if not from_snapshot else "❌ 스냅샷 없음 또는 만료 후 실시간 수집 실패 (python alert.py 로 먼저 실시간 수집 필요)")
             return
 
-        # 환율 (USD/KRW) - 실패해도 알림 전체가 죽지 않도록 별도 방어
-        if isinstance(fx.columns, pd.MultiIndex):
-            fx.columns = fx.columns.get_level_values(0)
-        if isinstance(fx_10y.columns, pd.MultiIndex):
-            fx_10y.columns = fx_10y.columns.get_level_values(0)
-        usd_krw = float(fx['Close'].iloc[-1]) if not fx.empty else None
-        # [원칙 2-1] 환율 극단값 방어: 10년 평균 대비 +20% 이상 폭등 시 분할 환전 경보
-        fx_10y_avg = float(fx_10y['Close'].mean()) if not fx_10y.empty else usd_krw
-        fx_deviation = (usd_krw / fx_10y_avg) - 1.0 if (usd_krw and fx_10y_avg) else 0
-
-        # MultiIndex 처리 (yfinance 최근 변경 대응)
-        for df in [qqq, qqq_mo_data, tqqq, soxx, soxx_mo_data]:
-            if isinstance(df.columns, pd.MultiIndex): 
-                df.columns = df.columns.get_level_values(0)
-
-        # 1. 지표 계산
-        # QQQ 주봉 RSI (금요일 마감 기준, 현재 진행형 포함)
-        qqq_wk = qqq[['Close']].resample('W-FRI').last().dropna()
-        qqq_wk['RSI'] = calculate_rsi(qqq_wk['Close'])
-        qqq_rsi_wk = float(qqq_wk['RSI'].iloc[-1])
-
-        # QQQ 월봉 RSI (period=max 데이터 사용)
-        qqq_mo_data['RSI'] = calculate_rsi(qqq_mo_data['Close'])
-        qqq_rsi_mo = float(qqq_mo_data['RSI'].iloc[-1]) if len(qqq_mo_data) >= 14 else 0
-
-        # QQQ 월봉 120개월 이평선 이격도 (진짜 120개월 MA, min_periods=120)
-        qqq_mo_data['MA120'] = qqq_mo_data['Close'].rolling(window=120, min_periods=120).mean()
-        _qqq_ma120_s = qqq_mo_data['MA120'].dropna()
-        _qqq_ma120 = float(_qqq_ma120_s.iloc[-1]) if not _qqq_ma120_s.empty else None
-        qqq_mo_dev = (float(qqq_mo_data['Close'].iloc[-1]) / _qqq_ma120) - 1.0 if _qqq_ma120 else 0
-
-        # QQQ MDD (원칙 0: 수정종가 기준, 장중 노이즈 제거)
-        _qqq_dd_col = 'Adj Close' if 'Adj Close' in qqq.columns else 'Close'
-        qqq['Roll_Max'] = qqq[_qqq_dd_col].cummax()
-        qqq['DD'] = (qqq[_qqq_dd_col] / qqq['Roll_Max']) - 1.0
-        qqq_mdd = float(qqq['DD'].iloc[-1])
-        qqq_mdd_pct = qqq_mdd * 100
-        qqq_price = float(qqq['Close'].iloc[-1])
-
-        # TQQQ MDD (수정종가 기준, 다운로드 전체 기간 cummax)
-        _tqqq_dd_col = 'Adj Close' if 'Adj Close' in tqqq.columns else 'Close'
-        tqqq['Roll_Max'] = tqqq[_tqqq_dd_col].cummax()
-        tqqq['DD'] = (tqqq[_tqqq_dd_col] / tqqq['Roll_Max']) - 1.0
-        tqqq_mdd = float(tqqq['DD'].iloc[-1]) if not tqqq.empty else 0
-        tqqq_mdd_pct = tqqq_mdd * 100
-
-        # SOXX MDD (수정종가 기준, 다운로드 전체 기간 cummax - rolling 252일이면 1년 신고가 시 0% 오류 방지)
-        _soxx_dd_col = 'Adj Close' if 'Adj Close' in soxx.columns else 'Close'
-        soxx['Roll_Max'] = soxx[_soxx_dd_col].cummax()
-        soxx['DD'] = (soxx[_soxx_dd_col] / soxx['Roll_Max']) - 1.0
-        soxx_mdd = float(soxx['DD'].iloc[-1]) if not soxx.empty else 0
-        soxx_mdd_pct = soxx_mdd * 100
-        soxx_price = float(soxx['Close'].iloc[-1]) if not soxx.empty else 0
-
-        # SOXX 주봉 RSI
-        soxx_wk = soxx[['Close']].resample('W-FRI').last().dropna()
-        soxx_wk['RSI'] = calculate_rsi(soxx_wk['Close'])
-        soxx_rsi_wk = float(soxx_wk['RSI'].iloc[-1]) if len(soxx_wk) >= 14 else 0
-
-        # SOXX 월봉 RSI 및 120개월 이평선 이격도 (period=max 데이터 사용, min_periods=120)
-        soxx_mo_data['RSI'] = calculate_rsi(soxx_mo_data['Close'])
-        soxx_rsi_mo = float(soxx_mo_data['RSI'].iloc[-1]) if len(soxx_mo_data) >= 14 else 0
-        soxx_mo_data['MA120'] = soxx_mo_data['Close'].rolling(window=120, min_periods=120).mean()
-        _soxx_ma120_s = soxx_mo_data['MA120'].dropna()
-        _soxx_ma120 = float(_soxx_ma120_s.iloc[-1]) if not _soxx_ma120_s.empty else None
-        soxx_mo_dev = (float(soxx_mo_data['Close'].iloc[-1]) / _soxx_ma120) - 1.0 if _soxx_ma120 else 0
-
-        # 2. 알림 메시지 구성
-        alert_triggered = False
-        msg = f"🔥 **[Global Fire {APP_VERSION}] 긴급 브리핑** 🔥\n\n"
-        
-        # [V24.5] Level 2(이격도) 버블 방어는 Level {BUBBLE_LEVEL2_GATE} 이상(자산 4억원 이상)에서만 발동.
-        # ATH_ASSETS_KRW 환경변수(미설정 시 0=LV.1)로 현재 Level을 판정한다.
+        # [V24.5] ATH_ASSETS_KRW 환경변수(미설정 시 0=LV.1)로 현재 Level을 판정한다.
         current_level, ath_assets_krw = get_current_level()
-        is_seed_pumping_level = current_level < BUBBLE_LEVEL2_GATE
-
-        # [원칙 0] 마스터 인덱스: QQQ 월봉만으로 버블 판정. 주봉·SOXX는 표시 전용.
-        is_level2_bubble_raw = (qqq_mo_dev >= 1.0)
-        is_level2_bubble = is_level2_bubble_raw and (current_level >= BUBBLE_LEVEL2_GATE)
-        is_level1_bubble = (qqq_rsi_mo >= 80)
-        is_circuit_breaker = is_level1_bubble or is_level2_bubble
-
-        # (1) MDD 하이브리드 스나이퍼 감시 (1순위: 전시 상황) — 원칙 3: Last Bullet(15%) 영구 보존
-        if qqq_mdd <= -0.15:
-            msg += f"📉 **[스나이퍼 기회] QQQ MDD {qqq_mdd_pct:.1f}%**\n"
-            
-            if qqq_mdd <= -0.50:
-                msg += "💣 **블랙 스완 (Last Bullet 발동)**\n👉 **ACTION:** 그동안 보존해온 '최후의 보루(보유 현금의 15%)' 전액 투입!\n"
-            elif qqq_mdd <= -0.45:
-                msg += "💥 **시스템 붕괴**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **40%** 영끌 투입! (15%는 Last Bullet로 계속 보존)\n"
-            elif qqq_mdd <= -0.35:
-                msg += "🏦 **대세 하락장 (2022년 수준)**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **30%** 투입.\n"
-            elif qqq_mdd <= -0.25:
-                msg += "🌪️ **중급 하락장 (코로나 초기 수준)**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **20%** 투입.\n"
-            else:
-                msg += "📉 **일반적인 조정장**\n👉 **ACTION:** 가용 현금(보유 현금의 85%)의 **10%** 투입.\n"
-            
-            msg += "💡 *월급 적립금 500만원도 100% 주식 매수에 몰빵 (TQQQ 50 : USD 50)*\n"
-            msg += "🔄 *계좌 총수익률이 본전(0%) 이상 회복되면 목표 현금 비중으로 즉시 리로드(원상복구)*\n"
-            msg += "⚠️ *(우선순위 1순위 발동: 모든 버블 경보 무시)*\n\n"
-            alert_triggered = True
-
-        # (2) RSI 및 이격도 광기 감시 (2, 3순위 - 스나이퍼가 아닐 때만 발동)
-        elif is_circuit_breaker:
-            trigger_str = []
-            if is_level1_bubble: trigger_str.append(f"QQQ 월봉 RSI {qqq_rsi_mo:.1f}")
-            if is_level2_bubble: trigger_str.append(f"QQQ 120월 이격도 {qqq_mo_dev*100:.1f}% (LV{current_level}≥{BUBBLE_LEVEL2_GATE})")
-            
-            trigger_msg = ", ".join(trigger_str)
-
-            if is_level2_bubble:
-                msg += f"🚨 **[역사적 버블 경보] {trigger_msg} 돌파!**\n"
-                msg += "👉 **ACTION:** 기존 목표 현금 비중에 **+20% 추가 확보**하여 비상 현금 비중 설정.\n"
-                msg += "👉 **ACTION:** TQQQ와 USD를 현재 보유 비중대로 비례 매도 (50:50 강제 금지, 세금 최소화).\n"
-                msg += "👉 **ACTION:** 신규 적립금 500만 원 전액 100% 현금(SGOV/BOXX) 매수.\n"
-                msg += "👉 **ACTION:** 확보된 비상금은 임의 주식 복구 금지 (스나이퍼용 대기).\n"
-            elif is_seed_pumping_level:
-                # [V24.5] Level {BUBBLE_LEVEL2_GATE} 미만 시드 펌핑 구간: 단기 과열(RSI 80)만으로 발동, 100% 현금 대신 리밸런싱만.
-                msg += f"🔥 **[단기 과열 경보] {trigger_msg} 돌파! (시드 펌핑 구간 LV{current_level})**\n"
-                msg += "👉 **ACTION:** 현재 Level의 '기존 목표 현금 비중'에 미달하는 만큼만 단순 리밸런싱 매도.\n"
-                msg += "👉 **ACTION:** TQQQ와 USD를 현재 보유 비중대로 비례 매도 (50:50 강제 금지, 세금 최소화).\n"
-                msg += f"👉 **ACTION:** 신규 적립금 500만 원은 FOMO 방지를 위해 100% 현금 전환 없이 Level 목표 비중대로 기계적 매수 지속.\n"
-            else:
-                msg += f"🔥 **[단기 과열 경보] {trigger_msg} 돌파!**\n"
-                msg += "👉 **ACTION:** 현재 Level의 '기존 목표 현금 비중'에 미달하는 만큼만 단순 리밸런싱 매도.\n"
-                msg += "👉 **ACTION:** TQQQ와 USD를 현재 보유 비중대로 비례 매도 (50:50 강제 금지, 세금 최소화).\n"
-                msg += "👉 **ACTION:** 신규 적립금 500만 원 전액 100% 현금(SGOV/BOXX) 매수.\n"
-                msg += "👉 **ACTION:** 확보된 비상금은 임의 주식 복구 금지 (스나이퍼용 대기).\n"
-
-            msg += "⚠️ **Tax Shield:** 수익금의 22%는 세금 통장(C, 파킹통장/CMA)으로 격리.\n\n"
-            alert_triggered = True
-
-        # (2b) [V24.5] 이격도 버블이지만 시드 펌핑 구간(LV<{BUBBLE_LEVEL2_GATE})이라 의도적으로 무시된 경우 참고 안내
-        if is_level2_bubble_raw and not is_level2_bubble and not (qqq_mdd <= -0.15):
-            msg += f"🌱 **[참고] QQQ 120월 이격도 {qqq_mo_dev*100:.1f}% 초과 (역사적 버블권)**\n"
-            msg += f"👉 현재 Level {current_level}은 시드 펌핑 구간(LV<{BUBBLE_LEVEL2_GATE})이므로 역사적 버블 방어 룰을 의도적으로 무시하고 공격적으로 자산을 불립니다. (ATH_ASSETS_KRW 환경변수 기준)\n\n"
-
-        # (3) TQQQ 긴급 상황
-        if tqqq_mdd <= -0.3:
-            msg += f"🚨 **[TQQQ 폭락] MDD {tqqq_mdd_pct:.1f}%**\n"
-            msg += "👉 3배 레버리지 급락. 방어선 유지 점검.\n\n"
-            alert_triggered = True
-
-        # (4) 환율 극단값 경보 (원칙 2-1)
-        if fx_deviation >= 0.20:
-            msg += f"💱 **[환율 경보] 10년 평균 대비 +{fx_deviation*100:.1f}% 폭등** (현재 ₩{usd_krw:,.0f} / 평균 ₩{fx_10y_avg:,.0f})\n"
-            msg += "👉 **ACTION:** 이번 달 환전은 4주 분할 환전으로 진행 (환율 예측 매매 아님, 심리 방어용).\n\n"
-            alert_triggered = True
+        msg, alert_triggered, _ = evaluate_market(mkt, current_level)
         
         # 3. 결과 전송
-        _qqq_ma120_str = f"${_qqq_ma120:.2f}" if _qqq_ma120 else "N/A"
-        _soxx_ma120_str = f"${_soxx_ma120:.2f}" if _soxx_ma120 else "N/A"
-        _usd_krw_str = f"₩{usd_krw:,.2f}" if usd_krw else "N/A"
-
-        status_block = (
-            f"📊 *Status Check*\n"
-            f"• Level: LV.{current_level} (ATH ₩{ath_assets_krw:,.0f}) │ 이격도 버블 게이트: LV≥{BUBBLE_LEVEL2_GATE}\n"
-            f"• QQQ: ${qqq_price:.2f} │ 주봉RSI {qqq_rsi_wk:.1f} / 월봉RSI {qqq_rsi_mo:.1f} │ 120월 이격도 {qqq_mo_dev*100:.1f}% ({_qqq_ma120_str}) │ MDD {qqq_mdd_pct:.2f}% (수정종가)\n"
-            f"• SOXX: ${soxx_price:.2f} │ 주봉RSI {soxx_rsi_wk:.1f} / 월봉RSI {soxx_rsi_mo:.1f} │ 120월 이격도 {soxx_mo_dev*100:.1f}% ({_soxx_ma120_str}) │ MDD {soxx_mdd_pct:.2f}%\n"
-            f"• TQQQ: MDD {tqqq_mdd_pct:.2f}%\n"
-            f"• USD/KRW: {_usd_krw_str} │ 10년 평균 대비 {fx_deviation*100:+.1f}%\n"
-        )
+        status_block = build_status_block(mkt, current_level, ath_assets_krw) + data_age_line(mkt)
         if alert_triggered:
             msg += status_block
             send_telegram(msg)
@@ -247,11 +264,13 @@ def check_market_status():
                 health_msg += status_block
                 health_msg += "💡 평시 적립: 월급 500만 원은 Level 목표 비중에 맞춰 분할 투입."
                 send_telegram(health_msg)
-            print(f"✅ 시장 양호 (QQQ 주봉 RSI: {qqq_rsi_wk:.1f}, MDD: {qqq_mdd_pct:.1f}%) - 알림 미발송")
+            print(f"✅ 시장 양호 (QQQ 주봉 RSI: {mkt['qqq_rsi_wk']:.1f}, MDD: {mkt['qqq_mdd']*100:.1f}%) - 알림 미발송")
 
     except Exception as e:
         print(f"❌ 에러 발생: {e}")
         send_telegram(f"⚠️ [System Error] {APP_VERSION_FULL} 알림 스크립트 오류 발생:\n{e}")
 
 if __name__ == "__main__":
-    check_market_status()
\ No newline at end of file
+    # --from-snapshot (또는 ALERT_FROM_SNAPSHOT=true): 마지막 실시간 수집 결과로 판정만 재실행
+    check_market_status(from_snapshot="--from-snapshot" in sys.argv or
+                        os.environ.get('ALERT_FROM_SNAPSHOT', 'false').lower() == 'true')
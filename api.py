@@ -0,0 +1,272 @@
+"""
+로컬 읽기 전용 JSON API (표준 라이브러리 http.server, 새 다운로드 없음)
+스프레드시트 / 홈 디스플레이 / 다른 봇이 Streamlit 화면을 긁지 않고 대시보드와 같은 숫자를 읽어 가는 창구.
+시장 값은 공유 스냅샷(market_snapshot.json, app.py / alert.py가 갱신)에서만 읽고,
+응답 바이트는 스냅샷 파일이 바뀔 때 미리 직렬화해 두며 ETag(본문 해시) / If-None-Match(304)를 지원한다.
+
+  GET  /v1/market             get_market_data()와 같은 값 (가격 / 주봉·월봉 RSI / 120월 이격도 / MDD / 환율 편차 + 종목별 행)
+  GET  /v1/alert?level=7      alert.evaluate_market() 판정 (이벤트 코드, 알림 여부, 브리핑 문구)
+  POST /v1/decision           포트폴리오 1건 → portfolio.evaluate_portfolio() 결과 (대시보드 2~3번 섹션과 동일)
+  POST /v1/decision/batch     {"portfolios": [...]} → 결과 목록 (건별 오류는 {"error": ...})
+  POST /v1/orders/batch       {"portfolios": [...], "step": 1, "rounding": "nearest"} → 계좌·종목별 매도 주문 수량
+                              (order_planner.py, 판정의 sell_krw를 전체 배치 한 번에 벡터 계산)
+  GET  /v1/health             스냅샷 버전 / 경과 시간
+
+사용법: python api.py [--host 127.0.0.1] [--port 8502]   (처리량 측정은 bench_api.py)
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from alert import evaluate_market
+from order_planner import plan_portfolios, plan_summary
+from portfolio import evaluate_portfolio, normalize_portfolio
+from snapshot import SNAPSHOT_FILE, load_snapshot, snapshot_age
+from version import APP_VERSION_FULL
+
+API_HOST = os.environ.get("GF_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("GF_API_PORT", "8502"))
+BATCH_LIMIT = 1000            # 배치 1회 최대 포트폴리오 수
+MAX_BODY = 4 * 1024 * 1024    # 요청 본문 상한 (바이트)
+DECISION_MEMO_SIZE = 4096     # (스냅샷 버전, 포트폴리오)별 판정 메모 크기
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _market_entry(snap):
+    """(ETag, /v1/market 본문). ETag는 본문 바이트 해시 — 지표가 같아도 created_at이 바뀌면 다른 ETag (304로 옛 경과 시간 유지 방지)"""
+    body = _dumps(snap)
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"', body
+
+class SnapshotCache:
+    """스냅샷 파일이 바뀌었을 때만 다시 읽고, 버전별 응답 바이트·판정을 메모"""
+
+    def __init__(self, path=None):
+        self.path = path or SNAPSHOT_FILE
+        self.mtime = None
+        self.snap = None
+        self.market = (None, None)  # (ETag, 직렬화된 /v1/market 본문) — 한 번에 교체
+        self.alerts = {}
+        self.decisions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def current(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        if mtime != self.mtime:
+            with self.lock:
+                if mtime != self.mtime:
+                    snap = load_snapshot(path=self.path)
+                    self.snap = snap
+                    self.market = _market_entry(snap) if snap else (None, None)
+                    self.alerts = {}
+                    self.decisions = OrderedDict()
+                    self.mtime = mtime
+        return self.snap
+
+    def alert_body(self, snap, level):
+        key = (snap['version'], level)
+        body = self.alerts.get(key)
+        if body is None:
+            msg, triggered, events = evaluate_market(snap, level)
+            body = self.alerts[key] = _dumps({'version': snap['version'], 'level': level,
+                                              'alert': triggered, 'events': events, 'message': msg})
+        return body
+
+    def decide(self, snap, data):
+        """포트폴리오 dict 1건 → 판정 dict. 같은 스냅샷 버전에서 같은 입력이면 메모 재사용"""
+        p = normalize_portfolio(data)
+        key = (snap['version'],) + tuple(p.values())
+        with self.lock:
+            result = self.decisions.get(key)
+            if result is not None:
+                self.decisions.move_to_end(key)
+                return result
+        result = evaluate_portfolio(snap, p)
+        with self.lock:
+            self.decisions[key] = result
+            if len(self.decisions) > DECISION_MEMO_SIZE:
+                self.decisions.popitem(last=False)
+        return result
+
+    def decide_batch(self, snap, portfolios):
+        results = []
+        for data in portfolios:
+            if not isinstance(data, dict):
+                results.append({'error': "포트폴리오는 JSON 객체여야 합니다"})
+                continue
+            try:
+                results.append(self.decide(snap, data))
+            except ValueError as e:
+                results.append({'error': str(e)})
+        return results
+
+    def plan_batch(self, snap, portfolios, step=1.0, rounding="nearest"):
+        """포트폴리오 목록 → 건별 {'decision', 'plan'} (주문 수량은 정상 건 전체를 한 번에 계산)"""
+        results, valid, decisions, slots = [], [], [], []
+        for data in portfolios:
+            if not isinstance(data, dict):
+                results.append({'error': "포트폴리오는 JSON 객체여야 합니다"})
+                continue
+            try:
+                p = normalize_portfolio(data)
+            except ValueError as e:
+                results.append({'error': str(e)})
+                continue
+            slots.append(len(results))
+            results.append(None)
+            valid.append(p)
+            decisions.append(self.decide(snap, p))
+        if valid:
+            plan = plan_portfolios(snap, valid, decisions, step=step, rounding=rounding)
+            for i, (slot, d) in enumerate(zip(slots, decisions)):
+                results[slot] = {'final_action': d['final_action'], 'sell_krw': d['sell_krw'], **plan_summary(plan, i)}
+        return results
+
+def make_server(cache=None, host=API_HOST, port=API_PORT):
+    """SnapshotCache를 HTTP로 노출하는 ThreadingHTTPServer (HTTP/1.1 keep-alive)"""
+    cache = cache or SnapshotCache()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # 헤더/본문이 따로 전송되므로 Nagle + delayed ACK(~40ms) 지연 방지
+        server_version = f"GlobalFireAPI/{APP_VERSION_FULL.split()[0]}"
+
+        def _send(self, status, body=b"", etag=None):
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if status != 304:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def _snapshot(self):
+            snap = cache.current()
+            if snap is None:
+                raise ApiError(503, "시장 스냅샷 없음 (python alert.py 또는 대시보드 실행 후 생성됨)")
+            return snap
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY:
+                raise ApiError(413 if length > MAX_BODY else 400, "요청 본문이 없거나 너무 큽니다")
+            try:
+                return json.loads(self.rfile.read(length))
+            except ValueError:
+                raise ApiError(400, "JSON 형식 오류")
+
+        def _dispatch(self, method):
+            url = urlparse(self.path)
+            route = (method, url.path.rstrip("/"))
+            if route == ("GET", "/v1/market"):
+                self._snapshot()
+                etag, body = cache.market
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, etag=etag)
+                return self._send(200, body, etag)
+            if route == ("GET", "/v1/alert"):
+                snap = self._snapshot()
+                try:
+                    level = int(parse_qs(url.query).get('level', ["1"])[0])
+                except ValueError:
+                    raise ApiError(400, "level은 1~18 정수")
+                if not 1 <= level <= 18:
+                    raise ApiError(400, "level은 1~18 정수")
+                etag = f'"{snap["version"]}-{level}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, etag=etag)
+                return self._send(200, cache.alert_body(snap, level), etag)
+            if route == ("POST", "/v1/decision"):
+                snap = self._snapshot()
+                data = self._read_json()
+                if not isinstance(data, dict):
+                    raise ApiError(400, "포트폴리오는 JSON 객체여야 합니다")
+                try:
+                    result = cache.decide(snap, data)
+                except ValueError as e:
+                    raise ApiError(400, str(e))
+                return self._send(200, _dumps({'version': snap['version'], 'decision': result}))
+            if route == ("POST", "/v1/decision/batch"):
+                snap = self._snapshot()
+                data = self._read_json()
+                portfolios = data.get('portfolios') if isinstance(data, dict) else data
+                if not isinstance(portfolios, list):
+                    raise ApiError(400, '{"portfolios": [...]} 형식이어야 합니다')
+                if len(portfolios) > BATCH_LIMIT:
+                    raise ApiError(413, f"배치 최대 {BATCH_LIMIT}건")
+                return self._send(200, _dumps({'version': snap['version'], 'results': cache.decide_batch(snap, portfolios)}))
+            if route == ("POST", "/v1/orders/batch"):
+                snap = self._snapshot()
+                data = self._read_json()
+                portfolios = data.get('portfolios') if isinstance(data, dict) else None
+                if not isinstance(portfolios, list):
+                    raise ApiError(400, '{"portfolios": [...]} 형식이어야 합니다')
+                if len(portfolios) > BATCH_LIMIT:
+                    raise ApiError(413, f"배치 최대 {BATCH_LIMIT}건")
+                try:
+                    step = float(data.get('step', 1))
+                except (TypeError, ValueError):
+                    raise ApiError(400, "step은 0보다 큰 숫자")
+                try:
+                    results = cache.plan_batch(snap, portfolios, step, data.get('rounding', "nearest"))
+                except ValueError as e:
+                    raise ApiError(400, str(e))
+                return self._send(200, _dumps({'version': snap['version'], 'results': results}))
+            if route == ("GET", "/v1/health"):
+                snap = cache.current()
+                return self._send(200, _dumps({'ok': snap is not None, 'app': APP_VERSION_FULL,
+                                               'version': snap and snap['version'],
+                                               'age_sec': snap and round(snapshot_age(snap), 1)}))
+            raise ApiError(404, f"알 수 없는 경로: {method} {url.path}")
+
+        def _handle(self, method):
+            try:
+                self._dispatch(method)
+            except ApiError as e:
+                self._send(e.status, _dumps({'error': str(e)}))
+            except Exception as e:
+                self._send(500, _dumps({'error': f"처리 오류: {e}"}))
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Global Fire 로컬 읽기 전용 JSON API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    server = make_server(host=args.host, port=args.port)
+    snap = load_snapshot()
+    print(f"🌐 Global Fire API ({APP_VERSION_FULL}) │ http://{args.host}:{server.server_address[1]}/v1/market │ "
+          + (f"스냅샷 v{snap['version']} ({snapshot_age(snap)/3600:.1f}시간 전)" if snap else "⚠️ 스냅샷 없음"))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 종료")
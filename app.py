@@ -1,15 +1,21 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import plotly.graph_objects as go
 import json
 import os
+import datetime
 from version import APP_VERSION, APP_VERSION_FULL, APP_NAME
+from levels import LEVEL_CONFIG
+from universe import load_universe
+from portfolio import PORTFOLIO_FIELDS, evaluate_portfolio, format_krw, normalize_portfolio
+from snapshot import save_snapshot
+from panel_cache import content_key, memo, read_text, stats as panel_cache_stats
+# pandas / yfinance / numpy 계열(market_data, drawdown, forecast, synthetic)과 plotly는 사용하는 함수·섹션 안에서 import.
+# 첫 화면(타이틀/규정집)이 무거운 모듈 로딩을 기다리지 않도록 하기 위함 (cold start 단축, bench_startup.py 참고)
 
 # ==========================================
 # 0. 데이터 영구 저장 (Persistence)
 # ==========================================
 DATA_FILE = "portfolio_data.json"
+EQUITY_FILE = "equity_history.json"  # 일별 총자산 기록 (Drawdown 엔진 입력용)
 
 def load_data():
     """JSON 파일에서 데이터 로드, 없으면 기본값 반환"""
@@ -30,6 +36,7 @@ def load_data():
         "c_cash_krw": 0,
         "d_cash_krw": 0,  # V24.4: 계좌 D (가족 생존 계좌) - 투자 절대 금지
         "ath_assets": 0,  # V23.3: 래칫 원칙을 위한 최고 자산액
+        "realized_ytd_krw": 0,  # 올해 실현한 해외주식 양도차익 (양도세 기본공제 잔여분 계산용)
         "sniper_mode_active": False  # V24.4: 스나이핑 원상복구(Break-Even Reload) 추적 플래그
     }
     if os.path.exists(DATA_FILE):
@@ -63,11 +70,36 @@ def save_data():
         "c_cash_krw": st.session_state.c_cash_krw,
         "d_cash_krw": st.session_state.d_cash_krw,
         "ath_assets": st.session_state.ath_assets,
+        "realized_ytd_krw": st.session_state.realized_ytd_krw,
         "sniper_mode_active": st.session_state.sniper_mode_active
     }
     with open(DATA_FILE, "w") as f:
         json.dump(data, f)
 
+def load_equity_history():
+    """일별 총자산 기록 로드 ({'YYYY-MM-DD': 총자산})"""
+    if os.path.exists(EQUITY_FILE):
+        try:
+            with open(EQUITY_FILE, "r") as f:
+                return json.load(f)
+        except:
+            return {}
+    return {}
+
+def record_equity(total_assets):
+    """오늘 날짜의 총자산 기록 (같은 날짜는 덮어쓰기, 값이 같으면 파일 쓰기 생략)"""
+    history = load_equity_history()
+    today = datetime.date.today().isoformat()
+    value = int(round(total_assets))
+    if history.get(today) == value: return history
+    history[today] = value
+    try:
+        with open(EQUITY_FILE, "w") as f:
+            json.dump(history, f)
+    except:
+        pass
+    return history
+
 # ==========================================
 # 1. 설정 및 상수
 # ==========================================
@@ -77,29 +109,8 @@ st.set_page_config(page_title=f"{APP_NAME} {APP_VERSION}", layout="wide", page_i
 # 120월 이격도 100% 초과 룰을 완전히 무시하고 공격적으로 자산을 불린다 (RSI 80 룰은 전 레벨 유지).
 BUBBLE_LEVEL2_GATE = 7
 
-# V24.1 Level Configuration
-LEVEL_CONFIG = {
-    1: {"limit": 50000000, "target_stock": 0.95, "target_cash": 0.05, "name": "LV. 1 (~5천만)"},
-    2: {"limit": 100000000, "target_stock": 0.90, "target_cash": 0.10, "name": "LV. 2 (~1억)"},
-    3: {"limit": 150000000, "target_stock": 0.875, "target_cash": 0.125, "name": "LV. 3 (~1.5억)"},
-    4: {"limit": 200000000, "target_stock": 0.85, "target_cash": 0.15, "name": "LV. 4 (~2억)"},
-    5: {"limit": 300000000, "target_stock": 0.825, "target_cash": 0.175, "name": "LV. 5 (~3억)"},
-    6: {"limit": 400000000, "target_stock": 0.80, "target_cash": 0.20, "name": "LV. 6 (~4억)"},
-    7: {"limit": 550000000, "target_stock": 0.775, "target_cash": 0.225, "name": "LV. 7 (~5.5억)"},
-    8: {"limit": 700000000, "target_stock": 0.75, "target_cash": 0.25, "name": "LV. 8 (~7억)"},
-    9: {"limit": 850000000, "target_stock": 0.725, "target_cash": 0.275, "name": "LV. 9 (~8.5억)"},
-    10: {"limit": 1000000000, "target_stock": 0.70, "target_cash": 0.30, "name": "LV. 10 (~10억) [🎯 1차: 육아/퇴사]"},
-    11: {"limit": 1250000000, "target_stock": 0.675, "target_cash": 0.325, "name": "LV. 11 (~12.5억)"},
-    12: {"limit": 1500000000, "target_stock": 0.65, "target_cash": 0.35, "name": "LV. 12 (~15억)"},
-    13: {"limit": 1750000000, "target_stock": 0.625, "target_cash": 0.375, "name": "LV. 13 (~17.5억)"},
-    14: {"limit": 2000000000, "target_stock": 0.60, "target_cash": 0.40, "name": "LV. 14 (~20억)"},
-    15: {"limit": 2300000000, "target_stock": 0.575, "target_cash": 0.425, "name": "LV. 15 (~23억) [🎯 2차: Coast FIRE]"},
-    16: {"limit": 2600000000, "target_stock": 0.55, "target_cash": 0.45, "name": "LV. 16 (~26억)"},
-    17: {"limit": 3000000000, "target_stock": 0.525, "target_cash": 0.475, "name": "LV. 17 (~30억)"},
-    18: {"limit": float('inf'), "target_stock": 0.50, "target_cash": 0.50, "name": "LV. 18 (30억+) [🎯 Global FIRE]"}
-}
-
-PROTOCOL_TEXT = f"""
+def _protocol_text():
+    return f"""
 ### 📜 Master Protocol (요약) - Ver {APP_VERSION} The Ultimate Simple
 0.  **[기준 지표/데이터 표준]** 모든 경보는 **QQQ 월봉(달러 차트)** 단일 기준. 주봉·SOXX는 참고용. MDD는 **수정종가(Adj Close)** 기준, 월봉 지표는 **월 마지막 거래일 종가**로 확정.
     **[우선순위]** 1순위: QQQ MDD -15% (전시/스나이퍼) > 2순위: QQQ 이격도 100% (역사적 버블, 🚨 Level {BUBBLE_LEVEL2_GATE} 이상 한정) > 3순위: QQQ 월봉 RSI 80 (단기 과열, 전 Level 공통)
@@ -121,108 +132,60 @@ PROTOCOL_TEXT = f"""
 12. **[블랙 스완 & 가족 생존]:** 계좌 D(최소 12~24개월 생활비)는 투자와 완전 분리, 스나이퍼 총알로 전용 금지. ETF 내부 레버리지 외 신용융자/마진 등 외부 레버리지 절대 금지.
 """
 
+# rerun마다 f-string을 다시 만들지 않도록 버전·게이트 기준으로 panel_cache에 보관 (세션 간 공유)
+PROTOCOL_TEXT = memo("protocol", (APP_VERSION, BUBBLE_LEVEL2_GATE), _protocol_text)
+
 # ==========================================
 # 2. 유틸리티 함수
 # ==========================================
-def calculate_indicators(df, price_col='Close'):
-    """RSI 및 MDD(Drawdown) 계산. price_col='Adj Close' 지정 시 수정종가 기준으로 MDD 계산 (원칙 0)."""
-    if df.empty: return 0, 0
-    col = price_col if price_col in df.columns else 'Close'
-    delta = df[col].diff()
-    gain = delta.clip(lower=0)
-    loss = (-delta).clip(lower=0)
-    avg_gain = gain.ewm(alpha=1/14, adjust=False, min_periods=14).mean()
-    avg_loss = loss.ewm(alpha=1/14, adjust=False, min_periods=14).mean()
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    df['Roll_Max'] = df[col].cummax()
-    df['DD'] = (df[col] / df['Roll_Max']) - 1.0
-    return float(df['RSI'].iloc[-1]), float(df['DD'].iloc[-1])
+@st.cache_resource(ttl=600, show_spinner=False)
+def _load_market_store():
+    """유니버스 전체 수집 → 불변 MarketStore. 프로세스당 1개를 모든 세션이 공유 (10분 TTL, 실패는 캐시하지 않음)"""
+    from market_data import get_market_snapshot
+    from market_store import build_market_store
+    mkt = get_market_snapshot(load_universe())
+    if mkt is None: raise RuntimeError("시장 데이터 수집 실패")
+    store = build_market_store(mkt)
+    try:
+        save_snapshot(store)  # alert.py --from-snapshot 등 스냅샷 전용 경로용
+    except OSError:
+        pass
+    return store
 
 def get_market_data():
     try:
-        qqq_dy = yf.download("QQQ", interval="1d", period="2y", progress=False, auto_adjust=False)
-        qqq_mo = yf.download("QQQ", interval="1mo", period="max", progress=False, auto_adjust=False)
-        soxx_mo = yf.download("SOXX", interval="1mo", period="max", progress=False, auto_adjust=False)
-        tqqq_wk = yf.download("TQQQ", interval="1wk", period="2y", progress=False, auto_adjust=False)
-        usd_wk = yf.download("USD", interval="1wk", period="2y", progress=False, auto_adjust=False)
-        soxx_dy = yf.download("SOXX", interval="1d", period="2y", progress=False, auto_adjust=False)
-        exch = yf.download("KRW=X", period="1d", progress=False, auto_adjust=False)
-        exch_10y = yf.download("KRW=X", period="10y", progress=False, auto_adjust=False)
-        
-        if qqq_dy.empty or exch.empty or tqqq_wk.empty or usd_wk.empty or soxx_dy.empty or qqq_mo.empty or soxx_mo.empty: return None
-
-        for d in [qqq_dy, qqq_mo, soxx_mo, tqqq_wk, usd_wk, soxx_dy, exch, exch_10y]:
-            if isinstance(d.columns, pd.MultiIndex): d.columns = d.columns.get_level_values(0)
-
-        current_rate = float(exch['Close'].iloc[-1])
-        # [원칙 2-1] 환율 극단값 방어: 10년 평균 대비 +20% 이상이면 분할 환전 경보
-        fx_10y_avg = float(exch_10y['Close'].mean()) if not exch_10y.empty else current_rate
-        fx_deviation = (current_rate / fx_10y_avg) - 1.0 if fx_10y_avg else 0
-        qqq_price = float(qqq_dy['Close'].iloc[-1])
-        tqqq_price = float(tqqq_wk['Close'].iloc[-1])
-        usd_price = float(usd_wk['Close'].iloc[-1])
-        soxx_price = float(soxx_dy['Close'].iloc[-1])
-        
-        # QQQ 주봉 RSI (일봉 → W-FRI 리샘플링, 진행 중인 주 포함)
-        qqq_wk_for_rsi = qqq_dy[['Open', 'High', 'Low', 'Close', 'Volume']].resample('W-FRI').agg({
-            'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
-        calculate_indicators(qqq_wk_for_rsi)
-        qqq_rsi_wk = float(qqq_wk_for_rsi['RSI'].iloc[-1])
-
-        # QQQ 월봉 RSI (원칙 1-3: 월봉 RSI 80 단일 기준)
-        qqq_rsi_mo, _ = calculate_indicators(qqq_mo)
-        
-        # QQQ 월봉 120개월 이평선 이격도 (period=max 데이터로 진짜 120개월 MA 계산)
-        qqq_mo['MA120'] = qqq_mo['Close'].rolling(window=120, min_periods=120).mean()
-        _qqq_ma120_series = qqq_mo['MA120'].dropna()
-        _qqq_ma120 = float(_qqq_ma120_series.iloc[-1]) if not _qqq_ma120_series.empty else None
-        qqq_mo_dev = (float(qqq_mo['Close'].iloc[-1]) / _qqq_ma120) - 1.0 if _qqq_ma120 else 0
-        
-        # MDD 및 RSI 계산 (원칙 0: QQQ MDD는 '수정종가(Adj Close)' 기준으로 노이즈 제거)
-        calculate_indicators(qqq_dy, price_col='Adj Close')
-        qqq_mdd = float(qqq_dy['DD'].iloc[-1])
-        
-        tqqq_rsi_wk, tqqq_mdd = calculate_indicators(tqqq_wk, price_col='Adj Close')
-        usd_rsi_wk, usd_mdd = calculate_indicators(usd_wk, price_col='Adj Close')
-        
-        # SOXX RSI (일봉 → W-FRI 리샘플링) + MDD (cummax 전체 기간 기준)
-        soxx_wk_for_rsi = soxx_dy[['Open', 'High', 'Low', 'Close', 'Volume']].resample('W-FRI').agg({
-            'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
-        calculate_indicators(soxx_wk_for_rsi)
-        soxx_rsi_wk = float(soxx_wk_for_rsi['RSI'].iloc[-1])
-
-        # SOXX 월봉 RSI 및 120개월 이평선 이격도 (period=max 데이터로 진짜 120개월 MA 계산)
-        soxx_rsi_mo, _ = calculate_indicators(soxx_mo)
-        soxx_mo['MA120'] = soxx_mo['Close'].rolling(window=120, min_periods=120).mean()
-        _soxx_ma120_series = soxx_mo['MA120'].dropna()
-        _soxx_ma120 = float(_soxx_ma120_series.iloc[-1]) if not _soxx_ma120_series.empty else None
-        soxx_mo_dev = (float(soxx_mo['Close'].iloc[-1]) / _soxx_ma120) - 1.0 if _soxx_ma120 else 0
-
-        _soxx_dd_col = 'Adj Close' if 'Adj Close' in soxx_dy.columns else 'Close'
-        soxx_dy['Roll_Max'] = soxx_dy[_soxx_dd_col].cummax()
-        soxx_dy['DD'] = (soxx_dy[_soxx_dd_col] / soxx_dy['Roll_Max']) - 1.0
-        soxx_mdd = float(soxx_dy['DD'].iloc[-1])
-
-        return {
-            'qqq_dy': qqq_dy, 'qqq_price': qqq_price,
-            'qqq_rsi_wk': qqq_rsi_wk, 'qqq_rsi_mo': qqq_rsi_mo, 'qqq_mdd': qqq_mdd, 'qqq_mo_dev': qqq_mo_dev,
-            'soxx_dy': soxx_dy, 'soxx_price': soxx_price, 'soxx_rsi_wk': soxx_rsi_wk, 'soxx_rsi_mo': soxx_rsi_mo, 'soxx_mdd': soxx_mdd, 'soxx_mo_dev': soxx_mo_dev,
-            'tqqq_wk': tqqq_wk, 'tqqq_price': tqqq_price, 'tqqq_rsi_wk': tqqq_rsi_wk, 'tqqq_mdd': tqqq_mdd,
-            'usd_wk': usd_wk, 'usd_price': usd_price, 'usd_rsi_wk': usd_rsi_wk, 'usd_mdd': usd_mdd,
-            'usd_krw': current_rate, 'fx_10y_avg': fx_10y_avg, 'fx_deviation': fx_deviation
-        }
+        return _load_market_store()
     except Exception as e:
         return None
 
-def determine_level(ath_assets):
-    for level, config in sorted(LEVEL_CONFIG.items()):
-        if ath_assets <= config['limit']: return level
-    return 18
-
-def format_krw(value):
-    return f"{int(value):,}원"
+@st.cache_resource(ttl=3600, show_spinner=False)
+def get_full_history():
+    """Drawdown 엔진용 전체 기간(period=max) 일봉 수정종가. 1시간 캐시, 세션 간 공유 (읽기 전용으로 사용)"""
+    from market_data import download_panel
+    tickers = ["QQQ", "SOXX", "TQQQ", "USD"]
+    try:
+        panel = download_panel(tickers, "1d", "max")
+    except Exception:
+        panel = None
+    if panel is None: return {}
+    adj = panel.get('Adj Close', panel['Close'])
+    return {t: adj[t].dropna() for t in tickers if adj[t].notna().any()}
+
+@st.cache_data(show_spinner=False)
+def get_level_forecast(start, monthly_contribution, n_paths, years, use_synthetic=False):
+    """TQQQ/USD 전체 기간 월간 수익률 블록 부트스트랩 기반 레벨 도달 예측 (입력이 같으면 캐시 재사용, seed 고정)"""
+    import pandas as pd
+    from forecast import simulate_level_progression, monthly_returns
+    from synthetic import load_synthetic_history
+    if use_synthetic:
+        synth = load_synthetic_history()
+        history = synth['prices'] if synth else {}
+    else:
+        history = get_full_history()
+    if "TQQQ" not in history or "USD" not in history: return None
+    px = pd.concat([history["TQQQ"], history["USD"]], axis=1, keys=["TQQQ", "USD"]).dropna()
+    return simulate_level_progression(monthly_returns(px), LEVEL_CONFIG, start, monthly_contribution,
+                                      years=years, n_paths=n_paths, seed=42)
 
 # ==========================================
 # 3. 메인 로직
@@ -246,21 +209,16 @@ if "monthly_contribution" not in st.session_state:
 if '_ath_internal' not in st.session_state:
     st.session_state._ath_internal = float(saved_data.get('ath_assets', 0))
 
-with st.expander("📜 Master Protocol (규정집)", expanded=False):
-    st.markdown(PROTOCOL_TEXT)
+# 문서 expander는 펼쳤을 때만 본문을 전송 (on_change="rerun", 접힌 상태의 rerun은 markdown 직렬화 생략)
+protocol_exp = st.expander("📜 Master Protocol (규정집)", expanded=False, key="protocol", on_change="rerun")
+if protocol_exp.open:
+    with protocol_exp:
+        st.markdown(PROTOCOL_TEXT)
 
 mkt = get_market_data()
 
 if mkt is not None:
-    qqq_price = mkt['qqq_price']
-    tqqq_price = mkt['tqqq_price']
-    usd_price = mkt['usd_price']
     usd_krw_rate = mkt['usd_krw']
-    qqq_rsi = mkt['qqq_rsi_wk']
-    qqq_mdd = mkt['qqq_mdd']
-    
-    tqqq_krw = tqqq_price * usd_krw_rate
-    usd_stock_krw = usd_price * usd_krw_rate
 
     # --- 사이드바 ---
     st.sidebar.header("📝 자산 정보")
@@ -290,6 +248,8 @@ if mkt is not None:
 
         with st.expander("🛡️ 계좌 C: 벙커 (세금/비상)", expanded=True):
             st.number_input("C: 원화 예수금 (수익금 22%, 파킹통장/CMA)", min_value=0, step=100000, key="c_cash_krw", format="%d")
+            st.number_input("C: 올해 실현 양도차익 (해외주식, 손익 통산)", step=100000, key="realized_ytd_krw", format="%d",
+                            help="올해 A/B에서 매도로 실현한 손익 합계. 기본공제(250만원) 잔여분 → 계좌 C 이체액 / 연말 절세 계산에 사용")
 
         with st.expander("👨‍👩‍👧 계좌 D: 가족 생존 계좌 (투자 절대 금지)", expanded=False):
             st.number_input("D: 원화 생활비 (12~24개월분)", min_value=0, step=100000, key="d_cash_krw", format="%d", help="투자 계좌와 완벽히 분리. 스나이퍼 총알로 절대 전용 금지. 시스템 총자산/Level 계산에서 제외됩니다.")
@@ -302,24 +262,23 @@ if mkt is not None:
             save_data()
             st.success("✅ 저장 완료!")
     
-    # --- 자동 손익 판단 로직 ---
-    tqqq_qty = st.session_state.a_tqqq_qty + st.session_state.b_tqqq_qty
-    usd_qty = st.session_state.a_usd_qty + st.session_state.b_usd_qty
-    
-    tqqq_invested = (st.session_state.a_tqqq_qty * st.session_state.a_tqqq_avg) + (st.session_state.b_tqqq_qty * st.session_state.b_tqqq_avg)
-    usd_invested = (st.session_state.a_usd_qty * st.session_state.a_usd_avg) + (st.session_state.b_usd_qty * st.session_state.b_usd_avg)
-    total_invested_krw = tqqq_invested + usd_invested
-    
-    total_tqqq_krw = tqqq_qty * tqqq_krw
-    total_usd_krw = usd_qty * usd_stock_krw
-    total_stock_krw = total_tqqq_krw + total_usd_krw
-    
-    total_cash_krw = (st.session_state.a_cash_krw + st.session_state.b_cash_krw + st.session_state.c_cash_krw) + \
-                     ((st.session_state.a_cash_usd + st.session_state.b_cash_usd) * usd_krw_rate)
-    total_assets = total_stock_krw + total_cash_krw
+    # --- 자동 손익 판단 + CRO 판정 (portfolio.py: 대시보드 / 로컬 API(api.py) 공통 계산 본체) ---
+    pf_input = {k: st.session_state[k] for k in PORTFOLIO_FIELDS}
+    pf_input['ath_assets'] = max(st.session_state.ath_assets, st.session_state._ath_internal)
+    pf_input['sniper_mode_active'] = st.session_state.sniper_mode_active
+    pf_values = normalize_portfolio(pf_input)
+    # 판정은 (시장 스냅샷 버전, 포트폴리오 값)이 같으면 panel_cache에서 재사용 (결과 dict는 읽기 전용)
+    pf_key = (mkt.version, content_key(pf_values))
+    pf = memo("portfolio", pf_key, lambda: evaluate_portfolio(mkt, pf_values))
+
+    tqqq_qty, usd_qty = pf['tqqq_qty'], pf['usd_qty']
+    tqqq_invested, usd_invested = pf['tqqq_invested'], pf['usd_invested']
+    total_tqqq_krw, total_usd_krw, total_stock_krw = pf['total_tqqq_krw'], pf['total_usd_krw'], pf['total_stock_krw']
+    total_cash_krw, total_assets = pf['total_cash_krw'], pf['total_assets']
+    equity_history = record_equity(total_assets)
     
     # 자동 래칫 원칙 갱신 (widget exception 방지: _ath_internal에 자동 추적 후 파일에 기록)
-    effective_ath = max(st.session_state.ath_assets, st.session_state._ath_internal, total_assets)
+    effective_ath = pf['effective_ath']
     if effective_ath > st.session_state._ath_internal:
         st.session_state._ath_internal = effective_ath
         try:
@@ -331,38 +290,12 @@ if mkt is not None:
         except:
             pass
 
-    profit_rate = ((total_stock_krw - total_invested_krw) / total_invested_krw * 100) if total_invested_krw > 0 else 0.0
-    is_loss = profit_rate < 0
-
-    # Level 결정 (ATH 기준 래칫)
-    current_level = determine_level(effective_ath)
-    target_stock_ratio = LEVEL_CONFIG[current_level]['target_stock']
-    target_cash_ratio = LEVEL_CONFIG[current_level]['target_cash']
-
-    current_stock_ratio = total_stock_krw / total_assets if total_assets > 0 else 0
-    current_cash_ratio = total_cash_krw / total_assets if total_assets > 0 else 0
-
-    # [원칙 0] 마스터 인덱스: QQQ(달러 차트)만으로 버블 판정. SOXX는 표시 전용.
-    qqq_rsi_mo = mkt['qqq_rsi_mo']
-    soxx_rsi_mo = mkt['soxx_rsi_mo']
-    soxx_rsi_wk_val = mkt['soxx_rsi_wk']
-    qqq_mo_dev = mkt['qqq_mo_dev']
-    soxx_mo_dev = mkt['soxx_mo_dev']
-
-    # [V24.5] Level 2(이격도) 버블 방어는 Level {BUBBLE_LEVEL2_GATE} 이상(시드 펌핑 구간 이후)에서만 발동.
-    # Level 1~{BUBBLE_LEVEL2_GATE-1} 구간은 월 적립금의 물타기 효율이 극대화되므로 이격도 룰을 완전히 무시한다.
-    is_level2_bubble_raw = (qqq_mo_dev >= 1.0)
-    is_level2_bubble = is_level2_bubble_raw and (current_level >= BUBBLE_LEVEL2_GATE)
-    is_level1_bubble = (qqq_rsi_mo >= 80)
-    is_circuit_breaker = is_level1_bubble or is_level2_bubble
-    # [V24.5] 월 적립금 분배용: Level 1~{BUBBLE_LEVEL2_GATE-1}에서는 버블 경보 중에도 100% 현금 전환 없이
-    # Level 목표 비중대로 기계적 매수를 지속 (FOMO 방지, 시드 펌핑 우선).
-    is_seed_pumping_level = current_level < BUBBLE_LEVEL2_GATE
-
-    # [원칙 0] 우선순위: 전시 상황(MDD -15% 이하)이면 버블 경보 목표 비중 조정 완전 무시
-    if is_level2_bubble and qqq_mdd > -0.15:
-        target_cash_ratio = min(1.0, target_cash_ratio + 0.20)
-        target_stock_ratio = 1.0 - target_cash_ratio
+    profit_rate, is_loss = pf['profit_rate'], pf['is_loss']
+
+    # Level 결정 (ATH 기준 래칫, 이격도 버블 시 목표 현금 +20% 반영 완료)
+    current_level = pf['level']
+    target_stock_ratio, target_cash_ratio = pf['target_stock_ratio'], pf['target_cash_ratio']
+    current_stock_ratio, current_cash_ratio = pf['current_stock_ratio'], pf['current_cash_ratio']
 
     # --- 1. 시장 상황판 ---
     st.header("1. 시장 상황판 (Market Status)")
@@ -379,42 +312,44 @@ if mkt is not None:
         elif mdd <= -0.15: return "📉 스나이퍼"
         return "✅ 안정"
 
-    # QQQ
-    q1, q2, q3, q4 = st.columns(4)
-    q1.metric("QQQ 현재가", f"${qqq_price:.2f} ({format_krw(qqq_price*usd_krw_rate)})")
-    q2.metric("QQQ 주봉RSI(참고) / 월봉RSI(기준)", f"{qqq_rsi:.1f} / {qqq_rsi_mo:.1f}", get_rsi_label(qqq_rsi_mo))
-    if mkt['qqq_mo_dev'] >= 1.0 and current_level < BUBBLE_LEVEL2_GATE:
-        _qqq_dev_label = f"⚪ 버블(무시, LV<{BUBBLE_LEVEL2_GATE})"
-    elif mkt['qqq_mo_dev'] >= 1.0:
-        _qqq_dev_label = "🚨 버블"
-    else:
-        _qqq_dev_label = "안정"
-    q3.metric("QQQ 120월 이격도", f"{mkt['qqq_mo_dev']*100:.1f}%", _qqq_dev_label)
-    q4.metric("QQQ MDD", f"{qqq_mdd*100:.2f}%", get_mdd_label(qqq_mdd))
-
-    # SOXX
-    soxx_rsi_wk_val = mkt['soxx_rsi_wk']
-    s1, s2, s3, s4 = st.columns(4)
-    s1.metric("SOXX 현재가", f"${mkt['soxx_price']:.2f} ({format_krw(mkt['soxx_price']*usd_krw_rate)})")
-    s2.metric("SOXX 주봉 RSI", f"{soxx_rsi_wk_val:.1f}", get_rsi_label(soxx_rsi_wk_val))
-    s3.metric("SOXX 120월 이격도", f"{mkt['soxx_mo_dev']*100:.1f}%", "🚨 버블" if mkt['soxx_mo_dev'] >= 1.0 else "안정")
-    s4.metric("SOXX MDD", f"{mkt['soxx_mdd']*100:.2f}%", get_mdd_label(mkt['soxx_mdd']))
-
-    # TQQQ
-    tqqq_rsi_wk_val = mkt['tqqq_rsi_wk']
-    t1, t2, t3, t4 = st.columns(4)
-    t1.metric("TQQQ 현재가", f"${tqqq_price:.2f} ({format_krw(tqqq_price*usd_krw_rate)})")
-    t2.metric("TQQQ 주봉 RSI", f"{tqqq_rsi_wk_val:.1f}", get_rsi_label(tqqq_rsi_wk_val))
-    t3.metric("TQQQ MDD", f"{mkt['tqqq_mdd']*100:.2f}%", get_mdd_label(mkt['tqqq_mdd']))
-    t4.metric("USD MDD", f"{mkt['usd_mdd']*100:.2f}%", get_mdd_label(mkt['usd_mdd']))
-
-    # USD
-    usd_rsi_wk_val = mkt['usd_rsi_wk']
-    u1, u2, u3, u4 = st.columns(4)
-    u1.metric("USD 현재가", f"${usd_price:.2f} ({format_krw(usd_price*usd_krw_rate)})")
-    u2.metric("USD 주봉 RSI", f"{usd_rsi_wk_val:.1f}", get_rsi_label(usd_rsi_wk_val))
-    u3.metric("USD MDD", f"{mkt['usd_mdd']*100:.2f}%", get_mdd_label(mkt['usd_mdd']))
-    u4.metric("SOXX MDD", f"{mkt['soxx_mdd']*100:.2f}%", get_mdd_label(mkt['soxx_mdd']))
+    def market_board_model():
+        """종목별 1행 × (label, value, delta) 4칸: 현재가 / RSI / 120월 이격도 / MDD"""
+        board = []
+        for row in mkt['rows']:
+            ticker = row['ticker']
+            cells = [(f"{ticker} 현재가", f"${row['price']:.2f} ({format_krw(row['price']*usd_krw_rate)})" if row['price'] is not None else "N/A", None)]
+            rsi_wk_val = row['rsi_wk'] or 0.0
+            rsi_mo_val = row['rsi_mo'] or 0.0
+            if row['role'] == 'master':
+                # [원칙 0] 마스터 인덱스는 월봉 RSI가 판정 기준, 주봉은 참고
+                cells.append((f"{ticker} 주봉RSI(참고) / 월봉RSI(기준)", f"{rsi_wk_val:.1f} / {rsi_mo_val:.1f}", get_rsi_label(rsi_mo_val)))
+            else:
+                cells.append((f"{ticker} 주봉 RSI / 월봉 RSI", f"{rsi_wk_val:.1f} / {rsi_mo_val:.1f}", get_rsi_label(rsi_wk_val)))
+            if row['ma120'] is None:
+                cells.append((f"{ticker} 120월 이격도", "N/A", "120개월 미만"))
+            else:
+                if row['mo_dev'] >= 1.0 and row['role'] == 'master' and current_level < BUBBLE_LEVEL2_GATE:
+                    _dev_label = f"⚪ 버블(무시, LV<{BUBBLE_LEVEL2_GATE})"
+                elif row['mo_dev'] >= 1.0:
+                    _dev_label = "🚨 버블"
+                else:
+                    _dev_label = "안정"
+                cells.append((f"{ticker} 120월 이격도", f"{row['mo_dev']*100:.1f}%", _dev_label))
+            mdd_val = row['mdd'] or 0.0
+            cells.append((f"{ticker} MDD", f"{mdd_val*100:.2f}%", get_mdd_label(mdd_val)))
+            board.append(cells)
+        return board
+
+    # 유니버스(universe.py / universe.json) 순서대로 종목별 1행. 표시 문자열은 (스냅샷 버전, Level)이 같으면 재사용
+    for cells in memo("market_board", (mkt.version, current_level), market_board_model):
+        for col, (label, value, delta) in zip(st.columns(4), cells):
+            col.metric(label, value, delta)
+
+    # 데이터 품질 검사 (validation.py): 감지 항목이 있을 때만 표시. 격리된 바는 직전 정상값으로 대체된 뒤 지표 계산
+    if mkt.get('dq_issues'):
+        with st.expander(f"🧪 데이터 품질 검사: {mkt['dq_issues']:,}건 감지 │ 의심 바 {mkt.get('dq_quarantined', 0):,}개 격리", expanded=False):
+            st.caption("duplicate=같은 주기 중복 바 병합 · gap/missing=공백·결측(보고만) · non_positive/ohlc/outlier=격리 후 직전 정상값 대체 · adj_jump=수정종가 계단 보정 · close_step=종가 계단(분할 미반영·분배금, 보고만) (항목별 최대 20건 표시)")
+            st.dataframe([dict(issue) for issue in mkt.get('quality', ())], use_container_width=True, hide_index=True)
 
     # --- 2. 포트폴리오 진단 ---
     st.markdown("---")
@@ -428,48 +363,115 @@ if mkt is not None:
     else:
         st.progress(1.0, text="🏆 Final Level 달성! (Global FIRE)")
 
+    with st.expander("🎲 레벨 도달 예측 (Monte Carlo)", expanded=False):
+        st.caption("TQQQ/USD 과거 월간 수익률을 12개월 블록 단위로 재표본추출(상관관계 보존)하여 월 적립금과 Level별 목표 비중을 반영한 경로를 시뮬레이션합니다. (seed 고정, 매도 리밸런싱 미반영)")
+        fc_paths = st.select_slider("시뮬레이션 경로 수", options=[10000, 30000, 100000], value=30000)
+        fc_synth = st.checkbox("상장 이전 합성 히스토리 포함 (3x QQQ / 2x SOXX, 닷컴·2008 포함)", value=False)
+        if st.checkbox("시뮬레이션 실행 (30년)", value=False):
+            fc_start = {'tqqq': float(total_tqqq_krw), 'usd': float(total_usd_krw), 'cash': float(total_cash_krw), 'ath': float(effective_ath)}
+            fc = get_level_forecast(fc_start, float(st.session_state.monthly_contribution), fc_paths, 30, use_synthetic=fc_synth)
+            if fc is None:
+                st.info("TQQQ/USD 전체 기간 데이터를 불러오지 못했습니다.")
+                if fc_synth:
+                    from synthetic import load_synthetic_history
+                    for t, problems in (load_synthetic_history() or {}).get('rejected', {}).items():
+                        st.warning(f"{t} 합성 히스토리 보정 검사 실패 (사용 안 함): {', '.join(problems)}")
+            else:
+                import pandas as pd
+                st.dataframe(pd.DataFrame([{
+                    "마일스톤": m['name'], "진입 기준 (ATH)": format_krw(m['limit']), "30년 내 도달 확률": f"{m['prob']*100:.1f}%",
+                    **{f"P{p} (년)": (f"{v:.1f}" if v is not None else "-") for p, v in m['years_pct'].items()},
+                } for m in fc['milestones']]), use_container_width=True, hide_index=True)
+                st.line_chart(pd.DataFrame({f"P{p}": fc['wealth_pct'][p] for p in (10, 50, 90)},
+                                           index=range(1, fc['years'] + 1)))
+                st.caption(f"{fc['n_paths']:,} 경로 × {fc['years']}년 · 계산 {fc['elapsed']:.2f}초 (연말 총자산 백분위, 원)")
+                if fc_synth:
+                    from synthetic import load_synthetic_history
+                    synth_stats = (load_synthetic_history() or {}).get('stats', {})
+                    st.caption(" │ ".join(f"{t} 합성 {s['synthetic_start']:%Y}~ · 겹침 구간 TE {s['te_annual']*100:.2f}%/년 · 상관 {s['corr']:.4f}"
+                                           for t, s in synth_stats.items() if s['synthetic_start'] is not None))
+
     # 자동 ATH 갱신 알림
     if effective_ath > st.session_state.ath_assets and st.session_state.ath_assets > 0:
         st.toast(f"🏆 새 최고 자산 갱신! {format_krw(effective_ath)} → 다음 저장 시 반영됩니다.", icon="🚀")
 
-    st.markdown("### 📊 통합 포트폴리오")
-    row1_col1, row1_col2, row1_col3, row1_col4 = st.columns(4)
-    row1_col1.metric("현재 Level (래칫 룰)", f"{LEVEL_CONFIG[current_level]['name']}")
-    row1_col2.metric("최고 자산 (ATH)", format_krw(effective_ath), "🔒 자동 추적 중")
-    row1_col3.metric("현재 총 자산", format_krw(total_assets))
-    row1_col4.metric("통합 수익률", f"{profit_rate:.2f}%", "🔴 손실 절대방어" if is_loss else "🔵 수익 순항")
-
-    if st.session_state.d_cash_krw > 0:
-        st.caption(f"👨‍👩‍👧 **계좌 D (가족 생존 계좌, 시스템 계산 제외):** {format_krw(st.session_state.d_cash_krw)} — 투자 절대 금지, 스나이퍼 재원 전용 불가")
-    
     # TQ:USD 비율 계산
     tqqq_ratio_in_stock = total_tqqq_krw / total_stock_krw if total_stock_krw > 0 else 0.5
     usd_ratio_in_stock = total_usd_krw / total_stock_krw if total_stock_krw > 0 else 0.5
     tq_pct = int(tqqq_ratio_in_stock * 100)
     us_pct = int(usd_ratio_in_stock * 100)
 
-    row2_col1, row2_col2, row2_col3, row2_col4 = st.columns(4)
-    row2_col1.metric("총 주식 평가금", format_krw(total_stock_krw))
-    row2_col2.metric("총 현금(SGOV/BOXX)", format_krw(total_cash_krw))
-    row2_col3.metric("주식 비중", f"{current_stock_ratio*100:.1f}%",
-                     f"목표: {target_stock_ratio*100:.1f}%  │  TQ {tq_pct}:{us_pct} USD")
-    row2_col4.metric("현금 비중", f"{current_cash_ratio*100:.1f}%", f"목표: {target_cash_ratio*100:.1f}%")
+    def diagnosis_model():
+        """통합 포트폴리오 2행(4칸) + TQQQ/USD 상세 1행(6칸)의 (label, value, delta)"""
+        tqqq_profit = ((total_tqqq_krw - tqqq_invested) / tqqq_invested * 100) if tqqq_invested > 0 else 0
+        usd_profit = ((total_usd_krw - usd_invested) / usd_invested * 100) if usd_invested > 0 else 0
+        return {
+            'row1': [
+                ("현재 Level (래칫 룰)", f"{LEVEL_CONFIG[current_level]['name']}", None),
+                ("최고 자산 (ATH)", format_krw(effective_ath), "🔒 자동 추적 중"),
+                ("현재 총 자산", format_krw(total_assets), None),
+                ("통합 수익률", f"{profit_rate:.2f}%", "🔴 손실 절대방어" if is_loss else "🔵 수익 순항"),
+            ],
+            'row2': [
+                ("총 주식 평가금", format_krw(total_stock_krw), None),
+                ("총 현금(SGOV/BOXX)", format_krw(total_cash_krw), None),
+                ("주식 비중", f"{current_stock_ratio*100:.1f}%", f"목표: {target_stock_ratio*100:.1f}%  │  TQ {tq_pct}:{us_pct} USD"),
+                ("현금 비중", f"{current_cash_ratio*100:.1f}%", f"목표: {target_cash_ratio*100:.1f}%"),
+            ],
+            'detail': [
+                ("TQQQ 수량", f"{tqqq_qty:.2f}주", None),
+                ("TQQQ 평가금", format_krw(total_tqqq_krw), None),
+                ("TQQQ 수익률", f"{tqqq_profit:.2f}%", "🔴 수익" if tqqq_profit >= 0 else "🔵 손실"),
+                ("USD 수량", f"{usd_qty:.2f}주", None),
+                ("USD 평가금", format_krw(total_usd_krw), None),
+                ("USD 수익률", f"{usd_profit:.2f}%", "🔴 수익" if usd_profit >= 0 else "🔵 손실"),
+            ],
+        }
+
+    # 진단 표시 문자열은 판정(pf)과 같은 키로 재사용
+    diag = memo("diagnosis", pf_key, diagnosis_model)
 
-    # TQQQ / USD 종목별 상세
-    st.markdown("### 🚀 TQQQ & USD 종목 상세")
-    c_t1, c_t2, c_t3, c_u1, c_u2, c_u3 = st.columns(6)
+    st.markdown("### 📊 통합 포트폴리오")
+    for col, (label, value, delta) in zip(st.columns(4), diag['row1']):
+        col.metric(label, value, delta)
 
-    tqqq_avg_price = tqqq_invested / tqqq_qty if tqqq_qty > 0 else 0
-    tqqq_profit = ((total_tqqq_krw - tqqq_invested) / tqqq_invested * 100) if tqqq_invested > 0 else 0
-    c_t1.metric("TQQQ 수량", f"{tqqq_qty:.2f}주")
-    c_t2.metric("TQQQ 평가금", format_krw(total_tqqq_krw))
-    c_t3.metric("TQQQ 수익률", f"{tqqq_profit:.2f}%", "🔴 수익" if tqqq_profit >= 0 else "🔵 손실")
+    if st.session_state.d_cash_krw > 0:
+        st.caption(f"👨‍👩‍👧 **계좌 D (가족 생존 계좌, 시스템 계산 제외):** {format_krw(st.session_state.d_cash_krw)} — 투자 절대 금지, 스나이퍼 재원 전용 불가")
 
-    usd_avg_price = usd_invested / usd_qty if usd_qty > 0 else 0
-    usd_profit = ((total_usd_krw - usd_invested) / usd_invested * 100) if usd_invested > 0 else 0
-    c_u1.metric("USD 수량", f"{usd_qty:.2f}주")
-    c_u2.metric("USD 평가금", format_krw(total_usd_krw))
-    c_u3.metric("USD 수익률", f"{usd_profit:.2f}%", "🔴 수익" if usd_profit >= 0 else "🔵 손실")
+    for col, (label, value, delta) in zip(st.columns(4), diag['row2']):
+        col.metric(label, value, delta)
+
+    # TQQQ / USD 종목별 상세
+    st.markdown("### 🚀 TQQQ & USD 종목 상세")
+    for col, (label, value, delta) in zip(st.columns(6), diag['detail']):
+        col.metric(label, value, delta)
+
+    # [원칙 9] 승자의 질주: 기간별 상대강도 / 상관 / 베타 / 리밸런싱 없을 때 비중 드리프트 (race.py, 펼쳤을 때만 그림)
+    race = mkt.get('race')
+    race_exp = st.expander("🏁 승자의 질주: TQQQ vs USD 레이스 분석", expanded=False, key="race", on_change="rerun")
+    if race_exp.open:
+        with race_exp:
+            if race is None:
+                st.info("레이스 분석용 일봉 데이터를 불러오지 못했습니다.")
+            else:
+                import pandas as pd
+                st.dataframe(pd.DataFrame([{
+                    "기간": f"{w}거래일",
+                    "TQQQ/USD 상대강도": f"{mkt[f'race_rs_{w}']*100:+.1f}%" if mkt[f'race_rs_{w}'] is not None else "-",
+                    "상관계수": f"{mkt[f'race_corr_{w}']:.2f}" if mkt[f'race_corr_{w}'] is not None else "-",
+                    "β TQQQ/QQQ": f"{mkt[f'race_tqqq_beta_{w}']:.2f}" if mkt[f'race_tqqq_beta_{w}'] is not None else "-",
+                    "β USD/SOXX": f"{mkt[f'race_usd_beta_{w}']:.2f}" if mkt[f'race_usd_beta_{w}'] is not None else "-",
+                    "50:50 매수 후 방치 시 TQ:USD": (f"{mkt[f'race_tqqq_weight_{w}']*100:.0f}:{100 - mkt[f'race_tqqq_weight_{w}']*100:.0f}"
+                                                   if mkt[f'race_tqqq_weight_{w}'] is not None else "-"),
+                } for w in race['windows']]), use_container_width=True, hide_index=True)
+                race_index = pd.DatetimeIndex(race['dates'])
+                metric_pos = {m: i for i, m in enumerate(race['metrics'])}
+                st.caption(f"리밸런싱 없이 50:50에서 출발했을 때 TQQQ 비중 (%) — 현재 내 비중 TQ {tq_pct}:{us_pct} USD")
+                st.line_chart(pd.DataFrame({f"{w}일": race['history'][:, i, metric_pos['tqqq_weight']] * 100
+                                            for i, w in enumerate(race['windows'])}, index=race_index))
+                st.caption("TQQQ-USD 일간 수익률 상관계수 (기간별 롤링)")
+                st.line_chart(pd.DataFrame({f"{w}일": race['history'][:, i, metric_pos['corr']]
+                                            for i, w in enumerate(race['windows'])}, index=race_index))
 
     st.markdown("---")
     if is_loss: st.error("🛑 [손실 중] 절대 방패 가동: 헌법 제1조 – 어떠한 경우에도 매도 금지")
@@ -479,42 +481,6 @@ if mkt is not None:
     st.markdown("---")
     st.header("3. CRO 실행 명령 (Action Protocol)")
     
-    # [원칙 2-1] 환율 극단값 방어: 10년 평균 대비 +20% 이상이면 분할 환전 경보
-    fx_deviation = mkt.get('fx_deviation', 0)
-    is_fx_extreme = fx_deviation >= 0.20
-    fx_warning = f"\n\n💱 **[환율 경보]** 현재 환율이 10년 평균({format_krw(mkt.get('fx_10y_avg', 0))}/$) 대비 **+{fx_deviation*100:.1f}%** 폭등 상태입니다. 이번 달 환전은 **4주 분할 환전**으로 진행하세요. (환율 예측 매매 아님, 심리적 방어 목적)" if is_fx_extreme else ""
-
-    # 월급 적립 가이드
-    monthly_msg = ""
-    monthly_color = "blue"
-    if qqq_mdd <= -0.15:
-        monthly_msg = f"📉 **전시 상황 (MDD {qqq_mdd*100:.1f}%)**: 월급 100% ({format_krw(st.session_state.monthly_contribution)}) 주식 매수 (TQQQ 50 : USD 50). 현금 적립 금지!"
-        monthly_color = "red"
-    elif is_circuit_breaker and is_seed_pumping_level:
-        # [V24.5] Level 1~{BUBBLE_LEVEL2_GATE-1} 시드 펌핑 구간: FOMO 방지를 위해 버블 경보 중에도
-        # 신규 적립금을 100% 현금으로 돌리지 않고 Level 목표 비중대로 기계적 매수를 지속.
-        buy_stock = st.session_state.monthly_contribution * target_stock_ratio
-        buy_cash = st.session_state.monthly_contribution * target_cash_ratio
-        monthly_msg = f"🌱 **버블 경보 중 시드 펌핑 유지 (LV<{BUBBLE_LEVEL2_GATE})**: 월급 {format_krw(st.session_state.monthly_contribution)}을 Level 목표비율대로 주식 {format_krw(buy_stock)} / 현금(SGOV/BOXX) {format_krw(buy_cash)} 배분 매수. (기존 보유 물량 리밸런싱 매도는 원칙대로 정상 집행)"
-        monthly_color = "blue"
-    elif is_circuit_breaker:
-        monthly_msg = f"🚨 **버블 경보 발동 (LV{current_level}≥{BUBBLE_LEVEL2_GATE})**: 신규 적립금 100% ({format_krw(st.session_state.monthly_contribution)}) 현금(SGOV/BOXX) 매수! (주식 매수 금지)"
-        monthly_color = "orange"
-    else:
-        buy_stock = st.session_state.monthly_contribution * target_stock_ratio
-        buy_cash = st.session_state.monthly_contribution * target_cash_ratio
-        monthly_msg = f"✅ **평시 적립**: 월급 {format_krw(st.session_state.monthly_contribution)}을 Level 목표비율에 맞춰 주식 {format_krw(buy_stock)} / 현금(SGOV/BOXX) {format_krw(buy_cash)} 배분 매수."
-    monthly_msg += fx_warning
-    
-    # 매매/스나이핑 가이드
-    final_action = ""
-    detail_msg = ""
-    action_color = "blue"
-    
-    # [원칙 3] Last Bullet: 보유 현금의 15%는 영구 보존, 가용 현금은 85%
-    reserve_cash_krw = total_cash_krw * 0.15
-    available_cash_krw = total_cash_krw * 0.85
-
     def _update_sniper_flag(new_val):
         """ATH 파일 직접 갱신과 충돌 없이 sniper_mode_active만 부분 업데이트 (원칙 1-2 추적용)"""
         st.session_state.sniper_mode_active = new_val
@@ -527,123 +493,155 @@ if mkt is not None:
         except:
             pass
 
-    # [원칙 1-2] 스나이핑 원상복구 추적: MDD -15% 이하가 한 번이라도 발생하면 플래그 ON,
-    # 이후 사용자가 실제로 리로드(매도+자산정보 갱신)하여 현금 비중이 목표치를 회복하면 자동 OFF.
-    if qqq_mdd <= -0.15 and not st.session_state.sniper_mode_active:
-        _update_sniper_flag(True)
-    elif st.session_state.sniper_mode_active and current_cash_ratio >= target_cash_ratio - 0.001:
-        _update_sniper_flag(False)
-
-    if is_loss:
-        # [원칙 1-1] 손실 확정 절대 금지: 본전 미도달 상태에서는 리로드도 절대 발동하지 않음.
-        if qqq_mdd <= -0.15:
-            final_action = "🛡️ LOSS PROTECTION + 스나이퍼 대기 (본전 미도달)"
-            detail_msg = "헌법 제1조: 현재 포트폴리오가 손실 구간이므로 매도는 금지되나, 하락장이므로 아래 [월급 투입 지침]에 따라 신규 적립금은 100% 주식에 몰빵합니다. 계좌 총수익률이 본전(0%)을 넘는 순간 목표 현금 비중으로 자동 리로드됩니다."
-        else:
-            final_action = "🛡️ LOSS PROTECTION (절대 방어)"
-            detail_msg = "헌법 제1조: 현재 포트폴리오가 손실 구간이므로 **어떠한 경우에도 매도를 금지**합니다. (존버)"
-        action_color = "red"
-    else:
-        if qqq_mdd <= -0.15:
-            # [원칙 3] MDD Sniper (Last Bullet 적용)
-            input_cash = 0
-            ratio_str = ""
-            base_str = ""
-            if qqq_mdd <= -0.50:
-                input_cash = reserve_cash_krw
-                ratio_str = "최후의 보루 100%"
-                base_str = "보유 현금의 15% (Last Bullet)"
-            elif qqq_mdd <= -0.45:
-                input_cash = available_cash_krw * 0.4; ratio_str = "40% (영끌)"; base_str = "가용 현금(85%)의"
-            elif qqq_mdd <= -0.35:
-                input_cash = available_cash_krw * 0.3; ratio_str = "30%"; base_str = "가용 현금(85%)의"
-            elif qqq_mdd <= -0.25:
-                input_cash = available_cash_krw * 0.2; ratio_str = "20%"; base_str = "가용 현금(85%)의"
-            else:
-                input_cash = available_cash_krw * 0.1; ratio_str = "10%"; base_str = "가용 현금(85%)의"
+    # [원칙 1-2] 스나이핑 원상복구 추적 플래그 (ON/OFF 판정은 evaluate_portfolio, 변경 시에만 파일 반영)
+    if pf['sniper_mode_active'] != st.session_state.sniper_mode_active:
+        _update_sniper_flag(pf['sniper_mode_active'])
 
-            final_action = f"🔫 MDD SNIPER ({ratio_str})"
-            if qqq_mdd <= -0.50:
-                detail_msg = f"💣 **블랙 스완 (MDD {qqq_mdd*100:.1f}%)!** {base_str} {format_krw(input_cash)} 전액 투입! (그동안 아껴둔 최후의 총알)"
-            else:
-                detail_msg = f"하락장 스나이퍼 발동! {base_str} {ratio_str} ({format_krw(input_cash)}) 투입. (Last Bullet 15%는 미사용 보존 중: {format_krw(reserve_cash_krw)})"
-            action_color = "green"
-
-        elif st.session_state.sniper_mode_active:
-            # [핵심 룰] 스나이핑 원상복구 (Account Break-Even Reload): 시장 회복(MDD -15% 초과) + 계좌 본전 이상
-            sell_needed_reload = max(0, (total_assets * target_cash_ratio) - total_cash_krw)
-            final_action = "🔄 SNIPER RELOAD (스나이핑 원상복구)"
-            detail_msg = f"과거 하락장에서 스나이핑한 자금이 본전(0%) 이상으로 회복되었습니다! {format_krw(sell_needed_reload)} 만큼 매도하여 현재 Level의 목표 현금 비중({target_cash_ratio*100:.1f}%)으로 즉시 복구하세요. (TQQQ/USD 현재 보유 비중대로 비례 매도, 토스 이동평균법 하에서 별도 트랜치 추적 불필요, 수익금 22% 세금 격리)"
-            action_color = "orange"
-
-        elif is_circuit_breaker:
-            sell_needed = (total_assets * target_cash_ratio) - total_cash_krw
-            
-            trigger_str = []
-            if is_level1_bubble: trigger_str.append(f"QQQ 월봉 RSI {qqq_rsi_mo:.1f}")
-            if is_level2_bubble: trigger_str.append(f"QQQ 120월 이격도 {qqq_mo_dev*100:.1f}% (LV{current_level}≥{BUBBLE_LEVEL2_GATE})")
-            
-            trigger_msg = ", ".join(trigger_str)
-            
-            if sell_needed > 0:
-                if is_level2_bubble:
-                    final_action = "🚨 LEVEL 2 BUBBLE (역사적 버블 방어)"
-                    detail_msg = f"[{trigger_msg}] 돌파! 목표 현금 비중에 **+20% 추가 확보** (총 {target_cash_ratio*100:.1f}%).\n{format_krw(sell_needed)} 만큼 매도하여 현금(SGOV/BOXX) 채움. (TQQQ/USD 현재 보유 비중대로 비례 매도, 수익금 22% 세금 격리 필수)"
-                else:
-                    final_action = "🔥 LEVEL 1 BUBBLE (단기 과열 방어)"
-                    detail_msg = f"[{trigger_msg}] 돌파! Level {current_level}의 목표 현금 비중({target_cash_ratio*100:.1f}%) 확보를 위해 {format_krw(sell_needed)} 만큼만 매도하여 현금(SGOV/BOXX) 채움. (TQQQ/USD 현재 보유 비중대로 비례 매도, 수익금 22% 세금 격리 필수)"
-                action_color = "orange"
-            else:
-                final_action = "✅ HOLD (현금 벙커 완충)"
-                detail_msg = f"[{trigger_msg}] 광기 구간이나, 이미 목표 현금(SGOV/BOXX) 비중을 충족했습니다."
-        
-        else:
-            final_action = "🧘 STABLING (관망)"
-            detail_msg = "평시 구간입니다. '승자의 질주(Let Winners Run)'를 즐기며 기존 포지션을 유지하십시오. 듀얼 리밸런싱은 오직 '월 적립금(새 돈)'으로만 맞춥니다."
-            if is_level2_bubble_raw:
-                detail_msg += f"\n\n🌱 *[V24.5] 참고: QQQ 120월 이격도가 100%를 초과했지만, 현재 Level {current_level}은 시드 펌핑 구간(LV<{BUBBLE_LEVEL2_GATE})이므로 역사적 버블 방어 룰을 의도적으로 무시하고 공격적으로 자산을 불립니다.*"
+    final_action, detail_msg, action_color = pf['final_action'], pf['detail_msg'], pf['action_color']
+    monthly_msg, monthly_color = pf['monthly_msg'], pf['monthly_color']
 
     st.info(f"💡 **보유 자산 실행 (Asset Action):** {final_action}")
     if action_color == "red": st.error(detail_msg)
     elif action_color == "green": st.success(detail_msg)
     elif action_color == "orange": st.warning(detail_msg)
     else: st.info(detail_msg)
+
+    # 매도 금액 → 계좌 A/B × TQQQ/USD 주문 수량 + 계좌 C 세금 격리액 (order_planner.py, 손실 확정 금지 반영)
+    if pf['sell_krw'] > 0:
+        with st.expander(f"🧾 매도 주문 계산기: {format_krw(pf['sell_krw'])} → 계좌·종목별 수량", expanded=True):
+            import pandas as pd
+            from order_planner import SHARE_STEPS, plan_portfolios, plan_summary
+            step_label = st.radio("주문 단위", list(SHARE_STEPS), horizontal=True, key="order_step")
+            plan = plan_summary(plan_portfolios(mkt, [pf_values], [pf], step=SHARE_STEPS[step_label]))
+            st.dataframe(pd.DataFrame([{
+                "계좌": o['account'], "종목": o['ticker'],
+                "매도 수량": "🛑 손실 확정 금지" if o['blocked'] else f"{o['shares']:,.4f}".rstrip('0').rstrip('.') + "주",
+                "매도대금 (USD)": f"${o['proceeds_usd']:,.2f}", "매도대금 (원)": format_krw(o['proceeds_krw']),
+                "실현손익": format_krw(o['realized_krw']), "계좌 C 이체 (공제 초과분 세액)": format_krw(o['tax_krw']),
+            } for o in plan['orders']]), use_container_width=True, hide_index=True)
+            st.caption(f"환율 ₩{usd_krw_rate:,.2f} 기준 예상 매도대금 합계 {format_krw(plan['total_proceeds_krw'])} │ "
+                       f"🛡️ 계좌 C로 즉시 이체: **{format_krw(plan['transfer_to_c_krw'])}** "
+                       f"(올해 실현 {format_krw(pf_values['realized_ytd_krw'])} 반영, 기본공제 250만원 초과분의 22%, 재투자 금지)")
+            if plan['shortfall_krw'] > 0:
+                st.warning(f"손실 확정 금지(원칙 1-1)로 매도 가능한 평가금이 {format_krw(plan['sellable_krw'])}뿐이라 "
+                           f"{format_krw(plan['shortfall_krw'])}은 매도하지 않습니다. (손실 계좌·평균단가 이하 종목 제외)")
     
     st.markdown("---")
     st.caption("📅 **월급 투입 지침 (Monthly Input)**")
     if monthly_color == "red": st.error(monthly_msg)
     else: st.info(monthly_msg)
 
+    # 연말 절세: 기본공제(250만원) 잔여분만큼 매도 후 즉시 재매수 → 평균단가 상향 (tax_optimizer.py, 펼쳤을 때만 계산)
+    tax_exp = st.expander("🧮 연말 절세 매도·재매수 (해외주식 양도세 기본공제 250만원)", expanded=False, key="tax_harvest", on_change="rerun")
+    if tax_exp.open:
+        with tax_exp:
+            import pandas as pd
+            from order_planner import ACCOUNTS, SHARE_STEPS, TICKERS, holdings_arrays
+            from tax_optimizer import optimize_harvest
+            tax_step = st.radio("주문 단위", list(SHARE_STEPS), horizontal=True, key="tax_step")
+            h_qty, h_avg = holdings_arrays([pf_values])
+            hv = optimize_harvest(h_qty[0], h_avg[0], (mkt['tqqq_price'], mkt['usd_price']), usd_krw_rate,
+                                  pf_values['realized_ytd_krw'], step=SHARE_STEPS[tax_step])
+            t1, t2, t3, t4 = st.columns(4)
+            t1.metric("남은 기본공제", format_krw(hv['exemption_left_krw']), f"올해 실현 {format_krw(pf_values['realized_ytd_krw'])}")
+            t2.metric("비과세 실현 수익", format_krw(hv['harvested_krw']), f"미사용 {format_krw(hv['unused_krw'])}")
+            t3.metric("미래 절감 세액 (22%)", format_krw(hv['tax_saved_krw']), f"수수료 -{format_krw(hv['fee_krw'])}")
+            t4.metric("올해 납부 예상 세액", format_krw(hv['tax_due_krw']), "계좌 C 격리 필요액")
+            st.dataframe(pd.DataFrame([{
+                "계좌": account, "종목": ticker,
+                "매도 후 즉시 재매수": f"{hv['shares'][a, t]:,.4f}".rstrip('0').rstrip('.') + "주",
+                "실현 수익": format_krw(hv['gain_krw'][a, t]),
+                "평균단가 (현재 → 재매수 후)": f"{format_krw(h_avg[0, a, t])} → {format_krw(hv['new_avg'][a, t])}",
+            } for a, account in enumerate(ACCOUNTS) for t, ticker in enumerate(TICKERS)]), use_container_width=True, hide_index=True)
+            st.caption(f"보유 수량은 그대로(Level 목표 비중 불변), 평균단가만 올라가 미래 양도차익이 줄어듭니다. 올해 결제분까지만 인정되므로 12월 마지막 결제일 전에 실행 │ "
+                       f"후보 {hv['candidates']:,}개 조합 평가 {hv['elapsed_ms']:.0f}ms · "
+                       + ("정확해" if hv['gap_krw'] == 0 else f"최적해와 차이 ≤ {hv['gap_krw']:,.2f}원"))
+            if hv['tax_due_krw'] > st.session_state.c_cash_krw:
+                st.warning(f"계좌 C 잔액({format_krw(st.session_state.c_cash_krw)})이 올해 납부 예상 세액보다 {format_krw(hv['tax_due_krw'] - st.session_state.c_cash_krw)} 부족합니다.")
+
     # --- 4. 차트 (종목별 독립 Expander) ---
     st.markdown("---")
     st.header("4. 📊 차트 분석 (Technical Charts)")
     
-    def draw_chart(df, title):
-        if df is None or df.empty: return
-        fig = go.Figure(data=[go.Candlestick(x=df.index, open=df['Open'], high=df['High'], low=df['Low'], close=df['Close'])])
+    def draw_chart(chart, title):
+        if chart is None or len(chart.index) == 0: return
+        import plotly.graph_objects as go  # 차트 expander를 처음 열 때만 로드
+        ohlc = chart.ohlc
+        fig = go.Figure(data=[go.Candlestick(x=chart.index, open=ohlc[:, 0], high=ohlc[:, 1], low=ohlc[:, 2], close=ohlc[:, 3])])
         fig.update_layout(title=title, height=400, margin=dict(l=20, r=20, t=40, b=20), xaxis_rangeslider_visible=False)
         st.plotly_chart(fig, use_container_width=True)
 
-    with st.expander("📊 QQQ (나스닥 100) 차트", expanded=False):
-        draw_chart(mkt['qqq_dy'], "QQQ Daily Chart")
-    with st.expander("📊 SOXX (반도체 지수) 차트", expanded=False):
-        draw_chart(mkt['soxx_dy'], "SOXX Daily Chart")
-    with st.expander("📊 TQQQ / USD 차트", expanded=False):
-        c1, c2 = st.columns(2)
-        with c1: draw_chart(mkt['tqqq_wk'], "TQQQ Weekly Chart")
-        with c2: draw_chart(mkt['usd_wk'], "USD Weekly Chart")
+    for e in mkt['universe']:
+        # on_change="rerun": 펼친 expander만 .open=True → 접힌 차트는 Figure 생성/전송 자체를 생략
+        chart_exp = st.expander(f"📊 {e['ticker']} ({e['name']}) 차트", expanded=False, key=f"chart_{e['key']}", on_change="rerun")
+        if chart_exp.open:
+            with chart_exp:
+                draw_chart(mkt['charts'].get(e['ticker']), f"{e['ticker']} {'Weekly' if e.get('chart') == '1wk' else 'Daily'} Chart")
 
-    # --- 5. 릴리즈 노트 & 코어 로직 ---
+    # --- 5. 낙폭 분석 (전체 기간 Drawdown 엔진) ---
     st.markdown("---")
-    with st.expander("📅 릴리즈 노트", expanded=False):
-        try:
-            with open("ReleaseNotes.md", "r", encoding="utf-8") as f: st.markdown(f.read())
-        except: pass
-    
-    with st.expander("🏛️ 코어 로직 (Master Protocol)", expanded=False):
-        try:
-            with open("TradingCoreLogic.md", "r", encoding="utf-8") as f: st.markdown(f.read())
-        except: pass
+    st.header("5. 📉 낙폭 분석 (Drawdown Analytics)")
+    st.caption("전체 상장 기간(period=max) 수정종가 기준 수중 구간 분석. 시스템 판정용 MDD(원칙 0)는 위 시장 상황판 값을 그대로 사용합니다.")
+
+    dd_exp = st.expander("📉 수중 구간 (Underwater Episodes) & 회복 기간 분포", expanded=False, key="drawdown", on_change="rerun")
+    if dd_exp.open:
+        with dd_exp:
+            import pandas as pd
+            from drawdown import analyze_drawdowns_cached
+            full_history = get_full_history()
+            dd_targets = [(t, full_history[t]) for t in ["QQQ", "SOXX", "TQQQ", "USD"] if t in full_history]
+            if len(equity_history) >= 2:
+                dd_targets.append(("내 포트폴리오", pd.Series(equity_history, dtype=float).rename(index=pd.Timestamp).sort_index()))
+            if dd_targets:
+                dd_tabs = st.tabs([name for name, _ in dd_targets])
+                for dd_tab, (name, series) in zip(dd_tabs, dd_targets):
+                    with dd_tab:
+                        dd_res = analyze_drawdowns_cached(name, series, min_depth=0.05)
+                        cur_ep = dd_res['current_episode']
+                        d1, d2, d3, d4 = st.columns(4)
+                        d1.metric("현재 낙폭 (전체 기간 고점 대비)", f"{dd_res['current_dd']*100:.2f}%")
+                        d2.metric("역대 최대 낙폭", f"{dd_res['max_dd']*100:.2f}%")
+                        d3.metric("현재 수중 구간 경과", f"{cur_ep['age_days']:,}일" if cur_ep else "-", f"고점 {pd.Timestamp(cur_ep['peak_date']):%Y-%m-%d}" if cur_ep else "고점 부근")
+                        d4.metric("-5% 이상 수중 구간", f"{len(dd_res['episodes'])}회")
+
+                        st.dataframe(pd.DataFrame([{
+                            "고점일": ep['peak_date'], "저점일": ep['trough_date'], "회복일": ep['recovery_date'],
+                            "낙폭": f"{ep['depth']*100:.1f}%", "고점→저점(일)": ep['days_to_trough'],
+                            "저점→회복(일)": ep['days_to_recovery'], "수중 기간(일)": ep['days_underwater'],
+                        } for ep in reversed(dd_res['episodes'])]), use_container_width=True, hide_index=True)
+
+                        st.caption("깊이 구간별 회복 기간 분포 (고점→회복, 회복 완료 구간 기준)")
+                        st.dataframe(pd.DataFrame([{
+                            "깊이": r['bucket'], "발생": r['count'], "회복": r['recovered'], "미회복": r['unrecovered'],
+                            f"중앙값({r['unit']})": r['median'], f"75%({r['unit']})": r['p75'],
+                            f"90%({r['unit']})": r['p90'], f"최대({r['unit']})": r['max'],
+                        } for r in dd_res['recovery_stats']]), use_container_width=True, hide_index=True)
+            else:
+                st.info("전체 기간 데이터를 불러오지 못했습니다.")
+
+    # --- 6. 릴리즈 노트 & 코어 로직 ---
+    st.markdown("---")
+    # 문서 본문은 mtime/크기 기준으로 panel_cache에 보관, 펼쳤을 때만 전송
+    for doc_title, doc_path, doc_key in (("📅 릴리즈 노트", "ReleaseNotes.md", "release_notes"),
+                                         ("🏛️ 코어 로직 (Master Protocol)", "TradingCoreLogic.md", "core_logic")):
+        doc_exp = st.expander(doc_title, expanded=False, key=doc_key, on_change="rerun")
+        if doc_exp.open:
+            with doc_exp:
+                try:
+                    st.markdown(read_text(doc_path))
+                except OSError:
+                    pass
+
+    # 렌더 캐시 적중률 (panel_cache.py, 프로세스 공유)
+    cache_exp = st.expander("🩺 렌더 캐시 진단 (panel_cache)", expanded=False, key="panel_cache", on_change="rerun")
+    if cache_exp.open:
+        with cache_exp:
+            pc = panel_cache_stats()
+            st.dataframe([{"namespace": r['namespace'], "적중": r['hits'], "미적중": r['misses'],
+                           "적중률": f"{r['hit_rate']*100:.1f}%", "항목 수": r['entries']} for r in pc['rows']],
+                         use_container_width=True, hide_index=True)
+            st.caption(f"전체 적중률 {pc['hit_rate']*100:.1f}% ({pc['hits']:,} / {pc['hits'] + pc['misses']:,}) │ "
+                       f"항목 {pc['entries']:,} / {pc['max_entries']:,} │ LRU 제거 {pc['evictions']:,}회")
 
 else:
     st.warning("데이터 로딩 중... (잠시만 기다려주세요)")
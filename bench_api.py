@@ -0,0 +1,143 @@
+"""
+로컬 API(api.py) 처리량 벤치마크
+api.py를 별도 프로세스(= 서버 1개, GIL상 코어 1개)로 띄우고, 클라이언트 프로세스 여러 개가 keep-alive 연결로
+시나리오별 요청을 --duration 초 동안 반복해 초당 요청 수 / 지연 백분위 / 서버 CPU 사용률을 보고한다.
+
+  market      GET /v1/market (200, 미리 직렬화된 본문)
+  market-304  GET /v1/market + If-None-Match (304, 본문 없음)
+  alert-304   GET /v1/alert?level=7 + If-None-Match
+  decision    POST /v1/decision (무작위 포트폴리오 → 메모 미적중 판정)
+  batch-100   POST /v1/decision/batch (무작위 포트폴리오 100건)
+
+사용법: python bench_api.py [--clients 4] [--duration 3]   (market_snapshot.json 필요)
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ["market", "market-304", "alert-304", "decision", "batch-100"]
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _random_portfolio(rng):
+    return {
+        "monthly_contribution": rng.randrange(0, 10_000_000, 100_000),
+        "a_tqqq_qty": round(rng.uniform(0, 2000), 2), "a_tqqq_avg": rng.randrange(10_000, 150_000, 100),
+        "a_usd_qty": round(rng.uniform(0, 500), 2), "a_usd_avg": rng.randrange(10_000, 150_000, 100),
+        "a_cash_krw": rng.randrange(0, 50_000_000, 100_000), "a_cash_usd": rng.randrange(0, 50_000, 100),
+        "b_tqqq_qty": round(rng.uniform(0, 500), 2), "b_tqqq_avg": rng.randrange(10_000, 150_000, 100),
+        "b_cash_krw": rng.randrange(0, 10_000_000, 100_000), "b_cash_usd": rng.randrange(0, 50_000, 100),
+        "c_cash_krw": rng.randrange(0, 10_000_000, 100_000), "ath_assets": rng.randrange(0, 3_000_000_000, 1_000_000),
+        "sniper_mode_active": rng.random() < 0.2,
+    }
+
+def _request(scenario, rng, etags):
+    """(method, path, body, headers)"""
+    if scenario == "market":
+        return "GET", "/v1/market", None, {}
+    if scenario == "market-304":
+        return "GET", "/v1/market", None, {"If-None-Match": etags['market']}
+    if scenario == "alert-304":
+        return "GET", "/v1/alert?level=7", None, {"If-None-Match": etags['alert']}
+    if scenario == "decision":
+        return "POST", "/v1/decision", json.dumps(_random_portfolio(rng)).encode(), {"Content-Type": "application/json"}
+    body = json.dumps({'portfolios': [_random_portfolio(rng) for _ in range(100)]}).encode()
+    return "POST", "/v1/decision/batch", body, {"Content-Type": "application/json"}
+
+def client(port, scenario, duration, seed, etags, out):
+    """클라이언트 프로세스: keep-alive 연결 1개로 duration초 동안 요청 → (지연 목록, 오류 수)"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        method, path, body, headers = _request(scenario, rng, etags)
+        t0 = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        latencies.append(time.perf_counter() - t0)
+        if resp.status not in (200, 304):
+            errors += 1
+    conn.close()
+    out.put((latencies, errors))
+
+def _cpu_seconds(pid):
+    """/proc/<pid>/stat utime+stime (초). 지원하지 않는 OS면 None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _get(port, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path, headers=headers or {})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp, body
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="api.py 처리량 벤치마크")
+    parser.add_argument("--clients", type=int, default=4, help="동시 클라이언트 프로세스 수")
+    parser.add_argument("--duration", type=float, default=3.0, help="시나리오당 측정 시간 (초)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    args = parser.parse_args()
+
+    from snapshot import load_snapshot
+    if load_snapshot() is None:
+        print("❌ market_snapshot.json 없음 → python alert.py 먼저 실행")
+        sys.exit(1)
+
+    import numpy as np
+
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "api.py"), "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                resp, _ = _get(port, "/v1/health")
+                break
+            except OSError:
+                time.sleep(0.05)
+        etags = {'market': _get(port, "/v1/market")[0].getheader("ETag"),
+                 'alert': _get(port, "/v1/alert?level=7")[0].getheader("ETag")}
+
+        print(f"🌐 api.py 처리량 │ 서버 1프로세스 │ 클라이언트 {args.clients}개 × {args.duration:.0f}초 │ CPU {os.cpu_count()}개")
+        print(f"{'시나리오':<11} │ {'요청/초':>8} │ {'p50':>7} │ {'p99':>7} │ {'서버 CPU':>8} │ 오류")
+        for i, scenario in enumerate(s.strip() for s in args.scenarios.split(",") if s.strip()):
+            out = multiprocessing.Queue()
+            procs = [multiprocessing.Process(target=client, args=(port, scenario, args.duration, 1000 * i + c, etags, out))
+                     for c in range(args.clients)]
+            cpu0 = _cpu_seconds(server.pid)
+            t0 = time.perf_counter()
+            for p in procs:
+                p.start()
+            results = [out.get() for _ in procs]
+            wall = time.perf_counter() - t0
+            cpu1 = _cpu_seconds(server.pid)
+            for p in procs:
+                p.join()
+            lat = np.array([x for r in results for x in r[0]]) * 1000
+            errors = sum(r[1] for r in results)
+            cpu = f"{(cpu1 - cpu0) / wall * 100:7.0f}%" if cpu0 is not None and cpu1 is not None else "     N/A"
+            unit = " (×100건)" if scenario == "batch-100" else ""
+            print(f"{scenario:<11} │ {len(lat) / wall:>8,.0f} │ {np.percentile(lat, 50):>5.2f}ms │ "
+                  f"{np.percentile(lat, 99):>5.2f}ms │ {cpu} │ {errors}{unit}")
+    finally:
+        server.terminate()
+        server.wait()
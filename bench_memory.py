@@ -0,0 +1,83 @@
+"""
+시장 데이터 메모리 벤치마크 (동시 세션 N개 시뮬레이션, RSS 비교)
+- before: 세션마다 자체 mkt dict(float64 일봉 패널 전체 + 지표) 보유 — 기존 방식 (세션/리런마다 다운로드·계산)
+- after : 프로세스당 MarketStore 1개(float32 차트 배열, 필요한 컬럼만)를 모든 세션이 참조
+
+사용법: python bench_memory.py [--sessions 50]
+"""
+import argparse
+import copy
+import gc
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+def rss_mb():
+    """현재 프로세스 RSS (MB). psutil이 없으면 /proc/self/statm, 그것도 없으면 ru_maxrss"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+def run_scenario(scenario, snapshot_path, sessions):
+    """자식 프로세스에서 실행: 세션 1개일 때와 N개일 때의 RSS 측정 → 'rss1 rssN store_bytes' 출력"""
+    from market_store import build_market_store
+
+    with open(snapshot_path, "rb") as f:
+        raw = pickle.load(f)
+    if scenario == "after":
+        store = build_market_store(raw)
+        del raw
+        gc.collect()
+        held = [store]
+        rss1 = rss_mb()
+        held += [store for _ in range(sessions - 1)]
+        extra = store.nbytes
+    else:
+        held = [raw]
+        rss1 = rss_mb()
+        held += [copy.deepcopy(raw) for _ in range(sessions - 1)]
+        extra = sum(f.memory_usage(deep=True).sum() for f in raw['daily'].values())
+    gc.collect()
+    print(f"{rss1:.2f} {rss_mb():.2f} {extra}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MarketStore 세션 공유 메모리 벤치마크")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--scenario", choices=["before", "after"], help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        run_scenario(args.scenario, args.snapshot, args.sessions)
+        sys.exit(0)
+
+    from market_data import get_market_snapshot
+
+    mkt = get_market_snapshot()
+    if mkt is None:
+        print("❌ 데이터 수집 실패")
+        sys.exit(1)
+    with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as tmp:
+        pickle.dump(mkt, tmp)
+    try:
+        print(f"🧪 세션 {args.sessions}개 시뮬레이션 (종목 {len(mkt['universe'])}개)")
+        for scenario in ["before", "after"]:
+            out = subprocess.run([sys.executable, __file__, "--scenario", scenario, "--snapshot", tmp.name,
+                                  "--sessions", str(args.sessions)], capture_output=True, text=True, check=True)
+            rss1, rssn, data_bytes = out.stdout.split()[-3:]
+            rss1, rssn = float(rss1), float(rssn)
+            per_session = (rssn - rss1) / max(1, args.sessions - 1)
+            print(f"• {scenario:6s}: RSS 1세션 {rss1:.1f}MB → {args.sessions}세션 {rssn:.1f}MB │ "
+                  f"추가 세션당 {per_session*1000:.1f}KB │ 시장 데이터 {int(data_bytes)/1e3:.1f}KB")
+    finally:
+        os.unlink(tmp.name)
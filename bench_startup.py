@@ -0,0 +1,110 @@
+"""
+Cold start 벤치마크 (모듈별 import 비용 + 첫 출력까지 걸린 시간)
+- import: 모듈마다 새 인터프리터에서 `python -X importtime -c "import X"` → 누적 import 시간
+- alert : `alert.py --from-snapshot` → 첫 stdout 줄 / 종료까지 시간
+          (eager = 기존처럼 requests·pandas·yfinance를 상단에서 먼저 import)
+- app   : streamlit이 이미 로드된 새 워커에서 app.py 실행 → 첫 화면 요소(set_page_config)까지 시간
+          (eager = 기존 상단 import(pandas, plotly, yfinance, market_data, drawdown, forecast, synthetic) 재현)
+
+사용법: python bench_startup.py [--repeat 5]
+alert 측정에는 market_snapshot.json이 필요 (python alert.py 또는 대시보드를 한 번 실행)
+"""
+import argparse
+import os
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_TARGETS = ["streamlit", "pandas", "numpy", "yfinance", "plotly.graph_objects", "requests",
+                  "market_data", "market_store", "drawdown", "forecast", "synthetic", "snapshot", "alert"]
+EAGER_ALERT = "requests, pandas, yfinance, market_data"
+EAGER_APP = "pandas, plotly.graph_objects, yfinance, market_data, market_store, drawdown, forecast, synthetic"
+
+def import_cost_ms(module):
+    """새 인터프리터에서 module import 누적 시간 (ms, -X importtime 마지막 줄)"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         capture_output=True, text=True)
+    lines = [l for l in out.stderr.splitlines() if l.startswith("import time:") and "|" in l]
+    if out.returncode != 0 or not lines:
+        return None
+    return int(lines[-1].split("|")[1]) / 1000
+
+def _child_env():
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    for k in ("TELEGRAM_TOKEN", "CHAT_ID"):  # 벤치마크 중 실제 메시지 전송 방지
+        env.pop(k, None)
+    return env
+
+def alert_timing(eager):
+    """(첫 출력까지 초, 종료까지 초)"""
+    if eager:
+        cmd = [sys.executable, "-c", f"import {EAGER_ALERT}, runpy, sys; sys.argv = ['alert.py', '--from-snapshot']; "
+                                     "runpy.run_path('alert.py', run_name='__main__')"]
+    else:
+        cmd = [sys.executable, "alert.py", "--from-snapshot"]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=_child_env())
+    proc.stdout.readline()
+    first = time.perf_counter() - t0
+    proc.communicate()
+    return first, time.perf_counter() - t0
+
+class _FirstOutput(Exception):
+    pass
+
+def run_app_child(eager):
+    """자식 프로세스에서 실행: streamlit 로드 후(워커 상태) app.py 시작 → 첫 st 호출까지 초 출력"""
+    import streamlit as st
+
+    def _stop(*args, **kwargs):
+        raise _FirstOutput
+    st.set_page_config = _stop
+    t0 = time.perf_counter()
+    if eager:
+        exec(f"import {EAGER_APP}")
+    try:
+        runpy.run_path("app.py", run_name="__main__")
+    except _FirstOutput:
+        pass
+    print(f"{time.perf_counter() - t0:.4f}")
+
+def app_timing(eager):
+    out = subprocess.run([sys.executable, __file__, "--app-child"] + (["--eager"] if eager else []),
+                         capture_output=True, text=True, env=_child_env(), check=True)
+    return float(out.stdout.split()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="app.py / alert.py cold start 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app-child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.app_child:
+        run_app_child(args.eager)
+        sys.exit(0)
+
+    print("📦 모듈별 import 비용 (새 인터프리터, 누적, 중앙값)")
+    for module in IMPORT_TARGETS:
+        costs = [import_cost_ms(module) for _ in range(args.repeat)]
+        if None in costs:
+            print(f"• {module:22s}: import 실패")
+            continue
+        print(f"• {module:22s}: {statistics.median(costs):8.1f}ms")
+
+    from snapshot import load_snapshot
+    if load_snapshot() is None:
+        print("⚠️ market_snapshot.json 없음 → alert 측정 생략 (python alert.py 먼저 실행)")
+    else:
+        print("\n🔔 alert.py --from-snapshot (중앙값)")
+        for label, eager in [("eager", True), ("deferred", False)]:
+            runs = [alert_timing(eager) for _ in range(args.repeat)]
+            print(f"• {label:8s}: 첫 출력 {statistics.median(r[0] for r in runs)*1000:7.1f}ms │ "
+                  f"종료 {statistics.median(r[1] for r in runs)*1000:7.1f}ms")
+
+    print("\n🖥️ app.py 새 워커 → 첫 화면 요소 (streamlit 로드 이후, 중앙값)")
+    for label, eager in [("eager", True), ("deferred", False)]:
+        runs = [app_timing(eager) for _ in range(args.repeat)]
+        print(f"• {label:8s}: {statistics.median(runs)*1000:7.1f}ms")
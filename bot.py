@@ -0,0 +1,361 @@
+"""
+텔레그램 명령 봇 (long polling 상주 서비스)
+새 다운로드 없이 미리 계산된 결과만으로 응답한다:
+시장 스냅샷(market_snapshot.json) + alert.evaluate_market() 판정 + 과거 재생 로그(replay_events.jsonl).
+/level로 설정한 채팅별 ATH는 bot_chat_ath.json(GF_BOT_ATH_FILE)에 저장해 재시작 후에도 유지.
+
+명령: /status, /level [ATH], /action, /history [rsi80|bubble|sniper|crash|fx], /help
+사용법: python bot.py   (TELEGRAM_TOKEN 필수, BOT_ALLOWED_CHATS/CHAT_ID로 응답 채팅 제한,
+                        TELEGRAM_API_BASE로 API 주소 변경 — 로컬 가짜 서버 테스트는 fake_telegram.py 참고)
+"""
+import datetime
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from alert import BUBBLE_LEVEL2_GATE, build_status_block, determine_level, evaluate_market, get_current_level
+from levels import LEVEL_CONFIG
+from snapshot import SNAPSHOT_FILE, load_snapshot, snapshot_age
+from version import APP_VERSION_FULL
+
+API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org")
+REPLAY_LOG = os.environ.get("GF_REPLAY_LOG", "replay_events.jsonl")
+CHAT_ATH_FILE = os.environ.get("GF_BOT_ATH_FILE", "bot_chat_ath.json")  # /level로 설정한 채팅별 ATH (재시작 후에도 유지)
+POLL_TIMEOUT = 30  # getUpdates long polling 대기 (초)
+WORKERS = 8        # 채팅별 처리 레인 수 (같은 채팅은 항상 같은 단일 스레드 레인 → 순서 보장, 다른 채팅은 동시 처리)
+MAX_RETRY_AFTER = 30  # 429 응답의 retry_after가 이 값(초) 이하일 때만 1회 재전송
+
+# /history 키: (설명, 재생 로그 레코드 조건, 구간 최댓값 표시용 지표 키, 지표 표시 형식)
+HISTORY_FILTERS = {
+    'rsi80': ("QQQ 월봉 RSI ≥ 80", lambda r: r['qqq_rsi_mo'] >= 80, 'qqq_rsi_mo', "{:.1f}"),
+    'bubble': ("QQQ 120월 이격도 ≥ 100%", lambda r: r['qqq_mo_dev'] >= 1.0, 'qqq_mo_dev', "{:.1%}"),
+    'sniper': ("QQQ MDD ≤ -15%", lambda r: r['qqq_mdd'] <= -0.15, 'qqq_mdd', "{:.1%}"),
+    'crash': ("TQQQ MDD ≤ -30%", lambda r: r['tqqq_mdd'] <= -0.30, 'tqqq_mdd', "{:.1%}"),
+    'fx': ("환율 10년 평균 대비 +20%", lambda r: r['fx_deviation'] >= 0.20, 'fx_deviation', "{:+.1%}"),
+}
+EPISODE_GAP_DAYS = 7  # 이보다 긴 공백이면 다른 구간으로 분리
+
+HELP_TEXT = (
+    f"🔥 *Global Fire CRO Bot* ({APP_VERSION_FULL})\n"
+    "/status — 시장 상황판 (스냅샷 기준)\n"
+    "/level [ATH] — Level 조회/설정 (예: /level 5억, /level 500000000)\n"
+    "/action — 현재 Level 기준 CRO 판정 브리핑\n"
+    f"/history [{'|'.join(HISTORY_FILTERS)}] — 과거 재생 로그 발생 구간\n"
+)
+
+def parse_krw(text):
+    """'5억', '3.5억', '12,000만', '500000000', '5e8' → 원 단위 float. 실패 시 None"""
+    text = text.replace(",", "").replace("원", "").strip()
+    m = re.fullmatch(r"([0-9.]+(?:e[0-9]+)?)\s*(억|천만|만)?", text, re.IGNORECASE)
+    if not m:
+        return None
+    try:
+        value = float(m.group(1))
+    except ValueError:
+        return None
+    return value * {"억": 1e8, "천만": 1e7, "만": 1e4}.get(m.group(2), 1)
+
+def _episodes(dates, values):
+    """정렬된 (날짜 문자열, 지표값) → 연속 구간 [(시작, 끝, 일수, 최댓값 절대치 기준 값)]"""
+    out = []
+    prev = None
+    for d, v in zip(dates, values):
+        day = datetime.date.fromisoformat(d).toordinal()
+        if prev is None or day - prev > EPISODE_GAP_DAYS:
+            out.append([d, d, 0, v])
+        ep = out[-1]
+        ep[1], ep[2] = d, ep[2] + 1
+        if abs(v) > abs(ep[3]):
+            ep[3] = v
+        prev = day
+    return out
+
+def _incomplete_reason(header):
+    """재생 로그 헤더 → 모든 이벤트 발생일이 기록된 로그가 아니면 사유, 맞으면 None"""
+    if header is None:
+        return "재생 조건 헤더가 없는 예전 로그"
+    if header.get('changes_only'):
+        return "--changes-only 로그 (이벤트 조합이 바뀐 날만 기록)"
+    return None
+
+def load_chat_ath(path):
+    """채팅별 ATH 파일 → {chat_id: ATH}. 파일이 없거나 깨졌으면 빈 dict"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {int(k): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def save_chat_ath(chat_ath, path):
+    """채팅별 ATH 저장 (임시 파일 → 교체, 재시작 중 반쯤 쓰인 파일을 읽지 않도록)"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in chat_ath.items()}, f)
+    os.replace(tmp, path)
+
+class ReplayIndex:
+    """replay_events.jsonl → /history 키별 발생 구간 (파일이 바뀌었을 때만 다시 읽음)
+    거래일 수·구간은 모든 이벤트 발생일이 기록된 로그에서만 맞으므로, 헤더가 없거나 --changes-only 로그면 집계하지 않음"""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.index = {}
+        self.span = None
+        self.problem = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        """(키별 (거래일 수, 구간), (시작일, 종료일), 불완전 로그 사유 또는 None)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None, None, None
+        with self.lock:
+            if mtime != self.mtime:
+                header, records = None, []
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            r = json.loads(line)
+                            if r.get('header'):
+                                header = r
+                            else:
+                                records.append(r)
+                self.problem = _incomplete_reason(header)
+                self.index = {}
+                if self.problem is None:
+                    for key, (_, cond, metric, _) in HISTORY_FILTERS.items():
+                        hits = [r for r in records if cond(r)]
+                        self.index[key] = (len(hits), _episodes([r['date'] for r in hits], [r[metric] for r in hits]))
+                if header is not None:
+                    self.span = (header['start'], header['end'])
+                else:
+                    self.span = (records[0]['date'], records[-1]['date']) if records else None
+                self.mtime = mtime
+            return self.index, self.span, self.problem
+
+class CommandBot:
+    """long polling 루프 + 채팅별 레인 응답. 스냅샷/판정은 파일 변경 시에만 다시 읽고 (버전, Level)별로 메모"""
+
+    def __init__(self, token, allowed_chats=None, api_base=API_BASE, workers=WORKERS, snapshot_path=None, replay_log=REPLAY_LOG,
+                 chat_ath_path=CHAT_ATH_FILE):
+        self.url = f"{api_base.rstrip('/')}/bot{token}"
+        self.allowed = set(allowed_chats or [])
+        self.session = requests.Session()
+        self.session.mount(api_base, HTTPAdapter(pool_connections=1, pool_maxsize=workers + 1))
+        self.lanes = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"bot-{i}") for i in range(workers)]
+        self.offset = None
+        self.snapshot_path = snapshot_path or SNAPSHOT_FILE
+        self.snapshot = None
+        self.snapshot_mtime = None
+        self.decisions = {}
+        self.replay = ReplayIndex(replay_log)
+        self.chat_ath_path = chat_ath_path
+        self.chat_ath = load_chat_ath(chat_ath_path)
+        self.default_ath = get_current_level()[1]
+        self.lock = threading.Lock()
+        self.timings = deque(maxlen=1000)  # 명령 처리 시간(초, 전송 제외)
+
+    # --- 데이터 (미리 계산된 결과만 사용) ---
+    def current_snapshot(self):
+        try:
+            mtime = os.path.getmtime(self.snapshot_path)
+        except OSError:
+            return None
+        with self.lock:
+            if mtime != self.snapshot_mtime:
+                self.snapshot = load_snapshot(path=self.snapshot_path)
+                self.snapshot_mtime = mtime
+                self.decisions = {}
+            return self.snapshot
+
+    def decision(self, snap, level):
+        key = (snap['version'], level)
+        result = self.decisions.get(key)
+        if result is None:
+            result = self.decisions[key] = evaluate_market(snap, level)
+        return result
+
+    def set_chat_ath(self, chat_id, ath):
+        """채팅별 ATH 설정 + 파일 저장 (레인 간 동시 저장은 lock으로 직렬화). 저장 성공 여부 반환"""
+        with self.lock:
+            self.chat_ath[chat_id] = ath
+            try:
+                save_chat_ath(self.chat_ath, self.chat_ath_path)
+            except OSError as e:
+                print(f"⚠️ 채팅별 ATH 저장 실패: {e}")
+                return False
+        return True
+
+    def chat_level(self, chat_id):
+        ath = self.chat_ath.get(chat_id, self.default_ath)
+        return determine_level(ath), ath
+
+    # --- 명령 ---
+    def cmd_status(self, chat_id, arg, snap):
+        level, ath = self.chat_level(chat_id)
+        return (build_status_block(snap, level, ath) +
+                f"🕒 스냅샷 {snapshot_age(snap)/3600:.1f}시간 전 (v{snap['version']})")
+
+    def cmd_level(self, chat_id, arg, snap):
+        if arg:
+            ath = parse_krw(arg)
+            if ath is None:
+                return "⚠️ 금액 형식 오류 (예: /level 5억, /level 500000000)"
+            saved = self.set_chat_ath(chat_id, ath)
+        level, ath = self.chat_level(chat_id)
+        cfg = LEVEL_CONFIG[level]
+        text = (f"📶 *{cfg['name']}* (ATH ₩{ath:,.0f})\n"
+                f"• 목표 비중: 주식 {cfg['target_stock']*100:.1f}% / 현금 {cfg['target_cash']*100:.1f}%\n"
+                f"• 이격도 버블 방어: {'발동 대상' if level >= BUBBLE_LEVEL2_GATE else f'무시 (시드 펌핑, LV<{BUBBLE_LEVEL2_GATE})'}\n")
+        if level < 18:
+            text += f"• 다음 레벨까지 ₩{max(0, cfg['limit'] - ath):,.0f}\n"
+        if arg:
+            text += "• 이 채팅의 ATH로 저장됨\n" if saved else "⚠️ ATH 저장 실패 — 봇 재시작 시 기본값으로 돌아감\n"
+        return text
+
+    def cmd_action(self, chat_id, arg, snap):
+        level, ath = self.chat_level(chat_id)
+        msg, triggered, _ = self.decision(snap, level)
+        if not triggered:
+            msg = f"✅ *시장 정상 (LV.{level})*\n💡 평시 적립: 월급 500만 원은 Level 목표 비중에 맞춰 분할 투입.\n\n"
+        return msg + f"🕒 스냅샷 {snapshot_age(snap)/3600:.1f}시간 전 기준"
+
+    def cmd_history(self, chat_id, arg, snap):
+        key = (arg or "rsi80").lower()
+        if key not in HISTORY_FILTERS:
+            return f"⚠️ 지원 키: {', '.join(HISTORY_FILTERS)}"
+        index, span, problem = self.replay.get()
+        if not span:
+            return "⚠️ 과거 재생 로그 없음 (python replay.py 로 먼저 생성)"
+        if problem:
+            return f"⚠️ 과거 재생 로그가 불완전해 집계하지 않음: {problem}\n(python replay.py 를 --changes-only 없이 다시 실행)"
+        label, _, _, fmt = HISTORY_FILTERS[key]
+        days, episodes = index[key]
+        text = f"📜 *{label}* — {len(episodes)}개 구간 / {days:,}거래일 (재생 로그 {span[0]} ~ {span[1]})\n"
+        for start, end, n, peak in episodes[-10:][::-1]:
+            text += f"• {start} ~ {end} ({n}일, 최대 {fmt.format(peak)})\n"
+        return text
+
+    def cmd_help(self, chat_id, arg, snap):
+        return HELP_TEXT
+
+    COMMANDS = {'/status': cmd_status, '/level': cmd_level, '/action': cmd_action, '/history': cmd_history,
+                '/help': cmd_help, '/start': cmd_help}
+    NEEDS_SNAPSHOT = {'/status', '/action'}
+
+    def handle(self, message):
+        """메시지 1개 → 응답 텍스트 (명령이 아니면 None). 네트워크 없이 메모리/로컬 파일만 사용"""
+        text = (message.get('text') or "").strip()
+        if not text.startswith("/"):
+            return None
+        cmd, _, arg = text.partition(" ")
+        cmd = cmd.split("@")[0].lower()  # 그룹 채팅의 /status@봇이름 형식
+        handler = self.COMMANDS.get(cmd)
+        if handler is None:
+            return HELP_TEXT
+        snap = self.current_snapshot()
+        if snap is None and cmd in self.NEEDS_SNAPSHOT:
+            return "⚠️ 시장 스냅샷 없음 (python alert.py 또는 대시보드 실행 후 생성됨)"
+        return handler(self, message['chat']['id'], arg.strip(), snap)
+
+    # --- 텔레그램 API ---
+    def process(self, update):
+        message = update.get('message')
+        if not message or 'chat' not in message:
+            return
+        chat_id = message['chat']['id']
+        if self.allowed and str(chat_id) not in self.allowed:
+            return
+        t0 = time.perf_counter()
+        try:
+            reply = self.handle(message)
+        except Exception as e:
+            reply = f"⚠️ 처리 오류: {e}"
+        self.timings.append(time.perf_counter() - t0)
+        if reply:
+            self.send(chat_id, reply)
+
+    def send(self, chat_id, text, parse_mode="Markdown", retry=True):
+        """sendMessage → 성공 여부. 실패는 로그로 남기고, Markdown 파싱 오류(400)는 parse_mode 없이,
+        429는 retry_after만큼 기다린 뒤 1회 재전송"""
+        payload = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        try:
+            resp = self.session.post(f"{self.url}/sendMessage", json=payload, timeout=10)
+            data = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"❌ 전송 실패 ({chat_id}): {e}")
+            return False
+        if resp.ok and data.get('ok'):
+            return True
+        desc = data.get('description') or f"HTTP {resp.status_code}"
+        if parse_mode and resp.status_code == 400 and "parse" in desc.lower():
+            print(f"⚠️ Markdown 파싱 실패 ({chat_id}): {desc} → 서식 없이 재전송")
+            return self.send(chat_id, text, parse_mode=None, retry=retry)
+        retry_after = (data.get('parameters') or {}).get('retry_after')
+        if retry and resp.status_code == 429 and retry_after is not None and retry_after <= MAX_RETRY_AFTER:
+            print(f"⚠️ 전송 제한 ({chat_id}): {retry_after}초 후 재전송")
+            time.sleep(retry_after)
+            return self.send(chat_id, text, parse_mode=parse_mode, retry=False)
+        print(f"❌ 전송 실패 ({chat_id}): {desc}")
+        return False
+
+    def lane(self, update):
+        """업데이트 → 채팅별 단일 스레드 레인 (같은 채팅의 명령은 받은 순서대로 처리·응답)"""
+        chat_id = ((update.get('message') or {}).get('chat') or {}).get('id', 0)
+        return self.lanes[hash(chat_id) % len(self.lanes)]
+
+    def poll_once(self, timeout=POLL_TIMEOUT):
+        """getUpdates 1회 → 받은 업데이트를 채팅별 레인에 분배하고 offset 전진. 받은 개수 반환"""
+        params = {'timeout': timeout, 'allowed_updates': json.dumps(["message"])}
+        if self.offset is not None:
+            params['offset'] = self.offset
+        resp = self.session.get(f"{self.url}/getUpdates", params=params, timeout=timeout + 10)
+        data = resp.json()
+        if not data.get('ok'):
+            raise RuntimeError(data.get('description', 'getUpdates 실패'))
+        updates = data.get('result', [])
+        for update in updates:
+            self.offset = update['update_id'] + 1
+            self.lane(update).submit(self.process, update)
+        return len(updates)
+
+    def run(self, stop_event=None, timeout=POLL_TIMEOUT):
+        """stop_event가 설정될 때까지 long polling (네트워크 오류 시 지수 백오프, 최대 30초)"""
+        backoff = 1
+        while not (stop_event and stop_event.is_set()):
+            try:
+                self.poll_once(timeout)
+                backoff = 1
+            except (requests.RequestException, RuntimeError, ValueError) as e:
+                print(f"⚠️ getUpdates 실패: {e} ({backoff}초 후 재시도)")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+        for lane in self.lanes:
+            lane.shutdown(wait=True)
+
+def allowed_chats_from_env():
+    raw = os.environ.get('BOT_ALLOWED_CHATS') or os.environ.get('CHAT_ID') or ""
+    return [c.strip() for c in raw.split(",") if c.strip()]
+
+if __name__ == "__main__":
+    token = os.environ.get('TELEGRAM_TOKEN')
+    if not token:
+        print("❌ TELEGRAM_TOKEN 환경 변수가 설정되지 않았습니다.")
+        raise SystemExit(1)
+    bot = CommandBot(token, allowed_chats_from_env())
+    print(f"🤖 명령 봇 시작 ({APP_VERSION_FULL}) │ API {API_BASE} │ 응답 채팅 {', '.join(bot.allowed) or '전체'}")
+    try:
+        bot.run()
+    except KeyboardInterrupt:
+        print("👋 종료")
@@ -0,0 +1,146 @@
+"""
+Drawdown / 수중 구간(Underwater) 분석 엔진
+전체 기간(period=max) 가격 시계열을 O(n) 단일 패스로 훑어 모든 수중 구간을 추출한다.
+(다운로드 기간에 따라 값이 바뀌는 cummax MDD 대신, 전체 역사 기준 고점/저점/회복 정보를 제공)
+"""
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# 회복 기간 분포 집계용 깊이 구간 (원칙 3 스나이퍼 단계: -15 / -25 / -35 / -45 / -50 과 정렬)
+DEPTH_BUCKETS = [
+    (0.05, 0.10, "-5 ~ -10%"),
+    (0.10, 0.15, "-10 ~ -15%"),
+    (0.15, 0.25, "-15 ~ -25%"),
+    (0.25, 0.35, "-25 ~ -35%"),
+    (0.35, 0.45, "-35 ~ -45%"),
+    (0.45, 0.50, "-45 ~ -50%"),
+    (0.50, 1.01, "-50% 이하"),
+]
+
+_CACHE_MAX = 32
+_cache = OrderedDict()
+
+def _to_arrays(prices, dates=None):
+    """pandas Series / ndarray 입력을 (가격 float64 배열, datetime64[D] 배열 or None)로 정규화 (NaN 제거)"""
+    if dates is None and hasattr(prices, "index"):
+        dates = prices.index
+    values = np.asarray(prices, dtype=np.float64).ravel()
+    valid = np.isfinite(values) & (values > 0)
+    values = values[valid]
+    if dates is not None:
+        dates = np.asarray(dates, dtype="datetime64[D]")[valid]
+    return values, dates
+
+def compute_drawdown(prices):
+    """고점 대비 낙폭 시계열 (cummax 기반, 1회 누적 최대값 스캔)"""
+    values = np.asarray(prices, dtype=np.float64)
+    roll_max = np.maximum.accumulate(values)
+    return values / roll_max - 1.0
+
+def analyze_drawdowns(prices, dates=None, min_depth=0.0):
+    """
+    모든 수중 구간(고점 → 저점 → 회복)을 O(n)으로 추출.
+    반환: {'episodes': [...], 'current_dd', 'max_dd', 'current_episode', 'recovery_stats'}
+    - episodes: peak/trough/recovery 날짜, depth, 고점→저점 / 저점→회복 / 고점→회복 기간(거래일·달력일)
+    - current_episode: 진행 중인 수중 구간(없으면 None), age = 고점 이후 경과일
+    """
+    values, dates = _to_arrays(prices, dates)
+    n = len(values)
+    result = {'episodes': [], 'current_dd': 0.0, 'max_dd': 0.0, 'current_episode': None, 'recovery_stats': []}
+    if n == 0:
+        return result
+
+    dd = compute_drawdown(values)
+    underwater = dd < 0
+    # 수중 구간 경계: 0 → 1 전환이 시작, 1 → 0 전환이 회복 (마지막까지 수중이면 진행 중)
+    edges = np.diff(np.concatenate(([0], underwater.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    if len(starts):
+        # 구간별 최저점: reduceat으로 구간 최소값 → 최소값과 같은 첫 인덱스를 구간 ID 변화점으로 추출
+        seg_min = np.minimum.reduceat(dd, starts)
+        seg_id = np.where(underwater, np.cumsum(edges[:n] == 1) - 1, -1)
+        hits = np.flatnonzero((seg_id >= 0) & (dd == seg_min[np.maximum(seg_id, 0)]))
+        first_hit = np.concatenate(([True], np.diff(seg_id[hits]) != 0))
+        troughs = hits[first_hit]
+
+        keep = -seg_min >= min_depth
+        peaks = starts - 1
+        for i in np.flatnonzero(keep):
+            result['episodes'].append(_episode(values, dates, dd, peaks[i], troughs[i], ends[i], n))
+
+    result['current_dd'] = float(dd[-1])
+    result['max_dd'] = float(dd.min())
+    if result['episodes'] and result['episodes'][-1]['recovery_idx'] is None and underwater[-1]:
+        result['current_episode'] = result['episodes'][-1]
+    result['recovery_stats'] = recovery_distribution(result['episodes'])
+    return result
+
+def _episode(values, dates, dd, peak, trough, end, n):
+    recovered = end < n
+    ep = {
+        'peak_idx': int(peak), 'trough_idx': int(trough), 'recovery_idx': int(end) if recovered else None,
+        'peak_price': float(values[peak]), 'trough_price': float(values[trough]),
+        'depth': float(dd[trough]),
+        'bars_to_trough': int(trough - peak),
+        'bars_to_recovery': int(end - trough) if recovered else None,
+        'bars_underwater': int((end if recovered else n - 1) - peak),
+        'peak_date': None, 'trough_date': None, 'recovery_date': None,
+        'days_to_trough': None, 'days_to_recovery': None, 'days_underwater': None, 'age_days': None,
+    }
+    if dates is not None:
+        ep['peak_date'] = dates[peak]
+        ep['trough_date'] = dates[trough]
+        ep['days_to_trough'] = int((dates[trough] - dates[peak]).astype(int))
+        if recovered:
+            ep['recovery_date'] = dates[end]
+            ep['days_to_recovery'] = int((dates[end] - dates[trough]).astype(int))
+            ep['days_underwater'] = int((dates[end] - dates[peak]).astype(int))
+        else:
+            ep['age_days'] = int((dates[-1] - dates[peak]).astype(int))
+            ep['days_underwater'] = ep['age_days']
+    elif not recovered:
+        ep['age_days'] = ep['bars_underwater']
+    return ep
+
+def recovery_distribution(episodes):
+    """깊이 구간별 회복 기간 분포 (회복 완료 구간 기준 중앙값/75%/90%/최대, 미회복 건수 별도)"""
+    stats = []
+    key = 'days_underwater' if episodes and episodes[0]['peak_date'] is not None else 'bars_underwater'
+    for lo, hi, label in DEPTH_BUCKETS:
+        bucket = [ep for ep in episodes if lo <= -ep['depth'] < hi]
+        recovered = [ep for ep in bucket if ep['recovery_idx'] is not None]
+        durations = np.array([ep[key] for ep in recovered], dtype=np.float64)
+        row = {'bucket': label, 'count': len(bucket), 'recovered': len(recovered), 'unrecovered': len(bucket) - len(recovered),
+               'unit': '일' if key == 'days_underwater' else '봉',
+               'median': None, 'p75': None, 'p90': None, 'max': None}
+        if len(durations):
+            row['median'], row['p75'], row['p90'] = (float(x) for x in np.percentile(durations, [50, 75, 90]))
+            row['max'] = float(durations.max())
+        stats.append(row)
+    return stats
+
+def _fingerprint(values, dates):
+    h = hashlib.blake2b(np.ascontiguousarray(values).tobytes(), digest_size=16)
+    if dates is not None:
+        h.update(np.ascontiguousarray(dates).view(np.int64).tobytes())
+    return h.hexdigest()
+
+def analyze_drawdowns_cached(key, prices, dates=None, min_depth=0.0):
+    """
+    analyze_drawdowns() 결과를 (키, 데이터 내용 해시, min_depth) 기준으로 LRU 캐싱.
+    같은 데이터로 다시 호출되면(새로고침) 재계산 없이 즉시 반환한다.
+    """
+    values, dates = _to_arrays(prices, dates)
+    cache_key = (key, _fingerprint(values, dates), min_depth)
+    if cache_key in _cache:
+        _cache.move_to_end(cache_key)
+        return _cache[cache_key]
+    result = analyze_drawdowns(values, dates, min_depth=min_depth)
+    _cache[cache_key] = result
+    while len(_cache) > _CACHE_MAX:
+        _cache.popitem(last=False)
+    return result
@@ -0,0 +1,133 @@
+"""
+로컬 가짜 텔레그램 Bot API 서버 (bot.py 테스트/부하 측정용, 네트워크·실제 토큰 불필요)
+getUpdates(long polling, offset 확인 처리)와 sendMessage만 구현한다.
+
+사용법: python fake_telegram.py [--chats 50] [--messages 10]
+  → 가짜 서버 + CommandBot(TELEGRAM_API_BASE=로컬)을 띄우고 여러 채팅에서 동시에 명령을 보내
+    명령 처리 시간(전송 제외)과 요청→응답 왕복 시간 백분위를 보고한다. market_snapshot.json 필요.
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeTelegram:
+    """업데이트 큐 + 전송 기록. inject()로 사용자 메시지를 넣고 sent에서 봇 응답을 확인"""
+
+    def __init__(self):
+        self.updates = []
+        self.sent = []
+        self.ids = itertools.count(1)
+        self.cond = threading.Condition()
+
+    def inject(self, chat_id, text):
+        with self.cond:
+            update_id = next(self.ids)
+            self.updates.append({'update_id': update_id, 'message': {
+                'message_id': update_id, 'date': int(time.time()), 'text': text,
+                'chat': {'id': chat_id, 'type': 'private'}}, '_t': time.perf_counter()})
+            self.cond.notify_all()
+            return update_id
+
+    def get_updates(self, offset, timeout):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            if offset is not None:
+                self.updates = [u for u in self.updates if u['update_id'] >= offset]  # offset 미만은 확인 처리됨
+            while not self.updates and time.monotonic() < deadline:
+                self.cond.wait(deadline - time.monotonic())
+            return [{k: v for k, v in u.items() if k != '_t'} for u in self.updates]
+
+    def send_message(self, payload):
+        with self.cond:
+            self.sent.append(dict(payload, _t=time.perf_counter()))
+            self.cond.notify_all()
+
+    def wait_sent(self, count, timeout=30):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while len(self.sent) < count and time.monotonic() < deadline:
+                self.cond.wait(deadline - time.monotonic())
+            return len(self.sent) >= count
+
+def make_server(fake, host="127.0.0.1", port=0):
+    """FakeTelegram을 HTTP로 노출 (/bot<token>/getUpdates, /bot<token>/sendMessage)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, obj):
+            body = json.dumps({'ok': True, 'result': obj}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.endswith("/getUpdates"):
+                offset = int(q['offset']) if 'offset' in q else None
+                self._reply(fake.get_updates(offset, float(q.get('timeout', 0))))
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+            if self.path.endswith("/sendMessage"):
+                fake.send_message(payload)
+                self._reply({'message_id': 0, 'chat': {'id': payload.get('chat_id')}, 'text': payload.get('text')})
+            else:
+                self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    import numpy as np
+
+    from bot import CommandBot
+    from snapshot import load_snapshot
+
+    parser = argparse.ArgumentParser(description="가짜 텔레그램 서버로 bot.py 동시 응답 측정")
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=10, help="채팅당 명령 수")
+    args = parser.parse_args()
+    if load_snapshot() is None:
+        print("❌ market_snapshot.json 없음 → python alert.py 먼저 실행")
+        raise SystemExit(1)
+
+    fake = FakeTelegram()
+    server = make_server(fake)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    bot = CommandBot("TEST", api_base=base)
+    stop = threading.Event()
+    threading.Thread(target=bot.run, kwargs={'stop_event': stop, 'timeout': 1}, daemon=True).start()
+
+    commands = ["/status", "/action", "/level 5억", "/action", "/history rsi80", "/level", "/history sniper"]
+    total = args.chats * args.messages
+    t0 = time.perf_counter()
+    injected = {}
+    for i in range(args.messages):
+        for chat in range(1, args.chats + 1):
+            injected[fake.inject(chat, commands[(chat + i) % len(commands)])] = time.perf_counter()
+    ok = fake.wait_sent(total)
+    wall = time.perf_counter() - t0
+    stop.set()
+    server.shutdown()
+
+    proc = np.array(bot.timings) * 1000
+    first_inject = min(injected.values())
+    rtt = np.array([s['_t'] - first_inject for s in fake.sent]) * 1000
+    print(f"🤖 {args.chats}개 채팅 × {args.messages}개 명령 = {total:,}건 │ 응답 {len(fake.sent):,}건 {'✅' if ok else '❌ 시간 초과'}")
+    print(f"• 명령 처리 시간(전송 제외): p50 {np.percentile(proc, 50):.2f}ms │ p99 {np.percentile(proc, 99):.2f}ms │ max {proc.max():.2f}ms")
+    print(f"• 전체 소요 {wall:.2f}초 │ 처리량 {len(fake.sent)/wall:,.0f}건/초 │ 마지막 응답까지 {rtt.max():.0f}ms")
@@ -0,0 +1,171 @@
+"""
+Monte Carlo 레벨 도달 예측기 (LEVEL_CONFIG 마일스톤)
+TQQQ/USD 월간 수익률을 블록 부트스트랩(상관관계 보존)으로 재표본추출하여 수만 개 경로를 동시에 시뮬레이션한다.
+경로 축은 전부 numpy 벡터화, 시간 축(월)만 루프. 시드 고정 시 워커 수와 무관하게 동일 결과.
+
+사용법: python forecast.py --paths 100000 --years 30 --workers 4 --seed 42
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 기본 마일스톤 (app.py LEVEL_CONFIG 이름의 🎯 표시 레벨)
+MILESTONES = {10: "LV.10 육아/퇴사", 15: "LV.15 Coast FIRE", 18: "LV.18 Global FIRE"}
+CHUNK_PATHS = 25000  # 시드 스트림 분할 단위 (워커 수가 바뀌어도 경로별 난수는 동일)
+PERCENTILES = [10, 25, 50, 75, 90]
+
+def _level_arrays(level_config):
+    levels = sorted(level_config)
+    limits = np.array([level_config[lv]['limit'] for lv in levels], dtype=np.float64)
+    target_stock = np.array([level_config[lv]['target_stock'] for lv in levels], dtype=np.float64)
+    return limits, target_stock
+
+def _simulate_chunk(args):
+    """경로 묶음 1개 시뮬레이션 → (마일스톤 최초 도달 월[paths, m], 연말 총자산[paths, years])"""
+    (seed_seq, n_paths, returns, months, block_len, start, monthly_contribution,
+     contribution_growth, cash_yield, limits, target_stock, milestone_levels) = args
+    rng = np.random.default_rng(seed_seq)
+    n_hist = len(returns)
+    block_len = min(block_len, n_hist)
+    n_blocks = -(-months // block_len)
+    block_starts = rng.integers(0, n_hist - block_len + 1, size=(n_paths, n_blocks), dtype=np.int32)
+
+    tq = np.full(n_paths, start['tqqq'], dtype=np.float64)
+    us = np.full(n_paths, start['usd'], dtype=np.float64)
+    cash = np.full(n_paths, start['cash'], dtype=np.float64)
+    ath = np.full(n_paths, start['ath'], dtype=np.float64)
+    growth_tq = np.ascontiguousarray(1.0 + returns[:, 0])
+    growth_us = np.ascontiguousarray(1.0 + returns[:, 1])
+    yearly = np.empty((n_paths, months // 12), dtype=np.float64)
+    level_hist = np.empty((months + 1, n_paths), dtype=np.int8)
+    cash_growth = (1.0 + cash_yield) ** (1 / 12)
+    top = len(limits) - 1
+
+    # Level 인덱스는 ATH 래칫이라 단조 증가 → 매달 searchsorted 대신 한계값 초과분만 한 칸씩 올림
+    level_idx = np.minimum(np.searchsorted(limits, ath, side='left'), top)
+    level_hist[0] = level_idx
+    for t in range(months):
+        idx = block_starts[:, t // block_len] + (t % block_len)
+        tq *= np.take(growth_tq, idx)
+        us *= np.take(growth_us, idx)
+        cash *= cash_growth
+
+        # 월 적립: 현재 Level(ATH 래칫) 목표 비중대로 주식(TQQQ:USD 50:50) / 현금 분배. 기존 보유분 매도 없음 (원칙 1-5)
+        contribution = monthly_contribution * (1.0 + contribution_growth) ** (t // 12)
+        stock_buy = np.take(target_stock, level_idx) * contribution
+        tq += stock_buy * 0.5
+        us += stock_buy * 0.5
+        cash += contribution - stock_buy
+
+        total = tq + us + cash
+        np.maximum(ath, total, out=ath)
+        bump = (ath > np.take(limits, level_idx)) & (level_idx < top)
+        while bump.any():
+            level_idx += bump
+            bump = (ath > np.take(limits, level_idx)) & (level_idx < top)
+        level_hist[t + 1] = level_idx
+        if (t + 1) % 12 == 0:
+            yearly[:, (t + 1) // 12 - 1] = total
+
+    # 마일스톤 최초 도달 월: Level 이력이 단조 증가하므로 첫 True 위치(argmax)가 곧 도달 시점
+    first_hit = np.empty((n_paths, len(milestone_levels)), dtype=np.int32)
+    for j, lv in enumerate(milestone_levels):
+        reached = level_hist >= lv - 1
+        first_hit[:, j] = np.where(reached[-1], reached.argmax(axis=0), -1)
+    return first_hit, yearly
+
+def simulate_level_progression(returns, level_config, start, monthly_contribution, years=30, n_paths=100000,
+                               block_len=12, seed=None, workers=1, contribution_growth=0.0, cash_yield=0.03,
+                               milestones=None):
+    """
+    returns: (n_months, 2) TQQQ/USD 월간 수익률 (같은 달끼리 한 행 → 블록 단위로 함께 추출하여 상관관계 보존)
+    start: {'tqqq', 'usd', 'cash', 'ath'} 현재 평가금(원) / ATH
+    반환: {'milestones': [{level, name, limit, prob, years_pct{p: 년}}], 'wealth_pct': {p: [연도별 총자산]}, 'elapsed'}
+    """
+    t0 = time.perf_counter()
+    milestones = milestones or MILESTONES
+    milestone_levels = sorted(milestones)
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    limits, target_stock = _level_arrays(level_config)
+    months = int(years) * 12
+
+    n_chunks = max(1, -(-int(n_paths) // CHUNK_PATHS))
+    sizes = [CHUNK_PATHS] * (n_chunks - 1) + [int(n_paths) - CHUNK_PATHS * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [(seeds[i], sizes[i], returns, months, block_len, start, monthly_contribution,
+              contribution_growth, cash_yield, limits, target_stock, milestone_levels) for i in range(n_chunks)]
+    if workers and workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, n_chunks)) as pool:
+            parts = list(pool.map(_simulate_chunk, tasks))
+    else:
+        parts = [_simulate_chunk(task) for task in tasks]
+    first_hit = np.concatenate([p[0] for p in parts])
+    yearly = np.concatenate([p[1] for p in parts])
+
+    result = {'milestones': [], 'wealth_pct': {}, 'n_paths': int(n_paths), 'years': int(years)}
+    for j, lv in enumerate(milestone_levels):
+        hit = first_hit[:, j]
+        reached = hit[hit >= 0] / 12.0
+        row = {'level': lv, 'name': milestones[lv], 'limit': float(limits[lv - 2]) if lv > 1 else 0.0,
+               'prob': float(len(reached) / len(hit)), 'years_pct': {}}
+        if len(reached):
+            # 미도달 경로는 '기간 밖'으로 취급한 전체 분포의 백분위 (도달 확률이 p% 미만이면 None)
+            full = np.where(hit >= 0, hit, months + 1) / 12.0
+            for p, v in zip(PERCENTILES, np.percentile(full, PERCENTILES, method='lower')):
+                row['years_pct'][p] = float(v) if v <= years else None
+        result['milestones'].append(row)
+    for p, v in zip(PERCENTILES, np.percentile(yearly, PERCENTILES, axis=0)):
+        result['wealth_pct'][p] = v.tolist()
+    result['elapsed'] = time.perf_counter() - t0
+    return result
+
+def monthly_returns(daily_prices):
+    """일봉 수정종가(DataFrame, 컬럼 = TQQQ/USD) → 공통 기간 월말 수익률 (n_months, 2)"""
+    monthly = daily_prices.resample('ME').last().pct_change().dropna()
+    return monthly.to_numpy()
+
+if __name__ == "__main__":
+    from market_data import download_panel
+    from universe import FX_TICKER
+    from levels import LEVEL_CONFIG
+
+    parser = argparse.ArgumentParser(description="LEVEL_CONFIG 마일스톤 도달 시간 Monte Carlo 예측")
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--block", type=int, default=12, help="블록 부트스트랩 길이(월)")
+    args = parser.parse_args()
+
+    data = {}
+    if os.path.exists("portfolio_data.json"):
+        with open("portfolio_data.json", "r") as f:
+            data = json.load(f)
+    panel = download_panel(["TQQQ", "USD"], "1d", "max")  # 품질 검사(validation.py) 포함
+    fx_panel = download_panel([FX_TICKER], "1d", "5d")
+    if panel is None or fx_panel is None:
+        print("❌ 데이터 수집 실패")
+        sys.exit(1)
+    px = panel.get('Adj Close', panel['Close'])[["TQQQ", "USD"]].dropna()
+    fx = float(fx_panel['Close'][FX_TICKER].dropna().iloc[-1])
+    last = px.iloc[-1]
+
+    start = {
+        'tqqq': (data.get('a_tqqq_qty', 0) + data.get('b_tqqq_qty', 0)) * last['TQQQ'] * fx,
+        'usd': (data.get('a_usd_qty', 0) + data.get('b_usd_qty', 0)) * last['USD'] * fx,
+        'cash': data.get('a_cash_krw', 0) + data.get('b_cash_krw', 0) + data.get('c_cash_krw', 0)
+                + (data.get('a_cash_usd', 0) + data.get('b_cash_usd', 0)) * fx,
+    }
+    start['ath'] = max(float(data.get('ath_assets', 0) or 0), start['tqqq'] + start['usd'] + start['cash'])
+
+    res = simulate_level_progression(monthly_returns(px), LEVEL_CONFIG, start, data.get('monthly_contribution', 5000000),
+                                     years=args.years, n_paths=args.paths, block_len=args.block, seed=args.seed, workers=args.workers)
+    print(f"🎲 {res['n_paths']:,} paths × {res['years']}년 ({res['elapsed']:.2f}s, workers={args.workers})")
+    for m in res['milestones']:
+        pct = " / ".join(f"P{p} {v:.1f}년" if v is not None else f"P{p} -" for p, v in m['years_pct'].items())
+        print(f"• {m['name']}: 도달 확률 {m['prob']*100:.1f}% │ {pct}")
@@ -0,0 +1,26 @@
+# ==========================================
+# 레벨(글라이드 패스) 설정 중앙 관리 파일
+# app.py 및 분석 도구(forecast.py 등)가 공통으로 참조
+# ==========================================
+
+# V24.1 Level Configuration
+LEVEL_CONFIG = {
+    1: {"limit": 50000000, "target_stock": 0.95, "target_cash": 0.05, "name": "LV. 1 (~5천만)"},
+    2: {"limit": 100000000, "target_stock": 0.90, "target_cash": 0.10, "name": "LV. 2 (~1억)"},
+    3: {"limit": 150000000, "target_stock": 0.875, "target_cash": 0.125, "name": "LV. 3 (~1.5억)"},
+    4: {"limit": 200000000, "target_stock": 0.85, "target_cash": 0.15, "name": "LV. 4 (~2억)"},
+    5: {"limit": 300000000, "target_stock": 0.825, "target_cash": 0.175, "name": "LV. 5 (~3억)"},
+    6: {"limit": 400000000, "target_stock": 0.80, "target_cash": 0.20, "name": "LV. 6 (~4억)"},
+    7: {"limit": 550000000, "target_stock": 0.775, "target_cash": 0.225, "name": "LV. 7 (~5.5억)"},
+    8: {"limit": 700000000, "target_stock": 0.75, "target_cash": 0.25, "name": "LV. 8 (~7억)"},
+    9: {"limit": 850000000, "target_stock": 0.725, "target_cash": 0.275, "name": "LV. 9 (~8.5억)"},
+    10: {"limit": 1000000000, "target_stock": 0.70, "target_cash": 0.30, "name": "LV. 10 (~10억) [🎯 1차: 육아/퇴사]"},
+    11: {"limit": 1250000000, "target_stock": 0.675, "target_cash": 0.325, "name": "LV. 11 (~12.5억)"},
+    12: {"limit": 1500000000, "target_stock": 0.65, "target_cash": 0.35, "name": "LV. 12 (~15억)"},
+    13: {"limit": 1750000000, "target_stock": 0.625, "target_cash": 0.375, "name": "LV. 13 (~17.5억)"},
+    14: {"limit": 2000000000, "target_stock": 0.60, "target_cash": 0.40, "name": "LV. 14 (~20억)"},
+    15: {"limit": 2300000000, "target_stock": 0.575, "target_cash": 0.425, "name": "LV. 15 (~23억) [🎯 2차: Coast FIRE]"},
+    16: {"limit": 2600000000, "target_stock": 0.55, "target_cash": 0.45, "name": "LV. 16 (~26억)"},
+    17: {"limit": 3000000000, "target_stock": 0.525, "target_cash": 0.475, "name": "LV. 17 (~30억)"},
+    18: {"limit": float('inf'), "target_stock": 0.50, "target_cash": 0.50, "name": "LV. 18 (30억+) [🎯 Global FIRE]"}
+}
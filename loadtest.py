@@ -0,0 +1,170 @@
+"""
+대시보드 동시 세션 부하 테스트 (Streamlit AppTest 헤드리스 세션 N개, 녹화된 시장 데이터 사용)
+세션 흐름: 페이지 열기 → asset_form 입력 수정 → 저장 제출 → 차트 expander 열기 (--iterations 회 반복)
+N마다 새 프로세스(= 워커 1개)에서 캐시를 워밍업한 뒤 N개 세션을 스레드로 동시에 구동하고
+리런 지연 백분위 / 처리량 / CPU 사용률 / RSS를 보고한다. 사용자 파일 보호를 위해 임시 폴더에서 실행.
+
+사용법:
+  python loadtest.py --record                          # 시장 데이터 1회 녹화 (Yahoo 접속 필요)
+  python loadtest.py [--sessions 1,2,4,8,16] [--iterations 3] [--slo 1.0] [--json loadtest.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+RUN_TIMEOUT = 120
+FULL_HISTORY_TICKERS = ["QQQ", "SOXX", "TQQQ", "USD"]  # app.get_full_history()와 동일
+
+def record():
+    """app.py가 요청하는 모든 패널(유니버스 일봉/월봉/환율 + 전체 기간 일봉)을 녹화본으로 저장"""
+    os.environ["GF_MARKET_PROVIDER"] = "record"
+    from market_data import download_panel, get_market_snapshot
+    mkt = get_market_snapshot()
+    full = download_panel(FULL_HISTORY_TICKERS, "1d", "max")
+    return mkt is not None and full is not None
+
+def _share_mock_runtime():
+    """AppTest는 리런마다 전역 Runtime 싱글턴을 mock으로 설정했다가 None으로 해제한다.
+    세션 여러 개를 동시에 돌리면 한 세션의 해제가 다른 세션 실행 중에 끼어들므로, 마지막 mock을 계속 쓰도록 고정"""
+    from streamlit.runtime import Runtime
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+        elif 'runtime' not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last['runtime']
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or 'runtime' in last)
+
+def _session_flow(at, rng, iterations, chart_keys, latencies, errors):
+    def timed_run():
+        t0 = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - t0)
+        if at.exception:
+            errors.append(at.exception[0].value)
+
+    timed_run()  # 페이지 열기
+    for _ in range(iterations):
+        at.number_input(key="a_tqqq_qty").set_value(round(rng.uniform(0, 2000), 2))
+        at.number_input(key="b_cash_usd").set_value(rng.randrange(0, 50000, 100))
+        submit = next(b for b in at.button if "저장" in b.label)
+        submit.click()
+        timed_run()  # 폼 제출 (save_data + 전체 리런)
+        at.session_state[f"chart_{rng.choice(chart_keys)}"] = True
+        timed_run()  # 차트 expander 열기
+
+def run_child(n, iterations, seed):
+    """자식 프로세스: 캐시 워밍업 → N개 세션 동시 구동 → 결과 JSON 한 줄 출력"""
+    import numpy as np
+    from streamlit.testing.v1 import AppTest
+
+    from bench_memory import rss_mb
+    from universe import load_universe
+
+    os.chdir(tempfile.mkdtemp(prefix="gf_loadtest_"))
+    _share_mock_runtime()
+    chart_keys = [e['key'] for e in load_universe()]
+    warm = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+    warm.run()
+    if warm.exception or not warm.metric:
+        print(json.dumps({'sessions': n, 'error': "워밍업 실패 (녹화본/앱 오류)"}))
+        return
+
+    latencies, errors = [], []
+    apps = [AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT) for _ in range(n)]
+    barrier = threading.Barrier(n + 1)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            _session_flow(apps[i], random.Random(seed + i), iterations, chart_keys, latencies, errors)
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    cpu0 = time.process_time()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    print(json.dumps({
+        'sessions': n, 'reruns': len(latencies), 'errors': len(errors), 'first_error': errors[0] if errors else None,
+        'p50': float(np.percentile(lat, 50)), 'p90': float(np.percentile(lat, 90)),
+        'p99': float(np.percentile(lat, 99)), 'max': float(lat.max()),
+        'throughput': len(latencies) / wall, 'cpu_pct': cpu / wall * 100, 'rss_mb': rss_mb(), 'wall': wall,
+    }, ensure_ascii=False))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="대시보드 동시 세션 부하 테스트 (녹화된 시장 데이터)")
+    parser.add_argument("--record", action="store_true", help="시장 데이터 녹화 후 종료")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="동시 세션 수 목록 (쉼표 구분)")
+    parser.add_argument("--iterations", type=int, default=3, help="세션당 (폼 제출 + 차트 열기) 반복 횟수")
+    parser.add_argument("--slo", type=float, default=1.0, help="용량 판정 기준: 리런 p90 지연 (초)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.record:
+        ok = record()
+        print("✅ 녹화 완료" if ok else "❌ 데이터 수집 실패")
+        sys.exit(0 if ok else 1)
+    if args.child:
+        run_child(args.child, args.iterations, args.seed)
+        sys.exit(0)
+
+    import market_cache
+    from market_data import RECORDING_NAME
+    from version import APP_VERSION_FULL
+
+    if market_cache.load(RECORDING_NAME) is None:
+        print("❌ 녹화본 없음 → python loadtest.py --record 먼저 실행")
+        sys.exit(1)
+    env = dict(os.environ, GF_MARKET_PROVIDER="recorded", GF_CACHE_DIR=os.path.abspath(market_cache.CACHE_DIR),
+               PYTHONPATH=os.pathsep.join(p for p in [REPO_DIR, os.environ.get("PYTHONPATH")] if p))
+    env.pop("TELEGRAM_TOKEN", None)
+
+    print(f"🧪 부하 테스트 {APP_VERSION_FULL} │ 세션당 리런 {1 + 2 * args.iterations}회 │ SLO p90 ≤ {args.slo:.2f}초")
+    print(f"{'N':>4} │ {'리런':>5} │ {'p50':>6} │ {'p90':>6} │ {'p99':>6} │ {'max':>6} │ {'리런/초':>7} │ {'CPU':>5} │ {'RSS':>7} │ 오류")
+    results, capacity = [], 0
+    for n in [int(x) for x in args.sessions.split(",") if x.strip()]:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", str(n),
+                              "--iterations", str(args.iterations), "--seed", str(args.seed)],
+                             capture_output=True, text=True, env=env)
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if not lines:
+            print(f"{n:>4} │ ❌ 실행 실패: {out.stderr.strip().splitlines()[-1] if out.stderr.strip() else out.returncode}")
+            break
+        r = json.loads(lines[-1])
+        results.append(r)
+        if 'error' in r:
+            print(f"{n:>4} │ ❌ {r['error']}")
+            break
+        print(f"{n:>4} │ {r['reruns']:>5} │ {r['p50']:>5.2f}s │ {r['p90']:>5.2f}s │ {r['p99']:>5.2f}s │ {r['max']:>5.2f}s │ "
+              f"{r['throughput']:>7.2f} │ {r['cpu_pct']:>4.0f}% │ {r['rss_mb']:>5.0f}MB │ {r['errors']}"
+              + (f" ({r['first_error']})" if r['first_error'] else ""))
+        if r['p90'] <= args.slo and r['errors'] == 0:
+            capacity = n
+
+    print(f"📏 용량: p90 ≤ {args.slo:.2f}초를 만족하는 최대 동시 세션 = {capacity}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'version': APP_VERSION_FULL, 'slo_p90': args.slo, 'iterations': args.iterations,
+                       'capacity': capacity, 'results': results}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,35 @@
+"""
+로컬 시장 데이터 캐시 (pickle 파일)
+한 번 만들어 두면 재다운로드/재계산 없이 재사용하는 데이터(합성 히스토리 등)를 CACHE_DIR에 저장한다.
+"""
+import os
+import pickle
+import time
+
+CACHE_DIR = os.environ.get("GF_CACHE_DIR", ".market_cache")
+
+def cache_path(name):
+    return os.path.join(CACHE_DIR, f"{name}.pkl")
+
+def load(name, max_age=None):
+    """캐시 로드. 파일이 없거나 max_age(초)보다 오래되었거나 읽기 실패 시 None"""
+    path = cache_path(name)
+    if not os.path.exists(path):
+        return None
+    if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def store(name, obj):
+    """캐시 저장 (임시 파일에 쓴 뒤 교체하여 동시 읽기 중 깨진 파일 방지)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,165 @@
+"""
+시장 데이터 일괄 수집 + 패널(종목 × 시간) 지표 계산
+유니버스 종목 수와 무관하게 다운로드는 3회(일봉 2년 / 월봉 전체기간 / 환율 10년),
+지표(주봉·월봉 RSI, 120월 이격도, MDD)는 종목별 루프 없이 DataFrame 전체에 한 번에 계산한다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import market_cache
+from race import race_scalars, update_race
+from universe import FX_TICKER, load_universe
+from validation import summarize_reports, validate_panel
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# 데이터 공급원: yahoo(기본) | record(실제 다운로드 + 녹화) | recorded(녹화본만 사용, 네트워크 미사용)
+# recorded는 부하 테스트(loadtest.py)·재현용. 녹화본은 market_cache의 RECORDING_NAME에 (종목, 봉, 기간) 키로 저장.
+MARKET_PROVIDER = os.environ.get("GF_MARKET_PROVIDER", "yahoo")
+RECORDING_NAME = "market_recording"
+_recording = None
+QUALITY_REPORTS = {}  # (종목, 봉, 기간) → 마지막 데이터 품질 검사 보고서 (validation.py)
+
+def _recorded_panel(key):
+    global _recording
+    if _recording is None:
+        _recording = market_cache.load(RECORDING_NAME) or {}
+    return _recording.get(key)
+
+def _record_panel(key, panel):
+    recording = market_cache.load(RECORDING_NAME) or {}
+    recording[key] = panel
+    market_cache.store(RECORDING_NAME, recording)
+
+def download_panel(tickers, interval, period):
+    """
+    여러 종목 일괄 다운로드 → 품질 검사(validation.py, 의심 바 격리) → {필드: DataFrame(시간 × 종목)}.
+    실패/빈 결과 시 None (공급원은 MARKET_PROVIDER). 검사 보고서는 QUALITY_REPORTS[(종목, 봉, 기간)]
+    """
+    key = (tuple(tickers), interval, period)
+    if MARKET_PROVIDER == "recorded":
+        panel = _recorded_panel(key)
+    else:
+        panel = _download_panel(tickers, interval, period)
+        if MARKET_PROVIDER == "record" and panel is not None:
+            _record_panel(key, panel)  # 녹화본은 공급원 원본 그대로 (검사 규칙을 바꿔도 같은 입력으로 재현)
+    if panel is None:
+        return None
+    panel, QUALITY_REPORTS[key] = validate_panel(panel, interval, f"{','.join(tickers)} {interval}/{period}")
+    return panel
+
+def _download_panel(tickers, interval, period):
+    import yfinance as yf  # 다운로드 시점에만 로드 (import 비용 ~0.8초, 지표 계산/스냅샷 경로에는 불필요)
+    raw = yf.download(tickers, interval=interval, period=period, progress=False, auto_adjust=False, group_by='column')
+    if raw is None or raw.empty:
+        return None
+    panel = {}
+    for field in PRICE_FIELDS:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if field not in raw.columns.get_level_values(0): continue
+            frame = raw[field]
+        else:
+            if field not in raw.columns: continue
+            frame = raw[[field]].set_axis(tickers[:1], axis=1)
+        panel[field] = frame.reindex(columns=tickers).astype(float)
+    return panel
+
+def panel_rsi(close, window=14):
+    """RSI (Wilder / RMA 방식) — Series 또는 DataFrame(종목별 컬럼) 전체에 동시 적용"""
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = (-delta).clip(lower=0)
+    avg_gain = gain.ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    avg_loss = loss.ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+def panel_drawdown(price):
+    """고점 대비 낙폭 (다운로드 전체 기간 cummax 기준)"""
+    return price / price.cummax() - 1.0
+
+def resample_weekly(close):
+    """일봉 종가 패널 → 주봉(W-FRI, 진행 중인 주 포함) 종가 패널"""
+    return close.resample('W-FRI').last().dropna(how='all')
+
+def resample_ohlc(panel, ticker, rule=None):
+    """패널에서 단일 종목 OHLC 추출 (차트용). rule='W-FRI' 지정 시 주봉 리샘플링"""
+    df = pd.DataFrame({f: panel[f][ticker] for f in ['Open', 'High', 'Low', 'Close', 'Volume'] if f in panel}).dropna()
+    if rule:
+        df = df.resample(rule).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
+    return df
+
+def _last_valid(frame):
+    """종목별 마지막 유효값 (시간 축 ffill 후 마지막 행)"""
+    return frame.ffill().iloc[-1] if len(frame) else pd.Series(np.nan, index=frame.columns)
+
+def compute_panel_indicators(daily, monthly):
+    """
+    일봉/월봉 패널 → 종목별 지표 DataFrame (index = 종목)
+    columns: price, rsi_wk, rsi_mo, ma120, mo_dev, mdd
+    (원칙 0: MDD는 수정종가 기준, 월봉 지표는 월봉 종가 기준)
+    주봉 RSI는 전 종목 일봉 종가의 W-FRI 리샘플링, MDD는 일봉 수정종가 cummax 기준 (TQQQ/USD도 동일,
+    기존 yfinance 1wk 수정종가 주봉 대비 MDD가 같거나 더 깊을 수 있음)
+    """
+    close = daily['Close']
+    adj = daily.get('Adj Close', close).fillna(close)
+    rsi_wk = _last_valid(panel_rsi(resample_weekly(close)))
+    mo_close = monthly['Close']
+    rsi_mo = _last_valid(panel_rsi(mo_close))
+    ma120 = _last_valid(mo_close.rolling(window=120, min_periods=120).mean())
+    mo_last = _last_valid(mo_close)
+    mdd = _last_valid(panel_drawdown(adj))
+    return pd.DataFrame({
+        'price': _last_valid(close),
+        'rsi_wk': rsi_wk,
+        'rsi_mo': rsi_mo,
+        'ma120': ma120,
+        'mo_dev': (mo_last / ma120 - 1.0).where(ma120.notna(), 0.0),
+        'mdd': mdd,
+    })
+
+def get_market_snapshot(universe=None):
+    """
+    유니버스 전체 시장 데이터 수집 및 지표 계산.
+    반환 dict: 종목별 '{key}_{지표}' 스칼라(qqq_price, qqq_rsi_mo, tqqq_mdd ...), 'rows'(상황판 행 목록),
+    'daily'(일봉 패널, 차트용), 환율 지표, 'race'(TQQQ vs USD 레이스, race.py) + race_{지표}_{기간} 스칼라. 필수 종목(기본 유니버스) 데이터가 없으면 None
+    """
+    universe = universe or load_universe()
+    tickers = [e['ticker'] for e in universe]
+    daily = download_panel(tickers, "1d", "2y")
+    monthly = download_panel(tickers, "1mo", "max")
+    fx = download_panel([FX_TICKER], "1d", "10y")
+    if daily is None or monthly is None or fx is None:
+        return None
+    required = [e['ticker'] for e in universe if e['role'] in ('master', 'core')]
+    for t in required:
+        if daily['Close'][t].dropna().empty or monthly['Close'][t].dropna().empty:
+            return None
+
+    fx_close = fx['Close'][FX_TICKER].dropna()
+    if fx_close.empty:
+        return None
+    current_rate = float(fx_close.iloc[-1])
+    # [원칙 2-1] 환율 극단값 방어: 10년 평균 대비 +20% 이상이면 분할 환전 경보
+    fx_10y_avg = float(fx_close.mean())
+    fx_deviation = (current_rate / fx_10y_avg) - 1.0 if fx_10y_avg else 0
+
+    ind = compute_panel_indicators(daily, monthly)
+    quality = [QUALITY_REPORTS[k] for k in [(tuple(tickers), "1d", "2y"), (tuple(tickers), "1mo", "max"),
+                                            ((FX_TICKER,), "1d", "10y")] if k in QUALITY_REPORTS]
+    dq_issues, dq_quarantined, _ = summarize_reports(quality)
+    # 승자의 질주 레이스 지표 (race.py): 저장된 롤링 상태에 새로 확정된 일봉만 증분 반영
+    race = update_race(daily)
+    mkt = {'usd_krw': current_rate, 'fx_10y_avg': fx_10y_avg, 'fx_deviation': fx_deviation,
+           'dq_issues': dq_issues, 'dq_quarantined': dq_quarantined, 'quality': quality,
+           'race': race, **(race_scalars(race) if race else {}),
+           'universe': universe, 'daily': daily, 'rows': []}
+    for e in universe:
+        values = {k: (float(v) if pd.notna(v) else None) for k, v in ind.loc[e['ticker']].items()}
+        for metric in ['price', 'rsi_wk', 'rsi_mo', 'mo_dev', 'mdd']:
+            mkt[f"{e['key']}_{metric}"] = values[metric] if values[metric] is not None else 0.0
+        mkt[f"{e['key']}_ma120"] = values['ma120']
+        mkt['rows'].append({**e, **values})
+    return mkt
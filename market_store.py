@@ -0,0 +1,76 @@
+"""
+공유 시장 데이터 저장소 (불변 · 세션 간 zero-copy 공유)
+get_market_snapshot() 결과에서 UI/룰이 실제로 읽는 값만 남긴다:
+지표 스칼라, 상황판 행, 데이터 품질 검사 항목, 차트용 OHLC · 레이스 지표 이력(float32 연속 배열, 읽기 전용). 일봉 패널·Adj Close·Volume 등은 버린다.
+"""
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import NamedTuple
+
+import numpy as np
+
+from market_data import resample_ohlc
+from snapshot import market_version
+
+CHART_FIELDS = ('Open', 'High', 'Low', 'Close')
+
+class ChartData(NamedTuple):
+    """차트 1개 분량: index(datetime64[ns]) + ohlc(float32, shape=(n, 4)) — 둘 다 읽기 전용"""
+    index: np.ndarray
+    ohlc: np.ndarray
+
+def _frozen(values, dtype):
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+def _chart_data(df):
+    if df is None or df.empty:
+        return None
+    return ChartData(_frozen(df.index.values.astype('datetime64[ns]'), 'datetime64[ns]'),
+                     _frozen(df[list(CHART_FIELDS)].to_numpy(), np.float32))
+
+class MarketStore(Mapping):
+    """
+    읽기 전용 dict 인터페이스(mkt['qqq_mdd'], mkt.get('fx_deviation', 0) 등 기존 사용법 그대로).
+    한 프로세스에서 하나만 만들어 모든 세션이 같은 객체를 참조하므로 추가 세션당 메모리가 거의 늘지 않는다.
+    """
+    __slots__ = ('_data', 'version', 'created_at')
+
+    def __init__(self, data):
+        self._data = MappingProxyType(data)
+        self.created_at = time.time()
+        self.version = market_version(data)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def nbytes(self):
+        """차트 배열이 차지하는 바이트 수 (스칼라/행 dict 제외)"""
+        return sum(c.index.nbytes + c.ohlc.nbytes for c in self._data['charts'].values() if c is not None)
+
+def build_market_store(mkt):
+    """get_market_snapshot() 결과 → MarketStore (차트는 유니버스 chart 봉 단위로 리샘플링 후 float32 압축)"""
+    data = {k: v for k, v in mkt.items() if isinstance(v, (int, float)) or v is None}
+    data['universe'] = tuple(MappingProxyType(dict(e)) for e in mkt['universe'])
+    data['rows'] = tuple(MappingProxyType(dict(r)) for r in mkt['rows'])
+    data['quality'] = tuple(MappingProxyType({**issue, 'source': report['label']})
+                            for report in mkt.get('quality', ()) for issue in report['issues'])
+    race = mkt.get('race')
+    data['race'] = MappingProxyType({
+        'windows': race['windows'], 'metrics': race['metrics'],
+        'dates': _frozen(race['dates'], 'datetime64[D]'), 'history': _frozen(race['history'], np.float32),
+    }) if race else None
+    data['charts'] = MappingProxyType({
+        e['ticker']: _chart_data(resample_ohlc(mkt['daily'], e['ticker'], 'W-FRI' if e.get('chart') == '1wk' else None))
+        for e in mkt['universe']
+    })
+    return MarketStore(data)
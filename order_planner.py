@@ -0,0 +1,111 @@
+"""
+비례 매도 주문 계산기 (버블 방어 / 스나이퍼 리로드 → 계좌 A·B × TQQQ·USD 주문 수량)
+evaluate_portfolio()의 매도 금액(sell_krw)을 현재 보유 평가금 비중대로 나누어 계좌·종목별 주 수로 바꾸고,
+주문 단위(정수주 / 소수점) 반올림, 환율 환산(USD 매도대금 → 원화), 세금 격리(계좌 C 이체액)까지 계산한다.
+계좌 C 이체액은 올해 실현 양도차익을 반영해 기본공제(250만원) 초과분의 22%만 잡는다 (tax_optimizer.capital_gains_tax).
+여러 포트폴리오(가족 계좌 수십 개)를 (포트폴리오 × 계좌 × 종목) numpy 배열로 한 번에 계산한다.
+
+[원칙 1-1] 손실 확정 금지: 주식 평가손익이 마이너스인 계좌, 평균단가 > 현재가인 종목은 매도 대상에서 제외.
+제외 후 매도 가능 평가금이 부족하면 가능한 만큼만 배분하고 부족분(shortfall_krw)을 보고한다.
+"""
+import numpy as np
+
+from tax_optimizer import capital_gains_tax
+
+ACCOUNTS = ("A", "B")
+TICKERS = ("TQQQ", "USD")
+SHARE_STEPS = {"1주 (정수)": 1.0, "0.0001주 (소수점)": 0.0001}
+ROUNDING = ("nearest", "floor", "ceil")
+
+def holdings_arrays(portfolios):
+    """normalize_portfolio() 결과 목록 → (수량, 평균단가(원)) 배열, shape=(포트폴리오, 계좌, 종목)"""
+    qty = np.array([[[p[f"{a}_{t}_qty"] for t in ("tqqq", "usd")] for a in ("a", "b")] for p in portfolios], dtype=float)
+    avg = np.array([[[p[f"{a}_{t}_avg"] for t in ("tqqq", "usd")] for a in ("a", "b")] for p in portfolios], dtype=float)
+    return qty.reshape(-1, 2, 2), avg.reshape(-1, 2, 2)
+
+def _round_to_step(shares, step, rounding):
+    x = shares / step
+    if rounding == "floor":
+        x = np.floor(x + 1e-9)
+    elif rounding == "ceil":
+        x = np.ceil(x - 1e-9)
+    else:
+        x = np.round(x)
+    return x * step
+
+def plan_orders(sell_krw, qty, avg, prices_usd, usd_krw, step=1.0, rounding="nearest", realized_ytd_krw=0.0):
+    """
+    sell_krw: (N,) 포트폴리오별 매도 금액(원), qty/avg: (N, 2, 2) 계좌(A, B) × 종목(TQQQ, USD) 수량·평균단가(원)
+    prices_usd: (TQQQ, USD) 현재가(달러), step: 주문 단위(1 = 정수주), rounding: nearest | floor | ceil
+    realized_ytd_krw: (N,) 또는 스칼라, 올해 이미 실현한 양도차익 (계좌 C 이체액 = 이번 매도로 늘어나는 세액)
+    반환 dict (배열 shape=(N, 2, 2), 합계는 (N,)):
+      shares, proceeds_usd, proceeds_krw, realized_krw(실현손익), tax_krw(계좌 C 이체액), blocked(손실 확정 금지로 제외)
+      total_proceeds_krw, total_tax_krw, shortfall_krw(매도 가능 평가금 부족분), sellable_krw
+    """
+    if rounding not in ROUNDING:
+        raise ValueError(f"rounding: {ROUNDING} 중 하나 ({rounding!r})")
+    if not (step > 0 and np.isfinite(step)):
+        raise ValueError(f"step: 0보다 큰 숫자여야 합니다 ({step!r})")
+    sell_krw = np.maximum(np.asarray(sell_krw, dtype=float).reshape(-1), 0.0)
+    px_usd = np.asarray(prices_usd, dtype=float)
+    px_krw = px_usd * usd_krw
+
+    value = qty * px_krw
+    # [원칙 1-1] 계좌 단위(주식 평가손익 < 0이면 계좌 전체) + 종목 단위(평균단가 > 현재가) 손실 확정 금지
+    account_loss = (value - qty * avg).sum(axis=2) < 0
+    blocked = (qty > 0) & (account_loss[:, :, None] | (avg > px_krw))
+    sellable = np.where(blocked, 0.0, value)
+    sellable_krw = sellable.sum(axis=(1, 2))
+    target_krw = np.minimum(sell_krw, sellable_krw)
+
+    # 현재 보유 평가금 비중대로 비례 배분 → 주 수 → 주문 단위 반올림 (보유 수량 초과 불가)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = np.where(sellable_krw[:, None, None] > 0, sellable / sellable_krw[:, None, None], 0.0)
+        raw_shares = np.where(px_krw > 0, target_krw[:, None, None] * share / px_krw, 0.0)
+    max_shares = np.where(blocked, 0.0, _round_to_step(qty, step, "floor"))
+    shares = np.clip(_round_to_step(raw_shares, step, rounding), 0.0, max_shares)
+
+    proceeds_usd = shares * px_usd
+    proceeds_krw = proceeds_usd * usd_krw
+    realized_krw = shares * (px_krw - avg)
+    # 계좌 C 이체: 포트폴리오별 늘어나는 세액(기본공제 잔여분 반영)을 종목별 실현 수익 비중대로 배분
+    gains = np.maximum(realized_krw, 0.0)
+    gain_total = gains.sum(axis=(1, 2))
+    tax_total = capital_gains_tax(gain_total, np.broadcast_to(np.asarray(realized_ytd_krw, dtype=float), gain_total.shape))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tax_krw = np.where(gain_total[:, None, None] > 0, gains * (tax_total / gain_total)[:, None, None], 0.0)
+    return {
+        'shares': shares, 'proceeds_usd': proceeds_usd, 'proceeds_krw': proceeds_krw,
+        'realized_krw': realized_krw, 'tax_krw': tax_krw, 'blocked': blocked,
+        'total_proceeds_krw': proceeds_krw.sum(axis=(1, 2)), 'total_tax_krw': tax_krw.sum(axis=(1, 2)),
+        'shortfall_krw': sell_krw - target_krw, 'sellable_krw': sellable_krw,
+    }
+
+def plan_portfolios(mkt, portfolios, decisions, step=1.0, rounding="nearest"):
+    """정규화된 포트폴리오 목록 + evaluate_portfolio() 결과 목록 → plan_orders() (시장가는 mkt 스칼라)"""
+    qty, avg = holdings_arrays(portfolios)
+    sell_krw = np.array([d['sell_krw'] for d in decisions], dtype=float)
+    realized_ytd = np.array([p.get('realized_ytd_krw', 0.0) for p in portfolios], dtype=float)
+    return plan_orders(sell_krw, qty, avg, (mkt['tqqq_price'], mkt['usd_price']), mkt['usd_krw'],
+                       step=step, rounding=rounding, realized_ytd_krw=realized_ytd)
+
+def order_rows(plan, i=0):
+    """plan_orders() 결과 중 포트폴리오 i의 주문 목록 (수량 0 포함, 계좌 × 종목 4행)"""
+    rows = []
+    for a, account in enumerate(ACCOUNTS):
+        for t, ticker in enumerate(TICKERS):
+            rows.append({
+                'account': account, 'ticker': ticker, 'shares': float(plan['shares'][i, a, t]),
+                'proceeds_usd': float(plan['proceeds_usd'][i, a, t]), 'proceeds_krw': float(plan['proceeds_krw'][i, a, t]),
+                'realized_krw': float(plan['realized_krw'][i, a, t]), 'tax_krw': float(plan['tax_krw'][i, a, t]),
+                'blocked': bool(plan['blocked'][i, a, t]),
+            })
+    return rows
+
+def plan_summary(plan, i=0):
+    """포트폴리오 i의 주문 목록 + 합계 dict (JSON 직렬화 가능)"""
+    return {
+        'orders': order_rows(plan, i),
+        'total_proceeds_krw': float(plan['total_proceeds_krw'][i]), 'transfer_to_c_krw': float(plan['total_tax_krw'][i]),
+        'shortfall_krw': float(plan['shortfall_krw'][i]), 'sellable_krw': float(plan['sellable_krw'][i]),
+    }
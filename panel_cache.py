@@ -0,0 +1,83 @@
+"""
+렌더 패널 메모 캐시 (프로세스 공유 LRU, streamlit 미사용)
+Streamlit은 입력이 그대로여도 rerun마다 app.py 전체를 다시 실행한다. 입력의 내용 키
+(시장 스냅샷 버전, 포트폴리오 값 해시, 문서 파일 mtime/크기)가 같으면 이전에 만든 패널 모델(표시용 문자열 목록),
+판정 결과, 문서 텍스트를 그대로 재사용한다. 모듈 전역 1개를 모든 세션이 공유하며(모듈은 rerun 간 유지),
+항목 수가 MAX_ENTRIES를 넘으면 가장 오래 쓰지 않은 항목부터 제거한다. 저장된 값은 읽기 전용으로 사용할 것.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 256
+
+class PanelCache:
+    """(namespace, key) → 값 LRU. namespace별 적중/미적중 횟수를 함께 센다"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.items = OrderedDict()
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, namespace, key, build):
+        """캐시에 있으면 그대로, 없으면 build()로 만들어 저장 후 반환 (build 예외는 캐시하지 않음)"""
+        k = (namespace, key)
+        with self.lock:
+            if k in self.items:
+                self.items.move_to_end(k)
+                self.hits[namespace] = self.hits.get(namespace, 0) + 1
+                return self.items[k]
+        value = build()
+        with self.lock:
+            self.misses[namespace] = self.misses.get(namespace, 0) + 1
+            self.items[k] = value
+            while len(self.items) > self.max_entries:
+                self.items.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        """namespace별 [{namespace, hits, misses, hit_rate, entries}] + 합계 dict"""
+        with self.lock:
+            entries = {}
+            for namespace, _ in self.items:
+                entries[namespace] = entries.get(namespace, 0) + 1
+            names = sorted(set(self.hits) | set(self.misses))
+            rows = [{'namespace': n, 'hits': self.hits.get(n, 0), 'misses': self.misses.get(n, 0),
+                     'entries': entries.get(n, 0)} for n in names]
+            evictions = self.evictions
+        for r in rows:
+            r['hit_rate'] = r['hits'] / (r['hits'] + r['misses']) if r['hits'] + r['misses'] else 0.0
+        hits, misses = sum(r['hits'] for r in rows), sum(r['misses'] for r in rows)
+        return {'rows': rows, 'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'entries': sum(r['entries'] for r in rows), 'max_entries': self.max_entries, 'evictions': evictions}
+
+_cache = PanelCache()
+
+def memo(namespace, key, build):
+    """프로세스 공유 캐시 조회 (key는 해시 가능한 값: 스냅샷 버전, content_key() 등)"""
+    return _cache.get(namespace, key, build)
+
+def content_key(data):
+    """dict(포트폴리오 값 등) → 내용 해시 (키 순서 무관)"""
+    h = hashlib.blake2b(digest_size=8)
+    for k in sorted(data):
+        h.update(f"{k}={data[k]!r};".encode())
+    return h.hexdigest()
+
+def read_text(path):
+    """텍스트 파일 내용 (mtime/크기가 같으면 캐시 재사용, 파일이 없으면 OSError)"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def _read():
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return _cache.get("file", key, _read)
+
+def stats():
+    return _cache.stats()
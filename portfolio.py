@@ -0,0 +1,234 @@
+"""
+포트폴리오 진단 + CRO 실행 명령 판정 (app.py 2~3번 섹션의 계산 본체, streamlit 미사용)
+대시보드와 로컬 API(api.py)가 같은 함수로 판정하므로 결과 문구가 항상 일치한다.
+mkt: tqqq_price, usd_price, usd_krw, qqq_mdd, qqq_rsi_mo, qqq_mo_dev, fx_deviation, fx_10y_avg 스칼라
+     (MarketStore / market_snapshot.json 모두 가능)
+"""
+from alert import BUBBLE_LEVEL2_GATE
+from levels import LEVEL_CONFIG
+
+# 포트폴리오 입력 필드 (portfolio_data.json / 대시보드 사이드바와 동일 키). 누락 시 0
+PORTFOLIO_FIELDS = (
+    "monthly_contribution",
+    "a_tqqq_qty", "a_tqqq_avg", "a_usd_qty", "a_usd_avg", "a_cash_krw", "a_cash_usd",
+    "b_tqqq_qty", "b_tqqq_avg", "b_usd_qty", "b_usd_avg", "b_cash_krw", "b_cash_usd",
+    "c_cash_krw", "d_cash_krw", "ath_assets",
+    "realized_ytd_krw",  # 올해 실현한 해외주식 양도차익 (기본공제 250만원 잔여분 계산용, tax_optimizer.py)
+)
+
+def determine_level(ath_assets):
+    for level, config in sorted(LEVEL_CONFIG.items()):
+        if ath_assets <= config['limit']: return level
+    return 18
+
+def format_krw(value):
+    return f"{int(value):,}원"
+
+def normalize_portfolio(data):
+    """입력 dict → 숫자 필드 + sniper_mode_active. 숫자가 아니면 ValueError"""
+    p = {}
+    for k in PORTFOLIO_FIELDS:
+        v = data.get(k) or 0
+        try:
+            if isinstance(v, bool) or not isinstance(v, (int, float, str)):
+                raise ValueError
+            p[k] = float(v)
+        except ValueError:
+            raise ValueError(f"{k}: 숫자가 아닙니다 ({v!r})") from None
+    p['sniper_mode_active'] = bool(data.get('sniper_mode_active', False))
+    return p
+
+def evaluate_portfolio(mkt, p):
+    """
+    p: normalize_portfolio() 결과 (ath_assets = 사용자가 기록한 역대 최고 자산액)
+    반환: 합계/비중/Level/버블 판정 + 갱신된 sniper_mode_active + 실행 명령(final_action, detail_msg, action_color, 매도 금액 sell_krw)
+          + 월급 투입 지침(monthly_msg, monthly_color)
+    """
+    usd_krw_rate = mkt['usd_krw']
+    qqq_mdd = mkt['qqq_mdd']
+    tqqq_krw = mkt['tqqq_price'] * usd_krw_rate
+    usd_stock_krw = mkt['usd_price'] * usd_krw_rate
+    monthly_contribution = p['monthly_contribution']
+
+    # --- 자동 손익 판단 로직 ---
+    tqqq_qty = p['a_tqqq_qty'] + p['b_tqqq_qty']
+    usd_qty = p['a_usd_qty'] + p['b_usd_qty']
+
+    tqqq_invested = (p['a_tqqq_qty'] * p['a_tqqq_avg']) + (p['b_tqqq_qty'] * p['b_tqqq_avg'])
+    usd_invested = (p['a_usd_qty'] * p['a_usd_avg']) + (p['b_usd_qty'] * p['b_usd_avg'])
+    total_invested_krw = tqqq_invested + usd_invested
+
+    total_tqqq_krw = tqqq_qty * tqqq_krw
+    total_usd_krw = usd_qty * usd_stock_krw
+    total_stock_krw = total_tqqq_krw + total_usd_krw
+
+    total_cash_krw = (p['a_cash_krw'] + p['b_cash_krw'] + p['c_cash_krw']) + \
+                     ((p['a_cash_usd'] + p['b_cash_usd']) * usd_krw_rate)
+    total_assets = total_stock_krw + total_cash_krw
+
+    # 래칫 원칙: 기록된 ATH와 현재 총자산 중 큰 값
+    effective_ath = max(p['ath_assets'], total_assets)
+
+    profit_rate = ((total_stock_krw - total_invested_krw) / total_invested_krw * 100) if total_invested_krw > 0 else 0.0
+    is_loss = profit_rate < 0
+
+    # Level 결정 (ATH 기준 래칫)
+    current_level = determine_level(effective_ath)
+    target_stock_ratio = LEVEL_CONFIG[current_level]['target_stock']
+    target_cash_ratio = LEVEL_CONFIG[current_level]['target_cash']
+
+    current_stock_ratio = total_stock_krw / total_assets if total_assets > 0 else 0
+    current_cash_ratio = total_cash_krw / total_assets if total_assets > 0 else 0
+
+    # [원칙 0] 마스터 인덱스: QQQ(달러 차트)만으로 버블 판정. SOXX는 표시 전용.
+    qqq_rsi_mo = mkt['qqq_rsi_mo']
+    qqq_mo_dev = mkt['qqq_mo_dev']
+
+    # [V24.5] Level 2(이격도) 버블 방어는 Level {BUBBLE_LEVEL2_GATE} 이상(시드 펌핑 구간 이후)에서만 발동.
+    # Level 1~{BUBBLE_LEVEL2_GATE-1} 구간은 월 적립금의 물타기 효율이 극대화되므로 이격도 룰을 완전히 무시한다.
+    is_level2_bubble_raw = (qqq_mo_dev >= 1.0)
+    is_level2_bubble = is_level2_bubble_raw and (current_level >= BUBBLE_LEVEL2_GATE)
+    is_level1_bubble = (qqq_rsi_mo >= 80)
+    is_circuit_breaker = is_level1_bubble or is_level2_bubble
+    # [V24.5] 월 적립금 분배용: Level 1~{BUBBLE_LEVEL2_GATE-1}에서는 버블 경보 중에도 100% 현금 전환 없이
+    # Level 목표 비중대로 기계적 매수를 지속 (FOMO 방지, 시드 펌핑 우선).
+    is_seed_pumping_level = current_level < BUBBLE_LEVEL2_GATE
+
+    # [원칙 0] 우선순위: 전시 상황(MDD -15% 이하)이면 버블 경보 목표 비중 조정 완전 무시
+    if is_level2_bubble and qqq_mdd > -0.15:
+        target_cash_ratio = min(1.0, target_cash_ratio + 0.20)
+        target_stock_ratio = 1.0 - target_cash_ratio
+
+    # [원칙 2-1] 환율 극단값 방어: 10년 평균 대비 +20% 이상이면 분할 환전 경보
+    fx_deviation = mkt.get('fx_deviation', 0)
+    is_fx_extreme = fx_deviation >= 0.20
+    fx_warning = f"\n\n💱 **[환율 경보]** 현재 환율이 10년 평균({format_krw(mkt.get('fx_10y_avg', 0))}/$) 대비 **+{fx_deviation*100:.1f}%** 폭등 상태입니다. 이번 달 환전은 **4주 분할 환전**으로 진행하세요. (환율 예측 매매 아님, 심리적 방어 목적)" if is_fx_extreme else ""
+
+    # 월급 적립 가이드
+    monthly_msg = ""
+    monthly_color = "blue"
+    if qqq_mdd <= -0.15:
+        monthly_msg = f"📉 **전시 상황 (MDD {qqq_mdd*100:.1f}%)**: 월급 100% ({format_krw(monthly_contribution)}) 주식 매수 (TQQQ 50 : USD 50). 현금 적립 금지!"
+        monthly_color = "red"
+    elif is_circuit_breaker and is_seed_pumping_level:
+        # [V24.5] Level 1~{BUBBLE_LEVEL2_GATE-1} 시드 펌핑 구간: FOMO 방지를 위해 버블 경보 중에도
+        # 신규 적립금을 100% 현금으로 돌리지 않고 Level 목표 비중대로 기계적 매수를 지속.
+        buy_stock = monthly_contribution * target_stock_ratio
+        buy_cash = monthly_contribution * target_cash_ratio
+        monthly_msg = f"🌱 **버블 경보 중 시드 펌핑 유지 (LV<{BUBBLE_LEVEL2_GATE})**: 월급 {format_krw(monthly_contribution)}을 Level 목표비율대로 주식 {format_krw(buy_stock)} / 현금(SGOV/BOXX) {format_krw(buy_cash)} 배분 매수. (기존 보유 물량 리밸런싱 매도는 원칙대로 정상 집행)"
+        monthly_color = "blue"
+    elif is_circuit_breaker:
+        monthly_msg = f"🚨 **버블 경보 발동 (LV{current_level}≥{BUBBLE_LEVEL2_GATE})**: 신규 적립금 100% ({format_krw(monthly_contribution)}) 현금(SGOV/BOXX) 매수! (주식 매수 금지)"
+        monthly_color = "orange"
+    else:
+        buy_stock = monthly_contribution * target_stock_ratio
+        buy_cash = monthly_contribution * target_cash_ratio
+        monthly_msg = f"✅ **평시 적립**: 월급 {format_krw(monthly_contribution)}을 Level 목표비율에 맞춰 주식 {format_krw(buy_stock)} / 현금(SGOV/BOXX) {format_krw(buy_cash)} 배분 매수."
+    monthly_msg += fx_warning
+
+    # 매매/스나이핑 가이드
+    final_action = ""
+    detail_msg = ""
+    action_color = "blue"
+    sell_krw = 0.0  # 버블 방어 / 스나이퍼 리로드 매도 금액 (order_planner.py 주문 수량 계산 입력)
+
+    # [원칙 3] Last Bullet: 보유 현금의 15%는 영구 보존, 가용 현금은 85%
+    reserve_cash_krw = total_cash_krw * 0.15
+    available_cash_krw = total_cash_krw * 0.85
+
+    # [원칙 1-2] 스나이핑 원상복구 추적: MDD -15% 이하가 한 번이라도 발생하면 플래그 ON,
+    # 이후 사용자가 실제로 리로드(매도+자산정보 갱신)하여 현금 비중이 목표치를 회복하면 자동 OFF.
+    sniper_mode_active = p['sniper_mode_active']
+    if qqq_mdd <= -0.15 and not sniper_mode_active:
+        sniper_mode_active = True
+    elif sniper_mode_active and current_cash_ratio >= target_cash_ratio - 0.001:
+        sniper_mode_active = False
+
+    if is_loss:
+        # [원칙 1-1] 손실 확정 절대 금지: 본전 미도달 상태에서는 리로드도 절대 발동하지 않음.
+        if qqq_mdd <= -0.15:
+            final_action = "🛡️ LOSS PROTECTION + 스나이퍼 대기 (본전 미도달)"
+            detail_msg = "헌법 제1조: 현재 포트폴리오가 손실 구간이므로 매도는 금지되나, 하락장이므로 아래 [월급 투입 지침]에 따라 신규 적립금은 100% 주식에 몰빵합니다. 계좌 총수익률이 본전(0%)을 넘는 순간 목표 현금 비중으로 자동 리로드됩니다."
+        else:
+            final_action = "🛡️ LOSS PROTECTION (절대 방어)"
+            detail_msg = "헌법 제1조: 현재 포트폴리오가 손실 구간이므로 **어떠한 경우에도 매도를 금지**합니다. (존버)"
+        action_color = "red"
+    else:
+        if qqq_mdd <= -0.15:
+            # [원칙 3] MDD Sniper (Last Bullet 적용)
+            input_cash = 0
+            ratio_str = ""
+            base_str = ""
+            if qqq_mdd <= -0.50:
+                input_cash = reserve_cash_krw
+                ratio_str = "최후의 보루 100%"
+                base_str = "보유 현금의 15% (Last Bullet)"
+            elif qqq_mdd <= -0.45:
+                input_cash = available_cash_krw * 0.4; ratio_str = "40% (영끌)"; base_str = "가용 현금(85%)의"
+            elif qqq_mdd <= -0.35:
+                input_cash = available_cash_krw * 0.3; ratio_str = "30%"; base_str = "가용 현금(85%)의"
+            elif qqq_mdd <= -0.25:
+                input_cash = available_cash_krw * 0.2; ratio_str = "20%"; base_str = "가용 현금(85%)의"
+            else:
+                input_cash = available_cash_krw * 0.1; ratio_str = "10%"; base_str = "가용 현금(85%)의"
+
+            final_action = f"🔫 MDD SNIPER ({ratio_str})"
+            if qqq_mdd <= -0.50:
+                detail_msg = f"💣 **블랙 스완 (MDD {qqq_mdd*100:.1f}%)!** {base_str} {format_krw(input_cash)} 전액 투입! (그동안 아껴둔 최후의 총알)"
+            else:
+                detail_msg = f"하락장 스나이퍼 발동! {base_str} {ratio_str} ({format_krw(input_cash)}) 투입. (Last Bullet 15%는 미사용 보존 중: {format_krw(reserve_cash_krw)})"
+            action_color = "green"
+
+        elif sniper_mode_active:
+            # [핵심 룰] 스나이핑 원상복구 (Account Break-Even Reload): 시장 회복(MDD -15% 초과) + 계좌 본전 이상
+            sell_needed_reload = max(0, (total_assets * target_cash_ratio) - total_cash_krw)
+            sell_krw = sell_needed_reload
+            final_action = "🔄 SNIPER RELOAD (스나이핑 원상복구)"
+            detail_msg = f"과거 하락장에서 스나이핑한 자금이 본전(0%) 이상으로 회복되었습니다! {format_krw(sell_needed_reload)} 만큼 매도하여 현재 Level의 목표 현금 비중({target_cash_ratio*100:.1f}%)으로 즉시 복구하세요. (TQQQ/USD 현재 보유 비중대로 비례 매도, 토스 이동평균법 하에서 별도 트랜치 추적 불필요, 수익금 22% 세금 격리)"
+            action_color = "orange"
+
+        elif is_circuit_breaker:
+            sell_needed = (total_assets * target_cash_ratio) - total_cash_krw
+
+            trigger_str = []
+            if is_level1_bubble: trigger_str.append(f"QQQ 월봉 RSI {qqq_rsi_mo:.1f}")
+            if is_level2_bubble: trigger_str.append(f"QQQ 120월 이격도 {qqq_mo_dev*100:.1f}% (LV{current_level}≥{BUBBLE_LEVEL2_GATE})")
+
+            trigger_msg = ", ".join(trigger_str)
+
+            if sell_needed > 0:
+                sell_krw = sell_needed
+                if is_level2_bubble:
+                    final_action = "🚨 LEVEL 2 BUBBLE (역사적 버블 방어)"
+                    detail_msg = f"[{trigger_msg}] 돌파! 목표 현금 비중에 **+20% 추가 확보** (총 {target_cash_ratio*100:.1f}%).\n{format_krw(sell_needed)} 만큼 매도하여 현금(SGOV/BOXX) 채움. (TQQQ/USD 현재 보유 비중대로 비례 매도, 수익금 22% 세금 격리 필수)"
+                else:
+                    final_action = "🔥 LEVEL 1 BUBBLE (단기 과열 방어)"
+                    detail_msg = f"[{trigger_msg}] 돌파! Level {current_level}의 목표 현금 비중({target_cash_ratio*100:.1f}%) 확보를 위해 {format_krw(sell_needed)} 만큼만 매도하여 현금(SGOV/BOXX) 채움. (TQQQ/USD 현재 보유 비중대로 비례 매도, 수익금 22% 세금 격리 필수)"
+                action_color = "orange"
+            else:
+                final_action = "✅ HOLD (현금 벙커 완충)"
+                detail_msg = f"[{trigger_msg}] 광기 구간이나, 이미 목표 현금(SGOV/BOXX) 비중을 충족했습니다."
+
+        else:
+            final_action = "🧘 STABLING (관망)"
+            detail_msg = "평시 구간입니다. '승자의 질주(Let Winners Run)'를 즐기며 기존 포지션을 유지하십시오. 듀얼 리밸런싱은 오직 '월 적립금(새 돈)'으로만 맞춥니다."
+            if is_level2_bubble_raw:
+                detail_msg += f"\n\n🌱 *[V24.5] 참고: QQQ 120월 이격도가 100%를 초과했지만, 현재 Level {current_level}은 시드 펌핑 구간(LV<{BUBBLE_LEVEL2_GATE})이므로 역사적 버블 방어 룰을 의도적으로 무시하고 공격적으로 자산을 불립니다.*"
+
+    return {
+        'tqqq_qty': tqqq_qty, 'usd_qty': usd_qty,
+        'tqqq_invested': tqqq_invested, 'usd_invested': usd_invested, 'total_invested_krw': total_invested_krw,
+        'total_tqqq_krw': total_tqqq_krw, 'total_usd_krw': total_usd_krw, 'total_stock_krw': total_stock_krw,
+        'total_cash_krw': total_cash_krw, 'total_assets': total_assets, 'effective_ath': effective_ath,
+        'profit_rate': profit_rate, 'is_loss': is_loss,
+        'level': current_level, 'level_name': LEVEL_CONFIG[current_level]['name'],
+        'target_stock_ratio': target_stock_ratio, 'target_cash_ratio': target_cash_ratio,
+        'current_stock_ratio': current_stock_ratio, 'current_cash_ratio': current_cash_ratio,
+        'is_level1_bubble': is_level1_bubble, 'is_level2_bubble': is_level2_bubble,
+        'is_level2_bubble_raw': is_level2_bubble_raw, 'is_circuit_breaker': is_circuit_breaker,
+        'is_seed_pumping_level': is_seed_pumping_level, 'is_fx_extreme': is_fx_extreme,
+        'reserve_cash_krw': reserve_cash_krw, 'available_cash_krw': available_cash_krw,
+        'sniper_mode_active': sniper_mode_active, 'sell_krw': sell_krw,
+        'final_action': final_action, 'detail_msg': detail_msg, 'action_color': action_color,
+        'monthly_msg': monthly_msg, 'monthly_color': monthly_color,
+    }
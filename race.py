@@ -0,0 +1,174 @@
+"""
+승자의 질주(원칙 9) 레이스 분석: TQQQ vs USD
+여러 기간(21/63/126/252 거래일)에 대해 동시에 계산:
+  rs            TQQQ / USD 상대강도 (기간 수익률 비, exp(ΣrT − ΣrU) − 1)
+  corr          TQQQ-USD 일간 로그수익률 상관계수
+  tqqq_beta     TQQQ의 QQQ 대비 베타 / usd_beta: USD의 SOXX 대비 베타
+  tqqq_weight   기간 시작 시 50:50으로 사고 리밸런싱하지 않았을 때 현재 TQQQ 비중 (드리프트)
+
+롤링 윈도우는 기간별 누적합(Σr, Σr·rᵀ) + 최근 수익률 링버퍼로 유지하며, 상태를 market_cache에 저장해
+새로고침마다 새로 확정된 바만 반영한다 (바 1개당 기간별 O(1): 들어오는 수익률 더하고 빠지는 수익률 빼기).
+마지막 바(진행 중일 수 있음)는 상태에 확정하지 않고 임시로만 반영한다.
+상태가 없거나 데이터가 어긋나면(수정·삽입 등) 누적합(cumsum)으로 한 번에 재구축.
+"""
+import time
+
+import numpy as np
+
+import market_cache
+
+RACE_TICKERS = ("TQQQ", "USD", "QQQ", "SOXX")  # 순서 고정 (아래 인덱스)
+RACE_WINDOWS = (21, 63, 126, 252)               # 1개월 / 분기 / 반기 / 1년 (거래일)
+RACE_METRICS = ("rs", "corr", "tqqq_beta", "usd_beta", "tqqq_weight")
+STATE_NAME = "race_state"
+STATE_FORMAT = 1
+VERIFY_BARS = 5       # 증분 갱신 전 확정된 최근 수익률과 비교할 바 수 (불일치 시 재구축)
+RET_TOL = 1e-9
+HISTORY_MAX = 756     # 차트용 지표 이력 보관 바 수 (약 3년)
+_T, _U, _Q, _S = range(4)
+
+def _metrics(s1, s2, n):
+    """기간 누적합 → 지표 배열 (..., len(RACE_METRICS)). s1: (..., 4), s2: (..., 4, 4), n: (...)"""
+    n = np.asarray(n, dtype=float)
+    mean = s1 / n[..., None]
+    cov = s2 / n[..., None, None] - mean[..., :, None] * mean[..., None, :]
+    var = np.diagonal(cov, axis1=-2, axis2=-1)
+    rs_log = s1[..., _T] - s1[..., _U]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov[..., _T, _U] / np.sqrt(var[..., _T] * var[..., _U])
+        tqqq_beta = cov[..., _T, _Q] / var[..., _Q]
+        usd_beta = cov[..., _U, _S] / var[..., _S]
+    return np.stack([np.expm1(rs_log), corr, tqqq_beta, usd_beta, 1.0 / (1.0 + np.exp(-rs_log))], axis=-1)
+
+def _returns(daily):
+    """일봉 패널 → (날짜 datetime64[D], 로그수익률 (n, 4)). 4종목 모두 값이 있는 날만 사용 (수정종가 기준)"""
+    close = daily['Close']
+    if any(t not in close.columns for t in RACE_TICKERS):
+        return None, None
+    c = close[list(RACE_TICKERS)].to_numpy(dtype=float)
+    a = daily.get('Adj Close', close)[list(RACE_TICKERS)].to_numpy(dtype=float)
+    px = np.where(np.isnan(a), c, a)
+    with np.errstate(invalid='ignore'):
+        ok = (px > 0).all(axis=1)
+    if ok.sum() < 3:
+        return None, None
+    dates = close.index.values[ok].astype('datetime64[D]')
+    return dates[1:], np.diff(np.log(px[ok]), axis=0)
+
+def _build_state(dates, rets):
+    """확정 수익률 전체 → 상태 (cumsum으로 기간별 누적합·지표 이력을 한 번에 계산)"""
+    windows = np.array(RACE_WINDOWS)
+    w_max = int(windows.max())
+    m = len(rets)
+    c1 = np.concatenate([np.zeros((1, 4)), np.cumsum(rets, axis=0)])
+    c2 = np.concatenate([np.zeros((1, 4, 4)), np.cumsum(rets[:, :, None] * rets[:, None, :], axis=0)])
+    start = max(0, m - HISTORY_MAX)
+    ends = np.arange(start + 1, m + 1)
+    begins = np.maximum(ends[None, :] - windows[:, None], 0)  # (기간, 바)
+    hist = _metrics(c1[ends][None] - c1[begins], c2[ends][None] - c2[begins], np.minimum(ends[None], windows[:, None]))
+    hist[ends[None] < windows[:, None]] = np.nan               # 기간이 덜 찬 바는 표시하지 않음
+    ring = np.zeros((w_max, 4))
+    idx = np.arange(max(0, m - w_max), m)
+    ring[idx % w_max] = rets[idx]
+    last = np.maximum(m - windows, 0)
+    hist_dates = np.zeros(HISTORY_MAX * 2, dtype='datetime64[D]')
+    hist_values = np.full((HISTORY_MAX * 2, len(windows), len(RACE_METRICS)), np.nan)
+    hist_dates[:m - start] = dates[start:]
+    hist_values[:m - start] = hist.transpose(1, 0, 2)
+    return {
+        'format': STATE_FORMAT, 'tickers': RACE_TICKERS, 'windows': RACE_WINDOWS,
+        's1': c1[m][None] - c1[last], 's2': c2[m][None] - c2[last],
+        'ring': ring, 'count': m, 'last_date': dates[-1],
+        'hist_dates': hist_dates, 'hist_values': hist_values, 'hist_len': m - start,
+    }
+
+def _step(state, r):
+    """수익률 1개를 더한 기간별 누적합 (상태는 변경하지 않음). 빠지는 수익률은 링버퍼에서 O(1) 조회"""
+    windows = np.array(state['windows'])
+    ring, count = state['ring'], state['count']
+    olds = np.where((count >= windows)[:, None], ring[(count - windows) % len(ring)], 0.0)
+    s1 = state['s1'] + r - olds
+    s2 = state['s2'] + np.outer(r, r) - olds[:, :, None] * olds[:, None, :]
+    return s1, s2
+
+def _current(state, s1, s2, count):
+    windows = np.array(state['windows'])
+    values = _metrics(s1, s2, np.minimum(count, windows))
+    values[count < windows] = np.nan
+    return values
+
+def _commit(state, date, r):
+    state['s1'], state['s2'] = _step(state, r)
+    state['ring'][state['count'] % len(state['ring'])] = r
+    state['count'] += 1
+    state['last_date'] = date
+    h = state['hist_len']
+    if h == len(state['hist_dates']):  # 버퍼(HISTORY_MAX × 2)가 차면 최근 HISTORY_MAX개만 앞으로 이동 (분할 상환 O(1))
+        for key in ('hist_dates', 'hist_values'):
+            state[key][:HISTORY_MAX] = state[key][h - HISTORY_MAX:h]
+        h = HISTORY_MAX
+    state['hist_dates'][h] = date
+    state['hist_values'][h] = _current(state, state['s1'], state['s2'], state['count'])
+    state['hist_len'] = h + 1
+
+def _resume_pos(state, dates, rets):
+    """저장된 상태가 이 데이터의 앞부분과 일치하면 마지막 확정 바 위치, 아니면 None (→ 재구축)"""
+    if (state is None or state.get('format') != STATE_FORMAT or state['tickers'] != RACE_TICKERS
+            or state['windows'] != RACE_WINDOWS):
+        return None
+    pos = int(np.searchsorted(dates, state['last_date']))
+    if pos >= len(dates) or dates[pos] != state['last_date']:
+        return None
+    n = min(VERIFY_BARS, state['count'], pos + 1)
+    ring = state['ring']
+    stored = ring[(state['count'] - 1 - np.arange(n)) % len(ring)]
+    if not np.allclose(stored, rets[pos - np.arange(n)], rtol=0, atol=RET_TOL):
+        return None
+    return pos
+
+def update_race(daily, name=STATE_NAME):
+    """
+    일봉 패널 → 레이스 지표. 저장된 상태에 새로 확정된 바만 증분 반영 후 저장.
+    반환: {'windows', 'metrics', 'current'(기간 × 지표, 마지막 바 포함), 'as_of', 'dates', 'history'(바 × 기간 × 지표),
+           'committed'(이번에 확정한 바 수), 'rebuilt', 'elapsed_ms'}. 데이터 부족 시 None
+    """
+    t0 = time.perf_counter()
+    dates, rets = _returns(daily)
+    if dates is None:
+        return None
+    # 마지막 바는 진행 중일 수 있으므로 확정하지 않음
+    state = market_cache.load(name)
+    pos = _resume_pos(state, dates[:-1], rets[:-1])
+    rebuilt = pos is None
+    if rebuilt:
+        state = _build_state(dates[:-1], rets[:-1])
+        committed = len(rets) - 1
+    else:
+        committed = len(rets) - 2 - pos
+        for i in range(pos + 1, len(rets) - 1):
+            _commit(state, dates[i], rets[i])
+    if committed:
+        try:
+            market_cache.store(name, state)
+        except OSError:
+            pass
+
+    s1, s2 = _step(state, rets[-1])
+    current = _current(state, s1, s2, state['count'] + 1)
+    h = state['hist_len']
+    keep = slice(max(0, h - HISTORY_MAX + 1), h)
+    return {
+        'windows': RACE_WINDOWS, 'metrics': RACE_METRICS, 'current': current, 'as_of': dates[-1],
+        'dates': np.append(state['hist_dates'][keep], dates[-1]),
+        'history': np.concatenate([state['hist_values'][keep], current[None]]),
+        'committed': committed, 'rebuilt': rebuilt, 'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+def race_scalars(race):
+    """레이스 결과 → 스냅샷 스칼라 {'race_{지표}_{기간}': float|None} (NaN은 None)"""
+    out = {}
+    for i, w in enumerate(race['windows']):
+        for j, metric in enumerate(race['metrics']):
+            v = float(race['current'][i, j])
+            out[f"race_{metric}_{w}"] = v if np.isfinite(v) else None
+    return out
@@ -0,0 +1,253 @@
+"""
+alert.py 과거 재생(Replay) 모드
+전체 기간 일봉을 한 번만 로드한 뒤 거래일 단위로 전진하며 지표 상태를 증분 갱신하고
+(월봉 Wilder RSI 재귀식, 120개월 이평선 누적합, 최근 2년 고점 단조 덱, 환율 10년 이동합),
+매일 alert.evaluate_market()으로 그날 발송됐을 브리핑을 판정하여 이벤트 로그로 남긴다.
+각 거래일 판정에는 그날 종가까지의 데이터만 사용한다 (실시간 경로와 동일: 월봉 지표는 진행 중인 월 포함,
+MDD는 최근 2년(다운로드 구간) 수정종가 고점 기준, 환율 평균은 최근 10년).
+
+사용법: python replay.py [--years 25] [--ath 0] [--synthetic] [--changes-only] [--messages]
+                        [--out replay_events.jsonl] [--format jsonl|csv] [--refresh]
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import Counter, deque
+
+import numpy as np
+import pandas as pd
+
+import market_cache
+from alert import determine_level, evaluate_market, get_current_level
+from market_data import download_panel
+from universe import FX_TICKER
+
+CACHE_NAME = "replay_history"
+RSI_WINDOW = 14
+MA_MONTHS = 120
+MDD_YEARS = 2
+FX_YEARS = 10
+HISTORY_MAX_AGE = 20 * 3600  # 일봉 캐시 유효 시간(초). 지나면 다시 다운로드 (매일 실행 시 새 거래일 반영)
+
+class MonthlyIndicators:
+    """월봉 RSI(Wilder, pandas ewm(adjust=False)와 동일 재귀식) + 120개월 이평선 이격도.
+    완성된 월만 상태에 반영하고, 진행 중인 월은 상태를 바꾸지 않고 당일 종가로 임시 평가한다."""
+    __slots__ = ('alpha', 'prev', 'avg_gain', 'avg_loss', 'n_diff', 'closes', 'close_sum', 'month', 'last')
+
+    def __init__(self):
+        self.alpha = 1.0 / RSI_WINDOW
+        self.prev = self.avg_gain = self.avg_loss = None
+        self.n_diff = 0
+        self.closes = deque()  # 최근 완성 월 종가 (최대 MA_MONTHS-1개)
+        self.close_sum = 0.0
+        self.month = self.last = None
+
+    def _rsi_step(self, close):
+        if self.prev is None:
+            return None
+        d = close - self.prev
+        gain, loss = max(d, 0.0), max(-d, 0.0)
+        if self.avg_gain is None:
+            return gain, loss, 1
+        a = self.alpha
+        return (1 - a) * self.avg_gain + a * gain, (1 - a) * self.avg_loss + a * loss, self.n_diff + 1
+
+    def _commit(self, close):
+        step = self._rsi_step(close)
+        if step is not None:
+            self.avg_gain, self.avg_loss, self.n_diff = step
+        self.prev = close
+        self.closes.append(close)
+        self.close_sum += close
+        if len(self.closes) > MA_MONTHS - 1:
+            self.close_sum -= self.closes.popleft()
+
+    def update(self, month, close):
+        """거래일 1개 반영 → (월봉 RSI, 120개월 이평선, 이격도). 값이 없으면 None"""
+        if self.month is not None and month != self.month:
+            self._commit(self.last)
+        self.month, self.last = month, close
+
+        rsi = None
+        step = self._rsi_step(close)
+        if step is not None and step[2] >= RSI_WINDOW and step[1] > 0:
+            rsi = 100.0 - 100.0 / (1.0 + step[0] / step[1])
+        elif step is not None and step[2] >= RSI_WINDOW and step[0] > 0:
+            rsi = 100.0
+        ma120 = (self.close_sum + close) / MA_MONTHS if len(self.closes) == MA_MONTHS - 1 else None
+        return rsi, ma120, (close / ma120 - 1.0) if ma120 else None
+
+class TrailingDrawdown:
+    """최근 N년 고점 대비 낙폭. 종목 자체 날짜축으로 전진하며 단조 감소 덱으로 창 최댓값 유지 (봉당 O(1) 상각)"""
+    __slots__ = ('dates', 'prices', 'start', 'i', 'dq', 'value')
+
+    def __init__(self, series, years):
+        series = series.dropna()
+        self.dates = series.index.values
+        self.prices = series.to_numpy(dtype=float)
+        self.start = series.index.searchsorted(series.index - pd.DateOffset(years=years))
+        self.i = 0
+        self.dq = deque()
+        self.value = None
+
+    def advance(self, day):
+        while self.i < len(self.dates) and self.dates[self.i] <= day:
+            i, p = self.i, self.prices[self.i]
+            while self.dq and self.prices[self.dq[-1]] <= p:
+                self.dq.pop()
+            self.dq.append(i)
+            while self.dq[0] < self.start[i]:
+                self.dq.popleft()
+            self.value = p / self.prices[self.dq[0]] - 1.0
+            self.i += 1
+        return self.value
+
+class TrailingMean:
+    """최근 N년 평균 + 마지막 값 (이동합: 들어오는 봉 더하고 창 밖으로 나간 봉 빼기)"""
+    __slots__ = ('dates', 'values', 'start', 'i', 'lo', 'total', 'last')
+
+    def __init__(self, series, years):
+        series = series.dropna()
+        self.dates = series.index.values
+        self.values = series.to_numpy(dtype=float)
+        self.start = series.index.searchsorted(series.index - pd.DateOffset(years=years))
+        self.i = self.lo = 0
+        self.total = 0.0
+        self.last = None
+
+    def advance(self, day):
+        while self.i < len(self.dates) and self.dates[self.i] <= day:
+            self.total += self.values[self.i]
+            while self.lo < self.start[self.i]:
+                self.total -= self.values[self.lo]
+                self.lo += 1
+            self.last = self.values[self.i]
+            self.i += 1
+        if self.last is None:
+            return None, None
+        return self.last, self.total / (self.i - self.lo)
+
+def load_history(refresh=False, synthetic=False):
+    """QQQ(종가/수정종가) · TQQQ(수정종가) · USD/KRW 전체 기간 일봉
+    market_cache에 저장 후 HISTORY_MAX_AGE 동안 재사용. refresh=True면 캐시가 새것이어도 다시 다운로드"""
+    hist = None if refresh else market_cache.load(CACHE_NAME, max_age=HISTORY_MAX_AGE)
+    if hist is None:
+        px = download_panel(["QQQ", "TQQQ"], "1d", "max")
+        fx = download_panel([FX_TICKER], "1d", "max")
+        if px is None or fx is None:
+            return None
+        adj = px.get('Adj Close', px['Close']).fillna(px['Close'])
+        hist = {'qqq_close': px['Close']['QQQ'].dropna(), 'qqq_adj': adj['QQQ'].dropna(),
+                'tqqq_adj': adj['TQQQ'].dropna(), 'fx': fx['Close'][FX_TICKER].dropna()}
+        market_cache.store(CACHE_NAME, hist)
+    if synthetic:
+        from synthetic import load_synthetic_history
+        synth = load_synthetic_history()
+        if synth and "TQQQ" in synth['prices']:
+            hist = dict(hist, tqqq_adj=synth['prices']["TQQQ"])
+    return hist
+
+def replay(hist, current_level, start=None, end=None, changes_only=False, messages=False):
+    """
+    거래일마다 증분 지표 → evaluate_market() 판정. start 이전 구간은 지표 워밍업만 하고 기록하지 않는다.
+    반환: (이벤트 레코드 목록 — 이벤트가 있는 날만, changes_only=True면 이벤트 조합이 바뀐 날만,
+           요약 {'days': 재생 거래일 수, 'sent_days': 브리핑 발송일 수, 'event_days': 이벤트별 발생 일수})
+    """
+    qqq_close = hist['qqq_close']
+    qqq_adj = hist['qqq_adj'].reindex(qqq_close.index).fillna(qqq_close)
+    monthly = MonthlyIndicators()
+    qqq_dd = TrailingDrawdown(qqq_adj, MDD_YEARS)
+    tqqq_dd = TrailingDrawdown(hist['tqqq_adj'], MDD_YEARS)
+    fx = TrailingMean(hist['fx'], FX_YEARS)
+
+    days = qqq_close.index.values
+    months = qqq_close.index.year.values * 12 + qqq_close.index.month.values
+    closes = qqq_close.to_numpy(dtype=float)
+    start = np.datetime64(pd.Timestamp(start)) if start is not None else days[0]
+    end = np.datetime64(pd.Timestamp(end)) if end is not None else days[-1]
+
+    records, prev_events = [], None
+    summary = {'days': 0, 'sent_days': 0, 'event_days': Counter()}
+    for i in range(len(days)):
+        day = days[i]
+        if day > end:
+            break
+        rsi_mo, ma120, mo_dev = monthly.update(months[i], closes[i])
+        qqq_mdd = qqq_dd.advance(day)
+        tqqq_mdd = tqqq_dd.advance(day)
+        usd_krw, fx_avg = fx.advance(day)
+        if day < start:
+            continue
+
+        # 실시간 경로와 같은 결측 처리: 지표가 없으면 0.0 (= 판정 불발)
+        mkt = {'qqq_rsi_mo': rsi_mo or 0.0, 'qqq_mo_dev': mo_dev or 0.0, 'qqq_mdd': qqq_mdd or 0.0,
+               'tqqq_mdd': tqqq_mdd or 0.0, 'usd_krw': usd_krw or 0.0, 'fx_10y_avg': fx_avg or 0.0,
+               'fx_deviation': (usd_krw / fx_avg - 1.0) if fx_avg else 0.0}
+        msg, sent, events = evaluate_market(mkt, current_level)
+        summary['days'] += 1
+        summary['sent_days'] += sent
+        summary['event_days'].update(events)
+        if not events or (changes_only and events == prev_events):
+            prev_events = events
+            continue
+        prev_events = events
+        rec = {'date': str(pd.Timestamp(day).date()), 'sent': sent, 'events': events,
+               **{k: round(v, 4) for k, v in mkt.items() if k != 'usd_krw' and k != 'fx_10y_avg'}}
+        if messages:
+            rec['message'] = msg
+        records.append(rec)
+    return records, summary
+
+def write_log(records, path, fmt, header=None):
+    """이벤트 로그 저장. JSONL은 첫 줄에 재생 조건 헤더({'header': True, ...}, bot.py /history가 확인)"""
+    if fmt == "csv":
+        fields = ['date', 'sent', 'events', 'qqq_rsi_mo', 'qqq_mo_dev', 'qqq_mdd', 'tqqq_mdd', 'fx_deviation', 'message']
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            w.writeheader()
+            for r in records:
+                w.writerow(dict(r, events="|".join(r['events'])))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            if header is not None:
+                f.write(json.dumps(dict(header, header=True), ensure_ascii=False) + "\n")
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="alert.py 과거 재생 (일별 브리핑 이벤트 로그)")
+    parser.add_argument("--years", type=float, default=25, help="최근 N년 재생 (기본 25)")
+    parser.add_argument("--start", help="재생 시작일 (YYYY-MM-DD, 지정 시 --years 무시)")
+    parser.add_argument("--end", help="재생 종료일 (YYYY-MM-DD)")
+    parser.add_argument("--ath", type=float, help="역대 최고 자산액(원). 미지정 시 ATH_ASSETS_KRW 환경변수")
+    parser.add_argument("--synthetic", action="store_true", help="TQQQ 상장 이전 구간에 합성 히스토리 사용")
+    parser.add_argument("--changes-only", action="store_true", help="이벤트 조합이 바뀐 날만 기록")
+    parser.add_argument("--messages", action="store_true", help="브리핑 본문까지 기록")
+    parser.add_argument("--out", default="replay_events.jsonl")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--refresh", action="store_true", help="캐시가 유효해도 강제로 다시 다운로드")
+    args = parser.parse_args()
+
+    hist = load_history(refresh=args.refresh, synthetic=args.synthetic)
+    if hist is None:
+        print("❌ 데이터 수집 실패")
+        sys.exit(1)
+    current_level, ath = (determine_level(args.ath), args.ath) if args.ath is not None else get_current_level()
+    last_day = hist['qqq_close'].index[-1]
+    start = pd.Timestamp(args.start) if args.start else last_day - pd.DateOffset(years=args.years)
+
+    t0 = time.perf_counter()
+    records, summary = replay(hist, current_level, start, args.end, args.changes_only, args.messages)
+    elapsed = time.perf_counter() - t0
+    end = pd.Timestamp(args.end) if args.end else last_day
+    header = {'start': f"{start:%Y-%m-%d}", 'end': f"{end:%Y-%m-%d}", 'level': current_level, 'ath': ath,
+              'synthetic': args.synthetic, 'changes_only': args.changes_only}
+    write_log(records, args.out, args.format, header)
+
+    print(f"⏪ 재생 {start:%Y-%m-%d} ~ {end:%Y-%m-%d} │ {summary['days']:,} 거래일 │ "
+          f"LV.{current_level} (ATH ₩{ath:,.0f}) │ {elapsed:.2f}초")
+    print(f"📨 브리핑 발송일 {summary['sent_days']:,}일 │ 로그 {len(records):,}건 → {args.out}")
+    for ev, n in sorted(summary['event_days'].items()):
+        print(f"• {ev:18s}: {n:,}일")
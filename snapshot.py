@@ -0,0 +1,61 @@
+"""
+시장 지표 스냅샷 (JSON 파일, 표준 라이브러리만 사용)
+실시간 수집 경로(app.py / alert.py)가 계산한 지표 스칼라 + 상황판 행을 기록해 두고,
+스냅샷 전용 경로(alert.py --from-snapshot 등)는 pandas/yfinance 없이 이 파일만 읽는다.
+"""
+import hashlib
+import json
+import os
+import time
+
+SNAPSHOT_FILE = os.environ.get("GF_SNAPSHOT_FILE", "market_snapshot.json")
+SNAPSHOT_FORMAT = 1
+
+def _is_scalar(v):
+    return isinstance(v, (int, float, str)) or v is None
+
+def market_version(data):
+    """지표 스칼라 기준 내용 해시 (MarketStore.version과 동일 규칙 → 같은 시장 데이터면 같은 값)"""
+    h = hashlib.blake2b(digest_size=8)
+    for k in sorted(data):
+        v = data[k]
+        if _is_scalar(v):
+            h.update(f"{k}={v!r};".encode())
+    return h.hexdigest()
+
+def snapshot_from_market(mkt):
+    """get_market_snapshot() 결과 / MarketStore → JSON 직렬화 가능한 dict (스칼라 + 상황판 행만)"""
+    snap = {k: v for k, v in mkt.items() if _is_scalar(v)}
+    snap['rows'] = [{k: v for k, v in dict(r).items() if _is_scalar(v)} for r in mkt['rows']]
+    snap['version'] = getattr(mkt, 'version', None) or market_version(snap)
+    snap['created_at'] = getattr(mkt, 'created_at', None) or time.time()
+    snap['format'] = SNAPSHOT_FORMAT
+    return snap
+
+def save_snapshot(mkt, path=None):
+    """스냅샷 저장 (임시 파일 → 교체, 동시 실행 중 반쯤 쓰인 파일을 읽지 않도록). 저장한 dict 반환"""
+    path = path or SNAPSHOT_FILE
+    snap = snapshot_from_market(mkt)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snap, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return snap
+
+def load_snapshot(max_age=None, path=None):
+    """스냅샷 로드. 파일이 없거나 깨졌거나 max_age(초)보다 오래됐으면 None"""
+    path = path or SNAPSHOT_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snap = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snap.get('format') != SNAPSHOT_FORMAT or 'rows' not in snap:
+        return None
+    if max_age is not None and time.time() - snap.get('created_at', 0) > max_age:
+        return None
+    return snap
+
+def snapshot_age(snap):
+    """스냅샷 경과 시간 (초)"""
+    return time.time() - snap.get('created_at', 0)
@@ -0,0 +1,181 @@
+"""
+상장 이전(Pre-inception) 합성 히스토리: TQQQ(3x QQQ) / USD(2x SOXX)
+기초지수 일간 수익률로 일일 리셋 레버리지 수익률을 만들고(운용보수 + 차입비용 차감),
+실제 상장 이후 겹치는 구간으로 차입 스프레드를 보정한 뒤 실제 데이터 앞에 이어 붙인다.
+결과는 market_cache에 한 번 저장하여 재사용한다. 겹침 구간 보정 결과(상관·추적오차·스프레드·베타)나 가격이
+CALIBRATION_LIMITS를 벗어나면 그 종목은 사용하지 않고, 하나라도 벗어나면 캐시에 저장하지 않는다 (캐시 로드 시에도 재검사).
+
+사용법: python synthetic.py [--refresh]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+import market_cache
+from validation import validate_panel
+
+# underlying: (ETF, 지수) — ETF 수정종가 우선, ETF 상장 이전은 지수 종가로 보충
+SYNTHETIC_SPECS = {
+    "TQQQ": {"leverage": 3.0, "underlying": ("QQQ", "^NDX"), "expense": 0.0084},
+    "USD": {"leverage": 2.0, "underlying": ("SOXX", "^SOX"), "expense": 0.0095},
+}
+RATE_TICKER = "^IRX"  # 13주 T-Bill 금리(연 %) → 일일 차입비용
+TRADING_DAYS = 252
+CACHE_NAME = "synthetic_history"
+# 보정 결과 허용 범위 (실제 TQQQ/USD는 상관 0.98~0.999, TE 연 2~8%, 스프레드 연 ±1% 수준)
+CALIBRATION_LIMITS = {
+    'min_days': 250,          # 겹침 구간 최소 거래일
+    'min_corr': 0.90,         # 실제 vs 합성 일간 수익률 상관 하한
+    'max_te_annual': 0.15,    # 연율 추적오차 상한
+    'max_abs_spread': 0.10,   # 보정 차입 스프레드 절댓값 상한 (연)
+    'beta': (0.8, 1.25),      # 실제의 합성 대비 베타 범위
+}
+
+def underlying_returns(closes, etf, index):
+    """ETF 수익률 + ETF 상장 이전 구간(상장일 포함)은 지수 수익률로 채운 일간 수익률 시계열"""
+    r = closes[etf].dropna().pct_change().reindex(closes.index) if etf in closes else pd.Series(np.nan, index=closes.index)
+    if index in closes:
+        first = r.first_valid_index()
+        idx_r = closes[index].dropna().pct_change().reindex(closes.index)
+        r = r.fillna(idx_r if first is None else idx_r[idx_r.index < first])
+    return r
+
+def leveraged_returns(r_u, rf_daily, leverage, expense, spread=0.0):
+    """일일 리셋 레버리지 수익률: L·r − 운용보수/252 − (L−1)·(무위험금리 + 스프레드)/252 (−100% 하한)"""
+    r = leverage * r_u - expense / TRADING_DAYS - (leverage - 1.0) * (rf_daily + spread / TRADING_DAYS)
+    return np.maximum(r, -0.999)
+
+def calibrate_spread(r_real, r_u, rf_daily, leverage, expense):
+    """겹치는 구간에서 평균 잔차가 0이 되도록 연 차입 스프레드 추정 (닫힌 해)"""
+    resid = r_real - leveraged_returns(r_u, rf_daily, leverage, expense)
+    return float(-np.mean(resid) * TRADING_DAYS / (leverage - 1.0))
+
+def tracking_stats(r_real, r_syn):
+    """겹치는 구간 추적오차 통계 (연율 TE, 상관계수, 베타, 연율 평균 괴리, 누적수익률 비율)"""
+    diff = r_real - r_syn
+    cov = np.cov(r_real, r_syn)
+    return {
+        'days': int(len(r_real)),
+        'te_annual': float(np.std(diff, ddof=1) * np.sqrt(TRADING_DAYS)),
+        'corr': float(np.corrcoef(r_real, r_syn)[0, 1]),
+        'beta': float(cov[0, 1] / cov[1, 1]),
+        'mean_diff_annual': float(np.mean(diff) * TRADING_DAYS),
+        'cum_ratio': float(np.prod(1.0 + r_real) / np.prod(1.0 + r_syn)),
+    }
+
+def build_synthetic(ticker, closes):
+    """
+    closes: 일봉 종가 DataFrame (컬럼: 대상 ETF, 기초 ETF/지수, ^IRX; ETF는 수정종가)
+    반환: (상장 이전 합성 + 상장 이후 실제 가격 Series, 보정/추적오차 통계 dict)
+    """
+    spec = SYNTHETIC_SPECS[ticker]
+    lev, expense = spec['leverage'], spec['expense']
+    r_u = underlying_returns(closes, *spec['underlying'])
+    rf_daily = (closes[RATE_TICKER].ffill().fillna(0.0) / 100.0 / TRADING_DAYS) if RATE_TICKER in closes else 0.0 * r_u
+    real = closes[ticker].dropna()
+    r_real = real.pct_change()
+
+    overlap = r_real.notna() & r_u.reindex(r_real.index).notna()
+    ov_idx = r_real.index[overlap]
+    a_real = r_real[ov_idx].to_numpy()
+    a_u = r_u[ov_idx].to_numpy()
+    a_rf = rf_daily.reindex(ov_idx).to_numpy()
+    spread = calibrate_spread(a_real, a_u, a_rf, lev, expense)
+    stats = tracking_stats(a_real, leveraged_returns(a_u, a_rf, lev, expense, spread))
+    stats.update({'ticker': ticker, 'leverage': lev, 'expense': expense, 'spread': spread,
+                  'inception': real.index[0], 'synthetic_start': None})
+
+    # 상장일 이전 구간: 합성 수익률을 역누적하여 상장일 실제 가격에 이어 붙임 (P[t] = P[t0] / Π(1+r[t+1..t0]))
+    t0 = real.index[0]
+    pre = r_u[(r_u.index <= t0)].dropna()
+    if len(pre) > 1:
+        r_syn = leveraged_returns(pre.to_numpy(), rf_daily.reindex(pre.index).to_numpy(), lev, expense, spread)
+        growth_after = np.concatenate((np.cumprod((1.0 + r_syn[1:])[::-1])[::-1], [1.0]))
+        pre_prices = pd.Series(float(real.iloc[0]) / growth_after, index=pre.index)
+        spliced = pd.concat([pre_prices.iloc[:-1], real])
+        stats['synthetic_start'] = spliced.index[0]
+    else:
+        spliced = real
+    return spliced.rename(ticker), stats
+
+def calibration_problems(stats, prices):
+    """보정 통계 + 이어 붙인 가격 → CALIBRATION_LIMITS 위반 목록 (빈 목록이면 정상)"""
+    lim = CALIBRATION_LIMITS
+    problems = []
+    if not stats['days'] >= lim['min_days']:
+        problems.append(f"겹침 {stats['days']}일 < {lim['min_days']}일")
+    if not stats['corr'] >= lim['min_corr']:
+        problems.append(f"상관 {stats['corr']:.4f} < {lim['min_corr']}")
+    if not stats['te_annual'] <= lim['max_te_annual']:
+        problems.append(f"TE {stats['te_annual']*100:.2f}%/년 > {lim['max_te_annual']*100:.0f}%")
+    if not abs(stats['spread']) <= lim['max_abs_spread']:
+        problems.append(f"스프레드 {stats['spread']*100:+.2f}%/년 (한도 ±{lim['max_abs_spread']*100:.0f}%)")
+    if not lim['beta'][0] <= stats['beta'] <= lim['beta'][1]:
+        problems.append(f"베타 {stats['beta']:.3f} (범위 {lim['beta'][0]}~{lim['beta'][1]})")
+    values = np.asarray(prices, dtype=float)
+    if not (len(values) and np.isfinite(values).all() and (values > 0).all()):
+        problems.append("가격에 0 이하 / inf / NaN 포함")
+    return problems
+
+def _valid_history(result):
+    """캐시된 결과 재검사 (이전 버전이 저장한 비정상 보정 결과 차단)"""
+    return (isinstance(result, dict) and set(result.get('prices', {})) == set(SYNTHETIC_SPECS)
+            and not any(calibration_problems(result['stats'][t], p) for t, p in result['prices'].items()))
+
+def download_closes():
+    import yfinance as yf
+    tickers = list(SYNTHETIC_SPECS) + [t for s in SYNTHETIC_SPECS.values() for t in s['underlying']] + [RATE_TICKER]
+    raw = yf.download(tickers, interval="1d", period="max", progress=False, auto_adjust=False)
+    if raw.empty:
+        return None
+    adj = raw['Adj Close'] if 'Adj Close' in raw.columns.get_level_values(0) else raw['Close']
+    # 지수/금리는 수정종가 개념이 없으므로 종가 사용
+    closes = adj.copy()
+    for t in [s['underlying'][1] for s in SYNTHETIC_SPECS.values()] + [RATE_TICKER]:
+        if t in raw['Close']:
+            closes[t] = raw['Close'][t]
+    # 가격 열만 품질 검사 (금리 ^IRX는 0 근처 값·로그 수익률 검사 대상 아님)
+    prices = [t for t in closes.columns if t != RATE_TICKER]
+    checked, _ = validate_panel({'Close': closes[prices]}, "1d", "synthetic")
+    rates = closes.drop(columns=prices)
+    return checked['Close'].join(rates[~rates.index.duplicated(keep='last')])
+
+def load_synthetic_history(refresh=False):
+    """
+    합성 히스토리 로드 (로컬 캐시 우선, 없거나 refresh=True일 때만 다운로드 후 1회 생성·저장)
+    반환: {'prices', 'stats'(검사 통과 종목만), 'rejected'{종목: 위반 목록}}. 보정 검사를 통과하지 못한 종목은 빠지고,
+    전 종목이 통과했을 때만 캐시에 저장한다
+    """
+    if not refresh:
+        cached = market_cache.load(CACHE_NAME)
+        if cached is not None and _valid_history(cached):
+            return cached
+    closes = download_closes()
+    if closes is None:
+        return None
+    result = {'prices': {}, 'stats': {}, 'rejected': {}}
+    for ticker in SYNTHETIC_SPECS:
+        if ticker in closes and closes[ticker].notna().any():
+            prices, stats = build_synthetic(ticker, closes)
+            problems = calibration_problems(stats, prices)
+            if problems:
+                result['rejected'][ticker] = problems
+                print(f"⚠️ {ticker} 합성 히스토리 보정 이상 → 사용 안 함: {', '.join(problems)}")
+            else:
+                result['prices'][ticker], result['stats'][ticker] = prices, stats
+    if _valid_history(result):
+        market_cache.store(CACHE_NAME, result)
+    return result
+
+if __name__ == "__main__":
+    res = load_synthetic_history(refresh="--refresh" in sys.argv)
+    if res is None:
+        print("❌ 데이터 수집 실패")
+        sys.exit(1)
+    for t, problems in res.get('rejected', {}).items():
+        print(f"• {t}: ❌ 보정 검사 실패 (저장·사용 안 함) — {', '.join(problems)}")
+    for t, s in res['stats'].items():
+        print(f"• {t} ({s['leverage']:.0f}x): 합성 시작 {s['synthetic_start']:%Y-%m-%d} / 실제 상장 {s['inception']:%Y-%m-%d}")
+        print(f"  보정 스프레드 {s['spread']*100:+.2f}%/년 │ 겹침 {s['days']:,}일 │ TE {s['te_annual']*100:.2f}%/년 │ "
+              f"상관 {s['corr']:.4f} │ 베타 {s['beta']:.3f} │ 평균 괴리 {s['mean_diff_annual']*100:+.2f}%/년 │ 누적 비율 {s['cum_ratio']:.3f}")
@@ -0,0 +1,145 @@
+"""
+해외주식 양도소득세 계산 + 연말 절세 매도·재매수(Tax-Gain Harvesting) 최적화
+한국 해외주식 양도차익: 연간 손익 통산 후 기본공제 250만원 초과분에 22%(양도세 20% + 지방세 2%).
+이동평균법(토스증권)에서는 같은 수량을 팔고 즉시 다시 사면 보유 수량은 그대로(Level 목표 비중 불변)이고
+평균단가만 현재가 쪽으로 올라가므로, 올해 남은 공제 한도만큼 수익을 '비과세로 실현'해 미래 과세표준을 줄일 수 있다.
+
+optimize_harvest(): 계좌(A, B) × 종목(TQQQ, USD) 4개 포지션의 매도·재매수 수량을 주문 단위 정수해로 정확히 구한다.
+공제 한도 하나의 선형 제약이므로 LP 완화(효율순 분수 채우기) 상한과 탐욕해의 차이로 포지션별 탐색 범위를 좁히고,
+임계 포지션을 뺀 3개는 범위 안 수량을 numpy로 전수 평가, 임계 포지션은 남은 한도로 닫힌 형태로 채운다.
+효율이 거의 같은 포지션이 있어 범위가 HARVEST_MAX_CANDIDATES를 넘으면(소수점 주문 단위 등) 범위를 좁히고,
+이때는 정확해 대신 LP 상한 기준 최적해와의 차이 상한(gap_krw, 보통 1단위 순이익 이하)을 함께 반환한다.
+"""
+import time
+
+import numpy as np
+
+TAX_RATE = 0.22                   # 양도세 20% + 지방소득세 2%
+BASIC_DEDUCTION_KRW = 2_500_000   # 해외주식 양도소득 기본공제 (연 250만원)
+FEE_RATE = 0.001                  # 매매 수수료율 (편도, 매도·재매수 각각 적용)
+HARVEST_MAX_CANDIDATES = 1 << 21  # 전수 평가 조합 수 상한. 넘으면 LP 해 쪽 창으로 좁히고 최적해와의 차이 상한(gap_krw)을 보고
+HARVEST_CHUNK = 1 << 19           # 한 번에 평가할 조합 수 (메모리 상한)
+
+def capital_gains_tax(realized_krw, realized_ytd_krw=0.0):
+    """올해 이미 실현한 손익(realized_ytd_krw)에 realized_krw를 더 실현할 때 늘어나는 세액 (배열 가능)"""
+    before = np.maximum(np.asarray(realized_ytd_krw, dtype=float) - BASIC_DEDUCTION_KRW, 0.0)
+    after = np.maximum(np.asarray(realized_ytd_krw, dtype=float) + realized_krw - BASIC_DEDUCTION_KRW, 0.0)
+    return TAX_RATE * (after - before)
+
+def _floor_step(x, step):
+    return np.floor(x / step + 1e-9) * step
+
+def _greedy(order, G, C, budget):
+    """효율순으로 한도 안에서 최대한 채운 정수해 (하한)"""
+    u = np.zeros(len(G))
+    rest = budget
+    for i in order:
+        u[i] = max(min(C[i], np.floor(rest / G[i] + 1e-9)), 0.0)
+        rest -= u[i] * G[i]
+    return u
+
+def _solve_units(G, V, C, budget, max_candidates=HARVEST_MAX_CANDIDATES, chunk=HARVEST_CHUNK):
+    """
+    max V·u  s.t.  G·u <= budget, 0 <= u <= C, u 정수 (G, V > 0인 포지션만 C > 0).
+    반환: (u, 평가한 조합 수, 최적값과의 차이 상한(전수 범위를 다 봤으면 0))
+    LP 상한 UB, 탐욕해 하한 LB, 임계 포지션 효율 λ에 대해 UB − V·u = λ·(남은 한도) + Σ|V_i − λG_i|·(LP해와의 차이)이므로
+    최적해는 포지션별로 |V_i − λG_i|·|u_i − LP해| <= UB − LB 범위 안에 있다
+    """
+    active = C > 0
+    if not active.any() or budget <= 0:
+        return np.zeros(len(G)), 0, 0.0
+    eff = np.where(active, V / np.where(active, G, 1.0), -np.inf)
+    order = [i for i in np.argsort(-eff, kind='stable') if active[i]]
+    ub, rest, k = 0.0, budget, None
+    for i in order:
+        take = min(C[i], rest / G[i])
+        ub += take * V[i]
+        rest -= take * G[i]
+        if take < C[i]:
+            k = i
+            break
+    if k is None:  # 보유분 전체가 한도 안
+        return C.copy(), 1, 0.0
+    best_u = _greedy(order, G, C, budget)
+    best = float(best_u @ V)
+    gap = ub - best + 1e-9 * max(1.0, ub)
+    lam = eff[k]
+
+    free = [i for i in range(len(G)) if i != k]
+    ranges = []
+    for i in free:
+        hi = min(C[i], np.floor(budget / G[i] + 1e-9)) if active[i] else 0.0
+        d = (eff[i] - lam) * G[i] if active[i] else 0.0
+        lo = 0.0
+        if d > 0:
+            lo = max(0.0, C[i] - np.floor(gap / d))
+        elif d < 0:
+            hi = min(hi, np.floor(gap / -d))
+        ranges.append(np.arange(lo, hi + 1))
+    # 범위가 너무 넓으면(효율이 거의 같은 포지션) 가장 넓은 범위부터 LP 해 쪽 절반만 남김
+    exact = True
+    while np.prod([float(len(r)) for r in ranges]) > max_candidates:
+        w = int(np.argmax([len(r) for r in ranges]))
+        i = free[w]
+        keep = (len(ranges[w]) + 1) // 2
+        ranges[w] = ranges[w][-keep:] if eff[i] > lam else ranges[w][:keep]
+        exact = False
+    shape = tuple(len(r) for r in ranges)
+    candidates = int(np.prod(shape))
+    for start in range(0, candidates, chunk):
+        idx = np.unravel_index(np.arange(start, min(start + chunk, candidates)), shape)
+        combos = np.stack([r[i] for r, i in zip(ranges, idx)], axis=-1)
+        left = budget - combos @ G[free]
+        uk = np.minimum(C[k], np.floor(np.maximum(left, 0.0) / G[k] + 1e-9))
+        value = np.where(left >= -1e-6, combos @ V[free] + uk * V[k], -np.inf)
+        j = int(value.argmax())
+        if value[j] > best + 1e-9:
+            best = float(value[j])
+            best_u = np.zeros(len(G))
+            best_u[free] = combos[j]
+            best_u[k] = uk[j]
+    return best_u, candidates, 0.0 if exact else max(ub - best, 0.0)
+
+def optimize_harvest(qty, avg, prices_usd, usd_krw, realized_ytd_krw=0.0, step=1.0, fee_rate=FEE_RATE):
+    """
+    qty/avg: (2, 2) 계좌(A, B) × 종목(TQQQ, USD) 수량 · 평균단가(원), prices_usd: (TQQQ, USD) 현재가(달러)
+    realized_ytd_krw: 올해 이미 실현한 해외주식 양도차익(원, 손실 통산 후), step: 주문 단위
+    반환 dict: shares(2, 2 매도 후 즉시 재매수 수량, 주문 단위 정수해 중 순이익 최대), gain_krw(2, 2), new_avg(2, 2 재매수 후 평균단가),
+              harvested_krw, exemption_left_krw(실행 전 남은 공제), unused_krw, tax_saved_krw(미래 절감 세액),
+              fee_krw, net_krw, tax_due_krw(올해 납부 예상 세액 = 계좌 C 격리 필요액), candidates(평가한 조합 수),
+              gap_krw(순이익 기준 최적해와의 차이 상한, 전수 탐색이면 0), elapsed_ms
+    """
+    t0 = time.perf_counter()
+    if not (step > 0 and np.isfinite(step)):
+        raise ValueError(f"step: 0보다 큰 숫자여야 합니다 ({step!r})")
+    qty = np.asarray(qty, dtype=float).reshape(4)
+    avg = np.asarray(avg, dtype=float).reshape(4)
+    px_krw = np.tile(np.asarray(prices_usd, dtype=float) * usd_krw, 2)
+    gain_per_share = px_krw - avg
+    fee_per_share = 2 * fee_rate * px_krw
+    left = max(BASIC_DEDUCTION_KRW - float(realized_ytd_krw), 0.0)
+
+    # 주문 단위 기준 정수 문제. 수익이 수수료보다 작은 포지션은 제외 (손실 확정 금지 포함)
+    usable = (gain_per_share * TAX_RATE > fee_per_share) & (qty > 0)
+    cap = np.where(usable, np.floor(qty / step + 1e-9), 0.0)
+    # 계좌 A·B에 같은 종목·같은 평균단가면 한 포지션으로 합쳐 풀고 A부터 채움 (동일 효율 포지션의 탐색 범위 폭증 방지)
+    merged = cap.copy()
+    for i in (0, 1):
+        if usable[i] and usable[i + 2] and avg[i] == avg[i + 2]:
+            merged[i], merged[i + 2] = cap[i] + cap[i + 2], 0.0
+    units, candidates, gap = _solve_units(gain_per_share * step, (TAX_RATE * gain_per_share - fee_per_share) * step, merged, left)
+    for i in (0, 1):
+        if merged[i] != cap[i]:
+            units[i], units[i + 2] = min(units[i], cap[i]), max(units[i] - cap[i], 0.0)
+    shares = units * step
+
+    h = float(shares @ gain_per_share)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        new_avg = np.where(qty > 0, (avg * (qty - shares) + px_krw * shares) / qty, avg)
+    return {
+        'shares': shares.reshape(2, 2), 'gain_krw': (shares * gain_per_share).reshape(2, 2), 'new_avg': new_avg.reshape(2, 2),
+        'harvested_krw': h, 'exemption_left_krw': left, 'unused_krw': left - h,
+        'tax_saved_krw': TAX_RATE * h, 'fee_krw': float(shares @ fee_per_share), 'net_krw': TAX_RATE * h - float(shares @ fee_per_share),
+        'tax_due_krw': float(capital_gains_tax(float(realized_ytd_krw) + h)),
+        'candidates': int(candidates), 'gap_krw': gap, 'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
@@ -0,0 +1,37 @@
+"""alert.py --from-snapshot 경로: 오래된 스냅샷은 그대로 쓰지 않고 실시간 수집으로 대체"""
+import json
+import sys
+import time
+import types
+
+import alert
+from snapshot import snapshot_from_market
+
+def _snapshot(tmp_path, monkeypatch, age_hours):
+    path = tmp_path / "market_snapshot.json"
+    monkeypatch.setattr("snapshot.SNAPSHOT_FILE", str(path))
+    snap = snapshot_from_market({'qqq_mdd': -0.05, 'rows': []})
+    snap['created_at'] = time.time() - age_hours * 3600
+    path.write_text(json.dumps(snap), encoding="utf-8")
+
+def _live(monkeypatch, calls):
+    fake = types.ModuleType("market_data")
+    fake.get_market_snapshot = lambda: calls.append(1) or {'qqq_mdd': -0.20, 'rows': []}
+    monkeypatch.setitem(sys.modules, "market_data", fake)
+
+def test_fresh_snapshot_is_used(tmp_path, monkeypatch):
+    _snapshot(tmp_path, monkeypatch, age_hours=1)
+    calls = []
+    _live(monkeypatch, calls)
+    mkt = alert.load_market(from_snapshot=True)
+    assert mkt['qqq_mdd'] == -0.05 and not calls
+    assert "1.0시간 전" in alert.data_age_line(mkt)
+
+def test_stale_snapshot_falls_back_to_live(tmp_path, monkeypatch):
+    _snapshot(tmp_path, monkeypatch, age_hours=72)
+    monkeypatch.setenv("SNAPSHOT_MAX_AGE_HOURS", "24")
+    calls = []
+    _live(monkeypatch, calls)
+    mkt = alert.load_market(from_snapshot=True)
+    assert calls and mkt['qqq_mdd'] == -0.20
+    assert alert.data_age_line(mkt) == "🕒 데이터: 실시간 수집\n"
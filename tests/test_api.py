@@ -0,0 +1,38 @@
+"""api.py /v1/market ETag: 지표가 같아도 다시 저장된 스냅샷(created_at 변경)은 304가 아님"""
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+from api import SnapshotCache, make_server
+from snapshot import save_snapshot
+
+def _get(base, etag=None):
+    req = urllib.request.Request(f"{base}/v1/market", headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, resp.headers.get("ETag"), json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("ETag"), None
+
+def test_resaved_snapshot_with_same_scalars_is_not_304(tmp_path):
+    path = str(tmp_path / "market_snapshot.json")
+    market = {'qqq_mdd': -0.05, 'usd_krw': 1380.0, 'rows': []}
+    first = save_snapshot(market, path=path)
+    server = make_server(SnapshotCache(path), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        status, etag, body = _get(base)
+        assert status == 200 and body['created_at'] == first['created_at']
+        assert _get(base, etag)[0] == 304
+
+        second = save_snapshot(market, path=path)  # 주말 재수집: 지표 동일, created_at만 갱신
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert second['version'] == first['version'] and second['created_at'] != first['created_at']
+        status, new_etag, body = _get(base, etag)
+        assert status == 200 and new_etag != etag and body['created_at'] == second['created_at']
+    finally:
+        server.shutdown()
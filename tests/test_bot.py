@@ -0,0 +1,89 @@
+"""bot.py 채팅별 순서 보장 + sendMessage 실패 처리 + /history 재생 로그 확인 + 채팅별 ATH 유지 (가짜 텔레그램 서버, 네트워크 불필요)"""
+import threading
+
+from bot import CommandBot
+from fake_telegram import FakeTelegram, make_server
+from replay import write_log
+
+def test_same_chat_commands_answer_in_order(tmp_path):
+    fake = FakeTelegram()
+    server = make_server(fake)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bot = CommandBot("TEST", api_base=f"http://127.0.0.1:{server.server_address[1]}", workers=4,
+                     chat_ath_path=str(tmp_path / "ath.json"))
+    stop = threading.Event()
+    runner = threading.Thread(target=bot.run, kwargs={'stop_event': stop, 'timeout': 1}, daemon=True)
+    chats = range(1, 21)
+    for chat in chats:  # 한 getUpdates 배치 안에 같은 채팅의 설정 → 조회
+        fake.inject(chat, f"/level {chat}억")
+        fake.inject(chat, "/level")
+    runner.start()
+    try:
+        assert fake.wait_sent(2 * len(chats))
+    finally:
+        stop.set()
+        runner.join(5)
+        server.shutdown()
+    for chat in chats:
+        replies = [s['text'] for s in fake.sent if s['chat_id'] == chat]
+        assert len(replies) == 2
+        assert all(f"ATH ₩{chat * 100_000_000:,}" in r for r in replies)
+
+class _Resp:
+    def __init__(self, status, data):
+        self.status_code, self.ok, self._data = status, status < 400, data
+
+    def json(self):
+        return self._data
+
+class _Session:
+    def __init__(self, responses):
+        self.responses, self.payloads = list(responses), []
+
+    def post(self, url, json=None, timeout=None):
+        self.payloads.append(json)
+        return self.responses.pop(0)
+
+def test_send_retries_without_markdown_on_parse_error(tmp_path):
+    bot = CommandBot("TEST", api_base="http://127.0.0.1:9", workers=1, chat_ath_path=str(tmp_path / "ath.json"))
+    bot.session = _Session([_Resp(400, {'ok': False, 'description': "Bad Request: can't parse entities"}),
+                            _Resp(200, {'ok': True, 'result': {}})])
+    assert bot.send(1, "*broken")
+    assert bot.session.payloads[0]['parse_mode'] == "Markdown"
+    assert 'parse_mode' not in bot.session.payloads[1]
+
+def test_send_reports_failure(tmp_path):
+    bot = CommandBot("TEST", api_base="http://127.0.0.1:9", workers=1, chat_ath_path=str(tmp_path / "ath.json"))
+    bot.session = _Session([_Resp(429, {'ok': False, 'description': "Too Many Requests", 'parameters': {'retry_after': 0}}),
+                            _Resp(429, {'ok': False, 'description': "Too Many Requests", 'parameters': {'retry_after': 0}})])
+    assert not bot.send(1, "hi")
+    assert len(bot.session.payloads) == 2
+
+def _history(tmp_path, changes_only):
+    path = tmp_path / "replay_events.jsonl"
+    rec = {'sent': True, 'events': ['rsi80'], 'qqq_rsi_mo': 82.0, 'qqq_mo_dev': 0.5, 'qqq_mdd': -0.01,
+           'tqqq_mdd': -0.05, 'fx_deviation': 0.0}
+    records = [dict(rec, date=d) for d in ("2021-11-01", "2021-11-02", "2021-11-03")]
+    header = {'start': "2021-01-04", 'end': "2021-12-31", 'level': 1, 'ath': 1e8,
+              'synthetic': False, 'changes_only': changes_only}
+    write_log(records, str(path), "jsonl", header)
+    bot = CommandBot("TEST", api_base="http://127.0.0.1:9", workers=1, replay_log=str(path),
+                     chat_ath_path=str(tmp_path / "ath.json"))
+    return bot.handle({'chat': {'id': 1}, 'text': "/history rsi80"})
+
+def test_history_counts_full_log(tmp_path):
+    text = _history(tmp_path, changes_only=False)
+    assert "1개 구간 / 3거래일" in text and "2021-01-04 ~ 2021-12-31" in text
+
+def test_history_refuses_changes_only_log(tmp_path):
+    text = _history(tmp_path, changes_only=True)
+    assert "불완전" in text and "거래일" not in text
+
+def test_chat_ath_survives_restart(tmp_path):
+    path = str(tmp_path / "ath.json")
+    bot = CommandBot("TEST", api_base="http://127.0.0.1:9", workers=1, chat_ath_path=path)
+    reply = bot.handle({'chat': {'id': 7}, 'text': "/level 5억"})
+    assert "ATH ₩500,000,000" in reply and "저장됨" in reply
+    restarted = CommandBot("TEST", api_base="http://127.0.0.1:9", workers=1, chat_ath_path=path)
+    assert restarted.chat_level(7) == bot.chat_level(7)
+    assert "ATH ₩500,000,000" in restarted.handle({'chat': {'id': 7}, 'text': "/level"})
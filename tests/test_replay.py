@@ -0,0 +1,40 @@
+"""replay.load_history: 일봉 캐시는 HISTORY_MAX_AGE 동안만 재사용, --refresh는 강제 다운로드"""
+import os
+import time
+
+import pandas as pd
+
+import market_cache
+import replay
+from universe import FX_TICKER
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_cache, "CACHE_DIR", str(tmp_path))
+    calls = []
+
+    def fake_download(tickers, interval, period):
+        calls.append(tuple(tickers))
+        idx = pd.bdate_range("2024-01-01", periods=5)
+        px = pd.DataFrame({t: range(1, 6) for t in tickers}, index=idx, dtype=float)
+        return pd.concat({'Close': px, 'Adj Close': px}, axis=1)
+
+    monkeypatch.setattr(replay, "download_panel", fake_download)
+    return calls
+
+def test_fresh_cache_is_reused(tmp_path, monkeypatch):
+    calls = _setup(tmp_path, monkeypatch)
+    hist = replay.load_history()
+    assert list(hist) == ['qqq_close', 'qqq_adj', 'tqqq_adj', 'fx'] and len(hist['fx']) == 5
+    assert calls == [("QQQ", "TQQQ"), (FX_TICKER,)]
+    replay.load_history()
+    assert len(calls) == 2
+    replay.load_history(refresh=True)
+    assert len(calls) == 4
+
+def test_stale_cache_is_redownloaded(tmp_path, monkeypatch):
+    calls = _setup(tmp_path, monkeypatch)
+    replay.load_history()
+    old = time.time() - replay.HISTORY_MAX_AGE - 60
+    os.utime(market_cache.cache_path(replay.CACHE_NAME), (old, old))
+    replay.load_history()
+    assert len(calls) == 4
@@ -0,0 +1,46 @@
+"""synthetic.py 보정 검사: 비정상 보정 결과는 사용·저장하지 않음"""
+import numpy as np
+import pandas as pd
+
+import market_cache
+import synthetic
+
+def _closes(seed=0, broken=False):
+    """QQQ/SOXX 상장 이후 실제 ETF가 레버리지 수익률을 따라가는 가짜 일봉 (broken=True면 무관한 난수)"""
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2000-01-03", periods=3000)
+    irx = pd.Series(2.0, index=idx)
+    cols = {"^IRX": irx}
+    for etf, (und, index) in [(t, s['underlying']) for t, s in synthetic.SYNTHETIC_SPECS.items()]:
+        lev = synthetic.SYNTHETIC_SPECS[etf]['leverage']
+        r_u = rng.normal(0.0004, 0.012, len(idx))
+        cols[index] = pd.Series(1000 * np.cumprod(1 + r_u), index=idx)
+        cols[und] = cols[index] / 10
+        r = lev * r_u - 0.009 / 252 - (lev - 1) * 0.025 / 252 + rng.normal(0, 0.0005, len(idx))
+        if broken:
+            r = rng.normal(0.0, 0.5, len(idx)).clip(-0.99, 5.0)
+        px = pd.Series(50 * np.cumprod(1 + r), index=idx)
+        cols[etf] = px.where(idx >= idx[1000])
+    return pd.DataFrame(cols)
+
+def test_sane_calibration_is_used_and_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(synthetic, "download_closes", lambda: _closes())
+    res = synthetic.load_synthetic_history(refresh=True)
+    assert set(res['prices']) == set(synthetic.SYNTHETIC_SPECS) and not res['rejected']
+    assert market_cache.load(synthetic.CACHE_NAME) is not None
+
+def test_absurd_calibration_is_rejected_and_not_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(synthetic, "download_closes", lambda: _closes(broken=True))
+    res = synthetic.load_synthetic_history(refresh=True)
+    assert res['prices'] == {} and set(res['rejected']) == set(synthetic.SYNTHETIC_SPECS)
+    assert market_cache.load(synthetic.CACHE_NAME) is None
+
+def test_bad_cached_history_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_cache, "CACHE_DIR", str(tmp_path))
+    bad = synthetic.build_synthetic("TQQQ", _closes(broken=True))
+    market_cache.store(synthetic.CACHE_NAME, {'prices': {"TQQQ": bad[0], "USD": bad[0]}, 'stats': {"TQQQ": bad[1], "USD": bad[1]}})
+    monkeypatch.setattr(synthetic, "download_closes", lambda: _closes())
+    res = synthetic.load_synthetic_history()
+    assert not res['rejected'] and synthetic._valid_history(market_cache.load(synthetic.CACHE_NAME))
@@ -0,0 +1,29 @@
+"""tax_optimizer.optimize_harvest: 정수주 전수 탐색 최적해와 순이익 일치"""
+import numpy as np
+
+from tax_optimizer import BASIC_DEDUCTION_KRW, FEE_RATE, TAX_RATE, optimize_harvest
+
+def _brute_force_net(qty, avg, prices_usd, usd_krw, realized_ytd_krw):
+    qty, avg = np.asarray(qty, dtype=float).reshape(4), np.asarray(avg, dtype=float).reshape(4)
+    px = np.tile(np.asarray(prices_usd) * usd_krw, 2)
+    gain, fee = px - avg, 2 * FEE_RATE * px
+    ok = (gain * TAX_RATE > fee) & (qty > 0)
+    grids = [np.arange(int(qty[i]) + 1) if ok[i] else np.array([0]) for i in range(4)]
+    q = np.stack(np.meshgrid(*grids, indexing='ij'), axis=-1).reshape(-1, 4).astype(float)
+    q = q[q @ gain <= max(BASIC_DEDUCTION_KRW - realized_ytd_krw, 0.0) + 1e-6]
+    return max(float((TAX_RATE * (q @ gain) - q @ fee).max()), 0.0)
+
+def test_matches_brute_force_integer_search():
+    rng = np.random.default_rng(0)
+    cases = [([[27, 9], [32, 36]], None)] + [(rng.integers(0, 30, (2, 2)), None) for _ in range(40)]
+    for n, (qty, _) in enumerate(cases):
+        prices = (rng.uniform(40, 120), rng.uniform(40, 120))
+        avg = np.array([prices, prices]) * 1350.0 * rng.uniform(0.3, 1.1, (2, 2))
+        if n % 5 == 0:
+            avg[1, 0] = avg[0, 0]  # A·B 같은 평균단가
+        ytd = float(rng.choice([0.0, 1_000_000.0, 2_400_000.0]))
+        res = optimize_harvest(qty, avg, prices, 1350.0, ytd)
+        assert res['gap_krw'] == 0
+        assert (res['shares'] <= np.asarray(qty) + 1e-9).all()
+        assert res['harvested_krw'] <= res['exemption_left_krw'] + 1e-6
+        assert abs(res['net_krw'] - _brute_force_net(qty, avg, prices, 1350.0, ytd)) < 1e-6
@@ -0,0 +1,46 @@
+"""validation.py 수정계수(adj_jump / close_step) 회귀 테스트: 맞는 수정종가를 건드리지 않는지"""
+import numpy as np
+import pandas as pd
+
+from validation import validate_panel
+
+def _mdd(s):
+    return float((s / s.cummax() - 1).min())
+
+def _panel(close, adj):
+    idx = pd.bdate_range("2024-01-01", periods=len(close))
+    return {'Close': pd.DataFrame({'X': close}, index=idx), 'Adj Close': pd.DataFrame({'X': adj}, index=idx)}
+
+def _true_series(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    px = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, n)))
+    return px, _mdd(pd.Series(px))
+
+def test_close_missing_split_keeps_adj_close():
+    adj, true_mdd = _true_series()
+    close = adj.copy()
+    close[60:] /= 2  # 2:1 분할이 Close에 반영되지 않은 채 그대로 (Adj Close는 정상)
+    out, report = validate_panel(_panel(close, adj))
+    np.testing.assert_allclose(out['Adj Close']['X'].to_numpy(), adj)
+    assert abs(_mdd(out['Adj Close']['X']) - true_mdd) < 1e-12
+    assert report['counts'].get('close_step') == 1
+    assert 'adj_jump' not in report['counts']
+
+def test_distribution_keeps_adj_close():
+    adj, true_mdd = _true_series(seed=1)
+    close = adj.copy()
+    close[70:] *= 0.92  # 8% 분배금: Close만 하락, 수정종가는 연속
+    out, report = validate_panel(_panel(close, adj))
+    np.testing.assert_allclose(out['Adj Close']['X'].to_numpy(), adj)
+    assert abs(_mdd(out['Adj Close']['X']) - true_mdd) < 1e-12
+    assert report['counts'].get('close_step') == 1
+
+def test_adj_close_step_is_repaired():
+    close, true_mdd = _true_series(seed=2)
+    adj = close * 0.98
+    adj[:50] *= 0.5  # 이전 구간 수정계수 오류: Adj Close에만 계단
+    out, report = validate_panel(_panel(close, adj))
+    assert report['counts'].get('adj_jump') == 1
+    assert 'close_step' not in report['counts']
+    np.testing.assert_allclose(out['Adj Close']['X'].to_numpy(), close * 0.98)
+    assert abs(_mdd(out['Adj Close']['X']) - true_mdd) < 1e-12
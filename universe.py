@@ -0,0 +1,48 @@
+# ==========================================
+# 모니터링 종목 유니버스 중앙 관리 파일
+# app.py 시장 상황판 / alert.py 상태 블록 / market_data.py 일괄 다운로드가 공통으로 참조
+# 참고 종목 추가: universe.json 에 {"extra": ["SOXL", "SPY", {"ticker": "SMH", "name": "반도체 (VanEck)"}]}
+# ==========================================
+import json
+import os
+
+UNIVERSE_FILE = "universe.json"
+FX_TICKER = "KRW=X"
+
+# role: master = 시스템 판정 기준(원칙 0, QQQ 단일), core = 보유 자산, reference = 표시 전용
+# chart: 차트 expander 봉 단위 ('1d' 일봉 / '1wk' 주봉)
+DEFAULT_UNIVERSE = [
+    {"ticker": "QQQ", "name": "나스닥 100", "role": "master", "chart": "1d"},
+    {"ticker": "SOXX", "name": "반도체 지수", "role": "reference", "chart": "1d"},
+    {"ticker": "TQQQ", "name": "나스닥 100 3배", "role": "core", "chart": "1wk"},
+    {"ticker": "USD", "name": "반도체 2배", "role": "core", "chart": "1wk"},
+]
+
+def ticker_key(ticker):
+    """mkt dict 키 접두어 (예: 'QQQ' → 'qqq', 'BRK-B' → 'brk_b')"""
+    return ticker.lower().replace("-", "_").replace("=", "_").replace("^", "")
+
+def load_universe():
+    """기본 유니버스 + universe.json의 참고 종목(중복 제외). 파일이 없거나 깨졌으면 기본값만 사용"""
+    universe = [dict(e) for e in DEFAULT_UNIVERSE]
+    extra = []
+    if os.path.exists(UNIVERSE_FILE):
+        try:
+            with open(UNIVERSE_FILE, "r", encoding="utf-8") as f:
+                extra = json.load(f).get("extra", [])
+        except:
+            extra = []
+    known = {e["ticker"] for e in universe}
+    for item in extra:
+        entry = {"ticker": item} if isinstance(item, str) else dict(item)
+        entry["ticker"] = str(entry.get("ticker", "")).upper().strip()
+        if not entry["ticker"] or entry["ticker"] in known:
+            continue
+        entry.setdefault("name", entry["ticker"])
+        entry.setdefault("chart", "1d")
+        entry["role"] = "reference"
+        known.add(entry["ticker"])
+        universe.append(entry)
+    for e in universe:
+        e["key"] = ticker_key(e["ticker"])
+    return universe
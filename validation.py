@@ -0,0 +1,200 @@
+"""
+수집 데이터 품질 검사 (download_panel 직후, 캐시·지표 계산 전에 실행)
+패널({필드: DataFrame(시간 × 종목)}) 전체에 종목별 루프 없이 numpy 벡터 연산으로 검사하고,
+의심 바는 격리(직전 정상 바 값으로 대체)한 뒤 보고서로 남긴다. 전체 기간(period=max) 일봉도 수 ms 수준.
+
+  non_monotonic : 시간 역순 인덱스              → 정렬
+  duplicate     : 같은 날/주/월에 바 2개 이상     → 한 바로 병합 (진행 중인 월봉 중복 등)
+  gap           : 정상 간격보다 긴 공백          → 보고만
+  missing       : 상장 기간 중 결측 (다른 종목은 값이 있는 날) → 보고만
+  non_positive  : 0 이하 가격                   → 격리
+  ohlc          : High/Low가 Open/Close 범위를 벗어남 → 격리
+  outlier       : 튀었다가 바로 되돌아오는 수익률 (bad tick) → 격리
+  adj_jump      : Adj Close에만 계단 (Close는 연속, 수정계수 오류) → 이전 구간 수정계수 보정
+  close_step    : Close에 계단 (분할 미반영·분배금, 수정종가는 연속) → 보고만 (수정종가가 기준)
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close')
+DUPLICATE_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last', 'Volume': 'last'}
+
+# 봉 단위별 기준. gap: 정상 간격 외에 빠진 봉 수(일봉은 영업일) 이상이면 보고
+# outlier_floor: 이상 수익률 판정 하한(로그 수익률). 실제 임계값은 max(하한, 종목별 |수익률| 중앙값 × OUTLIER_MAD_K)
+INTERVAL_RULES = {
+    '1d': {'gap': 5, 'outlier_floor': 0.20},
+    '1wk': {'gap': 3, 'outlier_floor': 0.30},
+    '1mo': {'gap': 1, 'outlier_floor': 0.40},
+}
+OUTLIER_MAD_K = 15
+REVERT_RATIO = 0.25   # 다음 봉이 튄 폭의 75% 이상을 되돌리면 bad tick
+OHLC_TOL = 0.001      # OHLC 범위 허용 오차 (0.1%)
+ADJ_JUMP = 0.05       # 수정계수(Adj Close / Close) 봉간 로그 변화 한도 (배당은 보통 1% 미만)
+MAX_LISTED = 20       # 검사 항목별 보고서에 나열할 최대 건수 (건수 집계는 전체)
+
+def _day_ordinals(index):
+    return index.values.astype('datetime64[D]').astype(np.int64)
+
+def _period_keys(index, interval):
+    """중복 판정용 주기 키 (일봉: 날짜, 주봉: 월요일 시작 주, 월봉: 연*12+월)"""
+    if interval == '1mo':
+        return np.asarray(index.year * 12 + index.month, dtype=np.int64)
+    if interval == '1wk':
+        return (_day_ordinals(index) + 3) // 7  # 1970-01-01(목) 기준 +3일 → 월요일 경계
+    return _day_ordinals(index)
+
+def _step_ordinals(index, interval):
+    """공백 판정용 봉 순번 (일봉: 영업일 순번, 주봉: 주 순번, 월봉: 월 순번)"""
+    if interval == '1d':
+        return np.busday_count(np.datetime64('1970-01-01', 'D'), index.values.astype('datetime64[D]')).astype(np.int64)
+    return _period_keys(index, interval)
+
+def _prev_valid_pos(valid):
+    """각 칸의 직전 유효 행 위치 (없으면 -1)"""
+    n = valid.shape[0]
+    pos = np.where(valid, np.arange(n)[:, None], -1)
+    prev = np.maximum.accumulate(pos, axis=0)
+    out = np.full_like(prev, -1)
+    out[1:] = prev[:-1]
+    return out
+
+def validate_panel(panel, interval='1d', label=""):
+    """
+    패널 검사 + 격리. 반환: (정리된 패널(새 dict, 입력은 변경하지 않음), 보고서 dict)
+    보고서: label, interval, rows, tickers, counts{검사: 건수}, issues[{check, ticker, date, action, value?}],
+            quarantined(격리된 종목·바 수), elapsed_ms
+    """
+    t0 = time.perf_counter()
+    rules = INTERVAL_RULES.get(interval, INTERVAL_RULES['1d'])
+    tickers = list(panel['Close'].columns)
+    counts, issues = {}, []
+    panel = dict(panel)
+    index = panel['Close'].index
+
+    def record(check, mask, action, values=None):
+        """mask(바 × 종목 bool) 위치를 check 항목으로 기록 (나열은 MAX_LISTED건까지)"""
+        rows, cols = np.nonzero(mask)
+        if len(rows):
+            counts[check] = counts.get(check, 0) + len(rows)
+            for r, c in list(zip(rows, cols))[:MAX_LISTED]:
+                issue = {'check': check, 'ticker': tickers[c], 'date': str(index[r])[:10], 'action': action}
+                if values is not None:
+                    issue['value'] = round(float(values[r, c]), 6)
+                issues.append(issue)
+
+    # 1. 인덱스: 역순 → 정렬, 같은 주기 중복 바 → 병합 (필드별 first/max/min/last)
+    if not index.is_monotonic_increasing:
+        n_unsorted = int((np.diff(index.values.astype(np.int64)) < 0).sum())
+        counts['non_monotonic'] = n_unsorted
+        issues.append({'check': 'non_monotonic', 'ticker': "*", 'date': "", 'action': "sorted", 'value': n_unsorted})
+        panel = {f: frame.sort_index(kind='stable') for f, frame in panel.items()}
+        index = panel['Close'].index
+    keys = pd.Index(_period_keys(index, interval))
+    if keys.has_duplicates:
+        dup_rows = np.asarray(keys.duplicated(keep='last'))
+        record('duplicate', np.repeat(dup_rows[:, None], len(tickers), axis=1) & panel['Close'].notna().to_numpy(), "merged")
+        last_ts = pd.Series(index, index=keys).groupby(level=0).last()
+        panel = {f: frame.groupby(keys).agg(DUPLICATE_AGG.get(f, 'last')).set_axis(pd.DatetimeIndex(last_ts.values), axis=0)
+                 for f, frame in panel.items()}
+        index = panel['Close'].index
+
+    close = panel['Close'].to_numpy(dtype=float)
+    valid = ~np.isnan(close)
+    n = close.shape[0]
+    if n == 0:
+        return panel, _finish(label, interval, tickers, n, counts, issues, 0, t0)
+
+    # 2. 공백 / 결측 (보고만)
+    prev = _prev_valid_pos(valid)
+    steps = _step_ordinals(index, interval)
+    has_prev = valid & (prev >= 0)
+    missed = np.where(has_prev, steps[:, None] - steps[np.maximum(prev, 0)] - 1, 0)
+    record('gap', has_prev & (missed >= rules['gap']), "reported", missed)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n)
+    last = np.where(valid.any(axis=0), n - 1 - valid[::-1].argmax(axis=0), -1)
+    rows = np.arange(n)[:, None]
+    in_life = (rows >= first) & (rows <= last)
+    record('missing', in_life & ~valid & valid.any(axis=1)[:, None], "reported")
+
+    # 3. 격리 대상 바 (종목 × 바): 0 이하 가격 / OHLC 불일치 / bad tick
+    quarantine = np.zeros(close.shape, dtype=bool)
+    fields = {f: panel[f].to_numpy(dtype=float) for f in PRICE_FIELDS if f in panel}
+    with np.errstate(invalid='ignore'):
+        non_pos = np.zeros(close.shape, dtype=bool)
+        for arr in fields.values():
+            non_pos |= arr <= 0
+        record('non_positive', non_pos, "quarantined", close)
+        quarantine |= non_pos
+
+        if all(f in fields for f in ('Open', 'High', 'Low', 'Close')):
+            o, h, lo, c = fields['Open'], fields['High'], fields['Low'], fields['Close']
+            body_hi = np.fmax(o, c)
+            body_lo = np.fmin(o, c)
+            bad = (h < body_hi * (1 - OHLC_TOL)) | (lo > body_lo * (1 + OHLC_TOL)) | (lo > h * (1 + OHLC_TOL))
+            bad &= ~quarantine
+            record('ohlc', bad, "quarantined", close)
+            quarantine |= bad
+
+        logc = np.log(np.where(valid & ~quarantine, close, np.nan))
+        logc = pd.DataFrame(logc).ffill().to_numpy()
+        ret = np.zeros_like(logc)
+        ret[1:] = logc[1:] - logc[:-1]
+        ret = np.nan_to_num(ret)
+        nxt = np.zeros_like(ret)
+        nxt[:-1] = ret[1:]
+        abs_ret = np.abs(ret)
+        scale = np.nanmedian(np.where(abs_ret > 0, abs_ret, np.nan), axis=0) if n > 1 else np.zeros(close.shape[1])
+        thr = np.fmax(rules['outlier_floor'], np.nan_to_num(scale) * OUTLIER_MAD_K)
+        spike = (abs_ret > thr) & (np.sign(ret) == -np.sign(nxt)) & (np.abs(ret + nxt) < REVERT_RATIO * abs_ret)
+        spike &= valid & ~quarantine
+        record('outlier', spike, "quarantined", ret)
+        quarantine |= spike
+
+    n_quarantined = int(quarantine.sum())
+    if n_quarantined:
+        q = pd.DataFrame(quarantine, index=index, columns=tickers)
+        for f in PRICE_FIELDS:
+            if f in panel:
+                masked = panel[f].mask(q)
+                panel[f] = masked.mask(q, masked.ffill())
+
+    # 4. 수정계수(Adj Close / Close) 급변. Adj Close 자체 수익률에 계단이 있고 Close에는 없을 때만
+    #    Adj Close 쪽 오류로 보고 이전 구간을 이후 계수에 맞춰 보정 (MDD가 가짜 계단을 보지 않도록).
+    #    Close에 계단이 있으면(분할 미반영, 분배금 등) 수정종가가 맞는 값이므로 보고만 한다
+    if 'Adj Close' in panel:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            la = pd.DataFrame(np.log(panel['Adj Close'].to_numpy(dtype=float))).ffill().to_numpy()
+            lc = pd.DataFrame(np.log(panel['Close'].to_numpy(dtype=float))).ffill().to_numpy()
+        ra, rc = np.zeros_like(la), np.zeros_like(lc)
+        ra[1:] = la[1:] - la[:-1]
+        rc[1:] = lc[1:] - lc[:-1]
+        ra, rc = np.nan_to_num(ra), np.nan_to_num(rc)
+        d = ra - rc
+        jump = np.abs(d) > ADJ_JUMP
+        if jump.any():
+            adj_step = jump & (np.abs(ra) > ADJ_JUMP) & (np.abs(rc) <= ADJ_JUMP)
+            record('adj_jump', adj_step, "repaired", d)
+            record('close_step', jump & ~adj_step, "reported", d)
+            if adj_step.any():
+                j = np.where(adj_step, d, 0.0)
+                later = j[::-1].cumsum(axis=0)[::-1] - j  # t 이후 Adj Close 계단 합계
+                a = panel['Adj Close'].to_numpy(dtype=float)
+                panel['Adj Close'] = pd.DataFrame(a * np.exp(later), index=index, columns=tickers)
+    return panel, _finish(label, interval, tickers, n, counts, issues, n_quarantined, t0)
+
+def _finish(label, interval, tickers, rows, counts, issues, n_quarantined, t0):
+    return {
+        'label': label, 'interval': interval, 'rows': rows, 'tickers': tickers,
+        'counts': counts, 'issues': issues, 'quarantined': n_quarantined,
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+def summarize_reports(reports):
+    """여러 보고서 → (보고 건수 합계, 격리 합계, 검사 항목별 건수)"""
+    counts = {}
+    for r in reports:
+        for k, v in r['counts'].items():
+            counts[k] = counts.get(k, 0) + v
+    return sum(counts.values()), sum(r['quarantined'] for r in reports), counts
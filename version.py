@@ -3,7 +3,7 @@
 # 여기만 수정하면 app.py, alert.py 전체에 자동 반영
 # ==========================================
 
-APP_VERSION = "24.5"
+APP_VERSION = "24.6"
 APP_VERSION_FULL = f"V{APP_VERSION} The Ultimate Simple"
 APP_NAME = "Global Fire CRO"
 APP_TITLE = f"{APP_NAME} {APP_VERSION_FULL}"